@@ -4,7 +4,7 @@ from alembic import op
 
 # revision identifiers, used by Alembic.
 revision = "20241005_02_html_templates"
-down_revision = "20240928_01_initial"
+down_revision = "20240928_01"
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,26 @@
+"""Content-addressed embedding cache"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241012_03_embedding_cache"
+down_revision = "20241005_02_html_templates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model", sa.String(length=128), primary_key=True),
+        sa.Column("dimension", sa.Integer(), primary_key=True),
+        sa.Column("text_sha256", sa.String(length=64), primary_key=True),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_cache")
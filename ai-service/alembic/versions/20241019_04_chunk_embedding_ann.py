@@ -0,0 +1,31 @@
+"""Dimensioned chunk embeddings with an ANN index"""
+
+from alembic import op
+from app.core.config import get_settings
+from app.db.vector_index import ANN_INDEX_NAME, create_index_sql
+
+# revision identifiers, used by Alembic.
+revision = "20241019_04_chunk_embedding_ann"
+down_revision = "20241012_03_embedding_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    settings = get_settings()
+    dim = int(settings.vector_dim)
+    # Fails loudly if stored vectors do not match VECTOR_DIM; re-embed before upgrading.
+    op.execute(f"ALTER TABLE chunks ALTER COLUMN embedding TYPE vector({dim}) USING embedding::vector({dim})")
+
+    statement = create_index_sql(settings)
+    if statement is None:
+        return
+    # CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {ANN_INDEX_NAME}")
+    op.execute("ALTER TABLE chunks ALTER COLUMN embedding TYPE vector")
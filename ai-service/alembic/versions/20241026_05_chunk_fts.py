@@ -0,0 +1,28 @@
+"""Generated tsvector column and GIN index for chunk full-text search"""
+
+from alembic import op
+from app.core.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision = "20241026_05_chunk_fts"
+down_revision = "20241019_04_chunk_embedding_ann"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_chunks_text_search"
+
+
+def upgrade() -> None:
+    config = get_settings().fts_config
+    op.execute(
+        "ALTER TABLE chunks ADD COLUMN text_search tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{config}'::regconfig, text)) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON chunks USING gin (text_search)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+    op.execute("ALTER TABLE chunks DROP COLUMN text_search")
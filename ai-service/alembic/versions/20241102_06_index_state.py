@@ -0,0 +1,25 @@
+"""Index generation counter for retrieval caching"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241102_06_index_state"
+down_revision = "20241026_05_chunk_fts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    index_state = op.create_table(
+        "index_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("generation", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.bulk_insert(index_state, [{"id": 1, "generation": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("index_state")
@@ -0,0 +1,43 @@
+"""Quantized chunk embeddings (halfvec / binary) carrying the ANN index"""
+
+from alembic import op
+from app.core.config import get_settings
+from app.db.vector_index import ANN_INDEX_NAME, QUANTIZED_COLUMN, create_index_sql, quantized_column_sql
+
+# revision identifiers, used by Alembic.
+revision = "20241109_07_chunk_embedding_quantized"
+down_revision = "20241102_06_index_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    settings = get_settings()
+    column = quantized_column_sql(settings)
+    if column is None:
+        return
+    # The ANN index moves from the float column to the quantized one; floats stay for rescoring.
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {ANN_INDEX_NAME}")
+    op.execute(column)
+
+    statement = create_index_sql(settings)
+    if statement is None:
+        return
+    with op.get_context().autocommit_block():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    settings = get_settings()
+    if settings.vector_storage == "float":
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {ANN_INDEX_NAME}")
+    op.execute(f"ALTER TABLE chunks DROP COLUMN IF EXISTS {QUANTIZED_COLUMN}")
+
+    statement = create_index_sql(settings.model_copy(update={"vector_storage": "float"}))
+    if statement is None:
+        return
+    with op.get_context().autocommit_block():
+        op.execute(statement)
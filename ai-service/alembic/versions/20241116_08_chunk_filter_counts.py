@@ -0,0 +1,30 @@
+"""Per-(permit_type, region) chunk counts for the retrieval query planner"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241116_08_chunk_filter_counts"
+down_revision = "20241109_07_chunk_embedding_quantized"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chunk_filter_counts",
+        sa.Column("permit_type", sa.String(length=32), primary_key=True),
+        sa.Column("region", sa.String(length=32), primary_key=True),
+        sa.Column("chunks", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO chunk_filter_counts (permit_type, region, chunks) "
+        "SELECT COALESCE(metadata->>'permit_type', ''), COALESCE(metadata->>'region', ''), count(*) "
+        "FROM chunks GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chunk_filter_counts")
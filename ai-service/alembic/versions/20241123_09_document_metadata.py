@@ -0,0 +1,70 @@
+"""Typed, indexed source metadata on documents instead of every chunk"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241123_09_document_metadata"
+down_revision = "20241116_08_chunk_filter_counts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("permit_type", sa.String(length=32), nullable=True))
+    op.add_column("documents", sa.Column("region", sa.String(length=32), nullable=True))
+    op.add_column("documents", sa.Column("title", sa.String(length=512), nullable=True))
+    op.add_column("documents", sa.Column("version_date", sa.Date(), nullable=True))
+    op.add_column("documents", sa.Column("language", sa.String(length=8), nullable=False, server_default="id"))
+    op.add_column("documents", sa.Column("selectors", sa.dialects.postgresql.JSONB(), nullable=True))
+    op.add_column("documents", sa.Column("ingested_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Every chunk of a document carried the same copy; take it from the first one.
+    op.execute(
+        """
+        UPDATE documents AS d SET
+            permit_type = NULLIF(c.metadata->>'permit_type', ''),
+            region = NULLIF(c.metadata->>'region', ''),
+            title = NULLIF(c.metadata->>'source_title', ''),
+            version_date = CASE
+                WHEN c.metadata->>'version_date' ~ '^\\d{4}-\\d{2}-\\d{2}'
+                THEN left(c.metadata->>'version_date', 10)::date
+            END,
+            language = COALESCE(c.metadata->>'language', 'id'),
+            selectors = NULLIF(c.metadata->'selectors', 'null'::jsonb),
+            ingested_at = (c.metadata->>'ingested_at')::timestamp AT TIME ZONE 'UTC'
+        FROM (
+            SELECT DISTINCT ON (document_id) document_id, metadata FROM chunks ORDER BY document_id, id
+        ) AS c
+        WHERE c.document_id = d.id
+        """
+    )
+    op.create_index("ix_documents_permit_type_region", "documents", ["permit_type", "region"])
+    op.create_index("ix_documents_region", "documents", ["region"])
+    op.execute(
+        "UPDATE chunks SET metadata = jsonb_build_object('section', metadata->'section', 'order', metadata->'order')"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE chunks AS c SET metadata = c.metadata || jsonb_build_object(
+            'source_url', d.url,
+            'source_title', COALESCE(d.title, ''),
+            'permit_type', d.permit_type,
+            'region', d.region,
+            'language', d.language,
+            'version_date', d.version_date::text,
+            'selectors', d.selectors,
+            'ingested_at', to_char(d.ingested_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+        )
+        FROM documents AS d
+        WHERE c.document_id = d.id
+        """
+    )
+    op.drop_index("ix_documents_region", table_name="documents")
+    op.drop_index("ix_documents_permit_type_region", table_name="documents")
+    for column in ("ingested_at", "selectors", "language", "version_date", "title", "region", "permit_type"):
+        op.drop_column("documents", column)
@@ -0,0 +1,71 @@
+"""Partition key columns on chunks and optional list partitioning by permit_type/region"""
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.core.config import AppSettings, get_settings
+from app.db.partitions import DEFAULT_PARTITION, partition_ddl, partition_keys
+from app.db.vector_index import create_index_sql
+
+# revision identifiers, used by Alembic.
+revision = "20241130_10_chunk_partitions"
+down_revision = "20241123_09_document_metadata"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    settings = get_settings()
+    op.add_column("chunks", sa.Column("permit_type", sa.String(length=32), nullable=False, server_default=""))
+    op.add_column("chunks", sa.Column("region", sa.String(length=32), nullable=False, server_default=""))
+    op.execute(
+        "UPDATE chunks AS c SET permit_type = COALESCE(d.permit_type, ''), region = COALESCE(d.region, '') "
+        "FROM documents AS d WHERE c.document_id = d.id"
+    )
+    if partition_keys(settings):
+        _rebuild(settings, partitioned=True)
+    op.create_index("ix_chunks_permit_type_region", "chunks", ["permit_type", "region"])
+
+
+def downgrade() -> None:
+    settings = get_settings()
+    op.drop_index("ix_chunks_permit_type_region", table_name="chunks")
+    if partition_keys(settings):
+        _rebuild(settings.model_copy(update={"chunk_partitioning": "none"}), partitioned=False)
+    op.drop_column("chunks", "region")
+    op.drop_column("chunks", "permit_type")
+
+
+def _rebuild(settings: AppSettings, partitioned: bool) -> None:
+    """Copy chunks into a fresh (un)partitioned table and recreate its keys and indexes."""
+    op.execute("ALTER TABLE chunks RENAME TO chunks_previous")
+    layout = " PARTITION BY LIST (permit_type)" if partitioned else ""
+    op.execute(f"CREATE TABLE chunks (LIKE chunks_previous INCLUDING DEFAULTS INCLUDING GENERATED){layout}")
+    op.execute("ALTER SEQUENCE chunks_id_seq OWNED BY chunks.id")
+    if partitioned:
+        op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF chunks DEFAULT")
+        keys = op.get_bind().execute(sa.text("SELECT DISTINCT permit_type, region FROM chunks_previous")).all()
+        for permit_type, region in keys:
+            for statement in partition_ddl(settings, permit_type, region):
+                op.execute(statement)
+    # Generated columns (text_search, embedding_quantized) are recomputed on insert.
+    op.execute(
+        "INSERT INTO chunks (id, document_id, permit_type, region, text, metadata, embedding, created_at) "
+        "SELECT id, document_id, permit_type, region, text, metadata, embedding, created_at FROM chunks_previous"
+    )
+    op.execute("DROP TABLE chunks_previous")
+
+    # A primary key on a partitioned table must include the partition columns.
+    op.execute(f"ALTER TABLE chunks ADD PRIMARY KEY ({'id, permit_type, region' if partitioned else 'id'})")
+    op.execute(
+        "ALTER TABLE chunks ADD FOREIGN KEY (document_id) REFERENCES documents (id) ON DELETE CASCADE"
+    )
+    op.create_index("ix_chunks_document_id", "chunks", ["document_id"])
+    op.execute("CREATE INDEX ix_chunks_text_search ON chunks USING gin (text_search)")
+    statement = create_index_sql(settings)
+    if statement is None:
+        return
+    if partitioned:
+        op.execute(statement)
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(statement)
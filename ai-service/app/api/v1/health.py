@@ -3,9 +3,11 @@ from __future__ import annotations
 from typing import Literal
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import func, select, text
 
 from app.api.deps import get_db_session
+from app.core.metrics import metrics
 from app.models import Chunk
 from app.schemas.health import HealthStatus
 from app.services.llm.gemini import get_gemini_client
@@ -54,3 +56,13 @@ async def health_check(session=Depends(get_db_session)) -> HealthStatus:
     )
     return HealthStatus(status=status_value, details=details)
 
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Process metrics",
+    response_description="Counters and gauges in Prometheus text exposition format.",
+)
+async def process_metrics() -> PlainTextResponse:
+    """Expose in-process counters such as LLM connection pool saturation."""
+    return PlainTextResponse(metrics.render_prometheus())
@@ -1,12 +1,49 @@
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from app.api.deps import get_rag_pipeline
+from app.core.logging import get_logger
 from app.schemas.common import ErrorResponse
 from app.schemas.qa import QaRequest, QaResponse
 from app.services.rag.pipeline.service import RagPipeline
 
+logger = get_logger(__name__)
+
 router = APIRouter(prefix="/v1/qa", tags=["qa"])
 
+CANNOT_VERIFY = "Saya tidak dapat memverifikasi ini."
+
+
+def _enforce_must_cite(result: dict[str, Any]) -> QaResponse:
+    if result["answer_md"].startswith("Saya tidak dapat memverifikasi"):
+        return QaResponse(
+            answer_md=result["answer_md"],
+            citations=[],
+            retrieval_meta=result.get("retrieval_meta", {}),
+            model_meta=result.get("model_meta", {}),
+        )
+    if not result.get("citations"):
+        return QaResponse(
+            answer_md=CANNOT_VERIFY,
+            citations=[],
+            retrieval_meta=result.get("retrieval_meta", {}),
+            model_meta=result.get("model_meta", {}),
+        )
+    return QaResponse(
+        answer_md=result["answer_md"],
+        citations=result["citations"],
+        retrieval_meta=result.get("retrieval_meta", {}),
+        model_meta=result.get("model_meta", {}),
+    )
+
+
+def _sse(event: str, data: dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
 
 @router.post(
     "/query",
@@ -17,6 +54,7 @@ router = APIRouter(prefix="/v1/qa", tags=["qa"])
         401: {"model": ErrorResponse, "description": "Missing or invalid JWT."},
         429: {"model": ErrorResponse, "description": "Rate limit exceeded."},
         500: {"model": ErrorResponse, "description": "Failed to generate an answer."},
+        503: {"model": ErrorResponse, "description": "Language model is shedding load; retry later."},
     },
 )
 async def query_qa(
@@ -30,23 +68,48 @@ async def query_qa(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Gagal memproses permintaan",
         )
-    if result["answer_md"].startswith("Saya tidak dapat memverifikasi"):
-        return QaResponse(
-            answer_md=result["answer_md"],
-            citations=[],
-            retrieval_meta=result.get("retrieval_meta", {}),
-            model_meta=result.get("model_meta", {}),
-        )
-    if not result.get("citations"):
-        return QaResponse(
-            answer_md="Saya tidak dapat memverifikasi ini.",
-            citations=[],
-            retrieval_meta=result.get("retrieval_meta", {}),
-            model_meta=result.get("model_meta", {}),
-        )
-    return QaResponse(
-        answer_md=result["answer_md"],
-        citations=result["citations"],
-        retrieval_meta=result.get("retrieval_meta", {}),
-        model_meta=result.get("model_meta", {}),
+    return _enforce_must_cite(result)
+
+
+@router.post(
+    "/query/stream",
+    summary="Ask a grounded legal question and stream the answer",
+    response_description=(
+        "Server-Sent Events: `meta` (citations, retrieval metadata), `token` (answer deltas), "
+        "then a final `done` event with the guarded `QaResponse`. If answering fails mid-stream, an "
+        "`error` event precedes a `done` that cannot verify the answer."
+    ),
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        401: {"model": ErrorResponse, "description": "Missing or invalid JWT."},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded."},
+    },
+)
+async def query_qa_stream(
+    payload: QaRequest,
+    pipeline: RagPipeline = Depends(get_rag_pipeline),
+) -> StreamingResponse:
+    """Stream a grounded answer; clients must replace streamed tokens with the `done` answer."""
+
+    async def events() -> AsyncIterator[bytes]:
+        done = False
+        try:
+            async for event, data in pipeline.answer_stream(payload.model_dump()):
+                if event == "done":
+                    if not data.get("answer_md"):
+                        data = {**data, "answer_md": CANNOT_VERIFY}
+                    data = _enforce_must_cite(data).model_dump()
+                    done = True
+                yield _sse(event, data)
+        except Exception:
+            # The 200 headers are already sent; report the failure in-band instead.
+            logger.exception("qa_stream_failed")
+            yield _sse("error", {"detail": "Gagal memproses permintaan"})
+        if not done:
+            yield _sse("done", _enforce_must_cite({"answer_md": CANNOT_VERIFY}).model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
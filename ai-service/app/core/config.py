@@ -51,7 +51,25 @@ class AppSettings(BaseSettingsType):
         default=SecretStr("sqlite+aiosqlite:///:memory:"),
         alias='DATABASE_URL',
     )
-    vector_dim: int = Field(default=1536, alias='VECTOR_DIM')
+    vector_dim: int = Field(default=768, alias='VECTOR_DIM')
+    vector_index_type: Literal['hnsw', 'ivfflat', 'none'] = Field(default='hnsw', alias='VECTOR_INDEX_TYPE')
+    vector_hnsw_m: int = Field(default=16, alias='VECTOR_HNSW_M')
+    vector_hnsw_ef_construction: int = Field(default=64, alias='VECTOR_HNSW_EF_CONSTRUCTION')
+    vector_hnsw_ef_search: int = Field(default=40, alias='VECTOR_HNSW_EF_SEARCH')
+    vector_ivfflat_lists: int = Field(default=100, alias='VECTOR_IVFFLAT_LISTS')
+    vector_ivfflat_probes: int = Field(default=10, alias='VECTOR_IVFFLAT_PROBES')
+    vector_storage: Literal['float', 'halfvec', 'binary'] = Field(default='float', alias='VECTOR_STORAGE')
+    vector_rescore_oversample: int = Field(default=4, alias='VECTOR_RESCORE_OVERSAMPLE')
+    vector_iterative_scan: Literal['off', 'relaxed_order', 'strict_order'] = Field(
+        default='off', alias='VECTOR_ITERATIVE_SCAN'
+    )
+    planner_exact_max_rows: int = Field(default=5000, alias='PLANNER_EXACT_MAX_ROWS')
+    chunk_partitioning: Literal['none', 'permit_type', 'permit_type_region'] = Field(
+        default='none', alias='CHUNK_PARTITIONING'
+    )
+    local_vector_index_path: str = Field(default='./aksara_vectors', alias='LOCAL_VECTOR_INDEX_PATH')
+    local_vector_ivf_lists: int = Field(default=0, alias='LOCAL_VECTOR_IVF_LISTS')
+    local_vector_ivf_probes: int = Field(default=8, alias='LOCAL_VECTOR_IVF_PROBES')
 
     gemini_api_key: SecretStr = Field(
         default=SecretStr("dummy-gemini-key"),
@@ -59,6 +77,11 @@ class AppSettings(BaseSettingsType):
     )
     gemini_model_qa: str = Field(default='gemini-2.5-pro', alias='GEMINI_MODEL_QA')
     gemini_model_embed: str = Field(default='text-embedding-004', alias='GEMINI_MODEL_EMBED')
+    gemini_model_rerank: str = Field(default='gemini-2.5-flash-lite', alias='GEMINI_MODEL_RERANK')
+    gemini_base_url: str = Field(
+        default='https://generativelanguage.googleapis.com/v1beta',
+        alias='GEMINI_BASE_URL',
+    )
 
     storage_bucket_url: AnyHttpUrl = Field(
         default=cast(AnyHttpUrl, 'http://localhost:9000/aksara'),
@@ -73,6 +96,25 @@ class AppSettings(BaseSettingsType):
 
     retrieval_topk: int = Field(default=24, alias='RETRIEVAL_TOPK')
     rerank_topk: int = Field(default=8, alias='RERANK_TOPK')
+    rerank_candidates: int = Field(default=24, alias='RERANK_CANDIDATES')
+    rrf_k: int = Field(default=60, alias='RRF_K')
+    rrf_vector_weight: float = Field(default=1.0, alias='RRF_VECTOR_WEIGHT')
+    rrf_text_weight: float = Field(default=1.0, alias='RRF_TEXT_WEIGHT')
+    answer_cache_enabled: bool = Field(default=True, alias='ANSWER_CACHE_ENABLED')
+    answer_cache_ttl_seconds: float = Field(default=3600.0, alias='ANSWER_CACHE_TTL_SECONDS')
+    answer_cache_max_entries: int = Field(default=1024, alias='ANSWER_CACHE_MAX_ENTRIES')
+    answer_cache_semantic: bool = Field(default=False, alias='ANSWER_CACHE_SEMANTIC')
+    answer_cache_similarity: float = Field(default=0.95, alias='ANSWER_CACHE_SIMILARITY')
+    retrieval_cache_enabled: bool = Field(default=True, alias='RETRIEVAL_CACHE_ENABLED')
+    retrieval_cache_ttl_seconds: float = Field(default=600.0, alias='RETRIEVAL_CACHE_TTL_SECONDS')
+    retrieval_cache_max_entries: int = Field(default=2048, alias='RETRIEVAL_CACHE_MAX_ENTRIES')
+    retrieval_vector_timeout_seconds: float = Field(default=8.0, alias='RETRIEVAL_VECTOR_TIMEOUT_SECONDS')
+    retrieval_text_timeout_seconds: float = Field(default=3.0, alias='RETRIEVAL_TEXT_TIMEOUT_SECONDS')
+    fts_config: str = Field(default='indonesian', alias='FTS_CONFIG', pattern=r'^[a-z_]+$')
+    rerank_mode: Literal['local', 'llm', 'llm_budgeted'] = Field(default='local', alias='RERANK_MODE')
+    rerank_lexical_weight: float = Field(default=0.4, alias='RERANK_LEXICAL_WEIGHT')
+    rerank_window_words: int = Field(default=160, alias='RERANK_WINDOW_WORDS')
+    rerank_shard_size: int = Field(default=8, alias='RERANK_SHARD_SIZE')
 
     jwt_issuer: str = Field(default='https://auth.local/', alias='JWT_ISSUER')
     jwt_audience: str = Field(default='aksara-legal-ai', alias='JWT_AUDIENCE')
@@ -81,6 +123,35 @@ class AppSettings(BaseSettingsType):
     request_timeout_seconds: float = Field(default=15.0)
     llm_timeout_seconds: float = Field(default=20.0)
     llm_max_retries: int = Field(default=3)
+    llm_http2: bool = Field(default=True)
+    llm_pool_max_connections: int = Field(default=20)
+    llm_pool_max_keepalive: int = Field(default=10)
+    llm_keepalive_expiry_seconds: float = Field(default=30.0)
+    llm_pool_timeout_seconds: float = Field(default=5.0)
+    llm_embed_batch_size: int = Field(default=100)
+    llm_embed_max_concurrency: int = Field(default=4)
+    llm_coalesce_enabled: bool = Field(default=True)
+    llm_requests_per_minute: int = Field(default=600)
+    llm_tokens_per_minute: int = Field(default=2_000_000)
+    llm_concurrency_initial: int = Field(default=8)
+    llm_concurrency_min: int = Field(default=1)
+    llm_concurrency_max: int = Field(default=32)
+    llm_breaker_failure_threshold: int = Field(default=5)
+    llm_breaker_cooldown_seconds: float = Field(default=30.0)
+    llm_hedge_enabled: bool = Field(default=False)
+    llm_hedge_call_types: str = Field(default='rerank,generate')
+    llm_hedge_percentile: float = Field(default=95.0)
+    llm_hedge_min_samples: int = Field(default=20)
+    llm_hedge_max_ratio: float = Field(default=0.05)
+    llm_payload_log_sample_rate: float = Field(default=0.01)
+    llm_prefix_cache_enabled: bool = Field(default=False)
+    llm_prefix_cache_ttl_seconds: int = Field(default=3600)
+    llm_prefix_cache_max_entries: int = Field(default=128)
+
+    embedding_provider: Literal['gemini', 'local'] = Field(default='gemini', alias='EMBEDDING_PROVIDER')
+    embedding_cache_enabled: bool = Field(default=True, alias='EMBEDDING_CACHE_ENABLED')
+    embedding_cache_max_entries: int = Field(default=10_000, alias='EMBEDDING_CACHE_MAX_ENTRIES')
+    embedding_cache_persist: bool = Field(default=True, alias='EMBEDDING_CACHE_PERSIST')
 
     storage_signed_url_ttl_seconds: int = Field(default=3600)
     cors_allowed_origins: str = Field(
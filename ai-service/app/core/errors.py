@@ -16,3 +16,7 @@ class PdfExportError(Exception):
 
 class MissingFieldError(Exception):
     """Raised when required fields are missing for Autopilot."""
+
+
+class ModelUnavailableError(Exception):
+    """Raised when the LLM provider is shedding load and calls fail fast."""
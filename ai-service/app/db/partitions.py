@@ -0,0 +1,102 @@
+"""List partitioning of ``chunks`` by ``permit_type`` and optionally ``region``.
+
+``CHUNK_PARTITIONING`` picks the layout when the 20241130_10 migration runs:
+
+- ``permit_type``: one partition per permit type, plus ``chunks_default`` for chunks
+  without one.
+- ``permit_type_region``: each permit type partition is itself list-partitioned by
+  region, with its own default partition.
+
+The ANN, full-text and btree indexes are created on the partitioned parent, so every
+partition gets its own copy, including partitions created later. Filters on
+``chunks.permit_type`` / ``chunks.region`` let Postgres prune to the matching partitions.
+Ingestion creates the partitions for a new permit type or region before inserting rows;
+otherwise they would land in a default partition, which would then block creating the
+partition.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import lru_cache
+
+from sqlalchemy import text
+
+from app.core.config import AppSettings
+from app.core.logging import get_logger
+from app.db.session import get_engine
+
+logger = get_logger(__name__)
+
+PARTITIONED_TABLE = "chunks"
+DEFAULT_PARTITION = "chunks_default"
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def partition_keys(settings: AppSettings) -> tuple[str, ...]:
+    """The chunk columns the table is partitioned on, outermost first."""
+    return {
+        "none": (),
+        "permit_type": ("permit_type",),
+        "permit_type_region": ("permit_type", "region"),
+    }[settings.chunk_partitioning]
+
+
+def partition_name(*values: str) -> str:
+    """Identifier for the partition holding ``values``; a hash suffix keeps distinct values apart."""
+    parts = [PARTITIONED_TABLE]
+    for value in values:
+        slug = _SLUG.sub("_", value.lower()).strip("_")[:16] or "x"
+        parts.append(f"{slug}_{hashlib.sha256(value.encode('utf-8')).hexdigest()[:6]}")
+    return "_".join(parts)
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def partition_ddl(settings: AppSettings, permit_type: str, region: str) -> list[str]:
+    """``CREATE TABLE IF NOT EXISTS`` statements for the partitions that hold these rows."""
+    keys = partition_keys(settings)
+    if not keys or not permit_type:
+        return []
+    name = partition_name(permit_type)
+    values = f"FOR VALUES IN ({_literal(permit_type)})"
+    if keys == ("permit_type",):
+        return [f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARTITIONED_TABLE} {values}"]
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARTITIONED_TABLE} {values} PARTITION BY LIST (region)",
+        f"CREATE TABLE IF NOT EXISTS {name}_default PARTITION OF {name} DEFAULT",
+    ]
+    if region:
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(permit_type, region)} "
+            f"PARTITION OF {name} FOR VALUES IN ({_literal(region)})"
+        )
+    return statements
+
+
+class PartitionRouter:
+    """Creates missing chunk partitions ahead of ingestion, once per process and key."""
+
+    def __init__(self) -> None:
+        self._ready: set[tuple[str, str]] = set()
+
+    async def ensure(self, settings: AppSettings, permit_type: str | None, region: str | None) -> None:
+        key = (permit_type or "", region or "")
+        if key in self._ready:
+            return
+        statements = partition_ddl(settings, *key)
+        if statements:
+            # Its own short transaction: the DDL locks the parent table, so it must not
+            # wait behind (or hold up) the ingestion transaction writing chunks.
+            async with get_engine().begin() as connection:
+                for statement in statements:
+                    await connection.execute(text(statement))
+            logger.info("chunk_partition_ready", permit_type=key[0], region=key[1])
+        self._ready.add(key)
+
+
+@lru_cache(maxsize=1)
+def get_partition_router() -> PartitionRouter:
+    return PartitionRouter()
@@ -91,6 +91,16 @@ async def _ensure_sqlite_schema(engine: AsyncEngine) -> None:
     _sqlite_initialized = True
 
 
+def dialect_name(session: AsyncSession) -> str | None:
+    """Dialect of the engine or connection ``session`` is bound to, if it is bound."""
+    bind = getattr(session, "bind", None)
+    if bind is None:
+        return None
+    sync_engine = getattr(bind, "sync_engine", None)
+    dialect = sync_engine.dialect if sync_engine is not None else bind.dialect
+    return str(dialect.name)
+
+
 def get_engine() -> AsyncEngine:
     global _engine
     if _engine is None:
@@ -0,0 +1,104 @@
+"""DDL and per-query tuning for the pgvector ANN index on ``chunks.embedding``.
+
+With ``VECTOR_STORAGE=halfvec`` or ``binary`` the ANN index is built on a generated,
+quantized copy of the embedding (``chunks.embedding_quantized``) instead of the float
+column. Searches then take ``rescore_candidates`` coarse neighbours from that index and
+rescore them with exact float cosine distance.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import AppSettings
+
+ANN_INDEX_NAME = "ix_chunks_embedding_ann"
+QUANTIZED_COLUMN = "embedding_quantized"
+# pgvector cannot build HNSW/IVFFlat indexes on ``vector`` columns wider than this.
+MAX_INDEXED_DIMENSIONS = 2000
+
+
+class _Quantization(NamedTuple):
+    column_type: str
+    # SQL turning a float ``vector`` expression (``{value}``) into the quantized type.
+    quantize: str
+    opclass: str
+    operator: str
+    max_indexed_dimensions: int
+
+
+_QUANTIZATIONS = {
+    "halfvec": _Quantization("halfvec({dim})", "CAST({value} AS halfvec({dim}))", "halfvec_cosine_ops", "<=>", 4000),
+    "binary": _Quantization("bit({dim})", "binary_quantize({value})", "bit_hamming_ops", "<~>", 64000),
+}
+
+
+def quantized_column_sql(settings: AppSettings, table: str = "chunks") -> str | None:
+    """``ADD COLUMN`` for the generated quantized embedding, if ``VECTOR_STORAGE`` asks for one."""
+    quantization = _QUANTIZATIONS.get(settings.vector_storage)
+    if quantization is None:
+        return None
+    dim = int(settings.vector_dim)
+    expression = quantization.quantize.format(value="embedding", dim=dim)
+    return (
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {QUANTIZED_COLUMN} "
+        f"{quantization.column_type.format(dim=dim)} GENERATED ALWAYS AS ({expression}) STORED"
+    )
+
+
+def create_index_sql(settings: AppSettings, table: str = "chunks", name: str = ANN_INDEX_NAME) -> str | None:
+    """``CREATE INDEX`` statement for the configured index type, if any."""
+    column, opclass, max_dimensions = "embedding", "vector_cosine_ops", MAX_INDEXED_DIMENSIONS
+    quantization = _QUANTIZATIONS.get(settings.vector_storage)
+    if quantization is not None:
+        column, opclass, max_dimensions = QUANTIZED_COLUMN, quantization.opclass, quantization.max_indexed_dimensions
+    if settings.vector_index_type == "none" or settings.vector_dim > max_dimensions:
+        return None
+    if settings.vector_index_type == "hnsw":
+        options = f"m = {int(settings.vector_hnsw_m)}, ef_construction = {int(settings.vector_hnsw_ef_construction)}"
+    else:
+        options = f"lists = {int(settings.vector_ivfflat_lists)}"
+    # Postgres cannot build indexes on a partitioned table concurrently; each partition gets its own.
+    concurrently = " CONCURRENTLY" if settings.chunk_partitioning == "none" else ""
+    return (
+        f"CREATE INDEX{concurrently} IF NOT EXISTS {name} ON {table} "
+        f"USING {settings.vector_index_type} ({column} {opclass}) WITH ({options})"
+    )
+
+
+def coarse_distance_sql(settings: AppSettings, parameter: str = "query") -> str:
+    """Distance between ``embedding_quantized`` and the float vector bound as ``:parameter``."""
+    quantization = _QUANTIZATIONS[settings.vector_storage]
+    dim = int(settings.vector_dim)
+    query = quantization.quantize.format(value=f"CAST(:{parameter} AS vector({dim}))", dim=dim)
+    return f"{QUANTIZED_COLUMN} {quantization.operator} {query}"
+
+
+def rescore_candidates(settings: AppSettings) -> int:
+    """How many coarse neighbours the quantized index hands to exact float rescoring."""
+    return int(settings.retrieval_topk) * max(1, int(settings.vector_rescore_oversample))
+
+
+def query_parameters(settings: AppSettings) -> dict[str, str]:
+    """Search-time knobs for the configured index type."""
+    if settings.vector_index_type == "hnsw":
+        ef_search = int(settings.vector_hnsw_ef_search)
+        if settings.vector_storage in _QUANTIZATIONS:
+            # An HNSW scan yields at most ef_search rows; rescoring needs every candidate.
+            ef_search = max(ef_search, rescore_candidates(settings))
+        return {"hnsw.ef_search": str(ef_search)}
+    if settings.vector_index_type == "ivfflat":
+        return {"ivfflat.probes": str(int(settings.vector_ivfflat_probes))}
+    return {}
+
+
+async def apply_query_parameters(session: AsyncSession, settings: AppSettings) -> None:
+    """Scope the search-time knobs to the session's current transaction."""
+    await set_query_parameters(session, query_parameters(settings))
+
+
+async def set_query_parameters(session: AsyncSession, parameters: dict[str, str]) -> None:
+    for name, value in parameters.items():
+        await session.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
@@ -12,8 +12,10 @@ from structlog.contextvars import bind_contextvars, clear_contextvars
 
 from app.api.router import router
 from app.core.config import get_settings
+from app.core.errors import ModelUnavailableError
 from app.core.logging import configure_logging, get_logger
 from app.db.migrations import apply_migrations
+from app.services.llm.transport import get_llm_transport
 from app.utils.auth import decode_jwt
 from app.utils.ids import generate_request_id
 from app.utils.rate_limiter import rate_limiter
@@ -167,6 +169,15 @@ async def request_context_middleware(
     return response
 
 
+@app.exception_handler(ModelUnavailableError)
+async def model_unavailable_handler(request: Request, exc: ModelUnavailableError) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=503,
+        content={"error": "model_unavailable", "message": str(exc)},
+        headers={"Retry-After": str(int(settings.llm_breaker_cooldown_seconds))},
+    )
+
+
 @app.get("/", include_in_schema=False)
 async def root() -> dict[str, str]:
     return {"status": "ok"}
@@ -180,9 +191,11 @@ async def startup_event() -> None:
     except Exception:
         logger.exception("migrations_failed")
         raise
+    await get_llm_transport().open()
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
     logger.info("app_shutdown")
+    await get_llm_transport().aclose()
     await asyncio.sleep(0)
@@ -3,8 +3,11 @@ from app.models.entities import (
     AutopilotJob,
     AutopilotJobStatus,
     Chunk,
+    ChunkFilterCount,
     Document,
     DocumentType,
+    EmbeddingCacheEntry,
+    IndexState,
     Template,
 )
 
@@ -13,7 +16,10 @@ __all__ = [
     "AutopilotJobStatus",
     "Base",
     "Chunk",
+    "ChunkFilterCount",
     "Document",
     "DocumentType",
+    "EmbeddingCacheEntry",
+    "IndexState",
     "Template",
 ]
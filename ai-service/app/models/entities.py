@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import enum
-from datetime import datetime
+from datetime import date, datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy import BigInteger, Date, DateTime, Enum, ForeignKey, Index, Integer, LargeBinary, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import get_settings
 from app.models.base import Base
 
 
@@ -24,25 +25,73 @@ class Document(Base):
     type: Mapped[DocumentType] = mapped_column(Enum(DocumentType, name="document_type"), nullable=False)
     uploaded_by: Mapped[str | None] = mapped_column(String(128), nullable=True)
     sha256: Mapped[str] = mapped_column(String(128), nullable=False)
+    permit_type: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    region: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    title: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    version_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    language: Mapped[str] = mapped_column(String(8), nullable=False, default="id")
+    selectors: Mapped[dict[str, object] | None] = mapped_column(Base.JSONType, nullable=True)
+    ingested_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now(), nullable=False)
 
     chunks: Mapped[list[Chunk]] = relationship(back_populates="document", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_documents_permit_type_region", "permit_type", "region"),
+        Index("ix_documents_region", "region"),
+    )
+
 
 class Chunk(Base):
     __tablename__ = "chunks"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    # Copies of the document's values ("" when unset): the partition keys, see app.db.partitions.
+    permit_type: Mapped[str] = mapped_column(String(32), nullable=False, default="")
+    region: Mapped[str] = mapped_column(String(32), nullable=False, default="")
     text: Mapped[str] = mapped_column(Text, nullable=False)
+    # Only ``section`` and ``order``; source metadata lives on the document.
     chunk_metadata: Mapped[dict[str, object]] = mapped_column(
         "metadata", Base.JSONType, nullable=False
     )
-    embedding: Mapped[list[float]] = mapped_column(Vector, nullable=False)
+    # Matches the vector(VECTOR_DIM) column the migrations and the reembed CLI create.
+    embedding: Mapped[list[float]] = mapped_column(Vector(get_settings().vector_dim), nullable=False)
 
     document: Mapped[Document] = relationship(back_populates="chunks")
 
 
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    model: Mapped[str] = mapped_column(String(128), primary_key=True)
+    dimension: Mapped[int] = mapped_column(Integer, primary_key=True)
+    text_sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    vector: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class IndexState(Base):
+    """Single-row counter bumped whenever ingestion changes the retrievable corpus."""
+
+    __tablename__ = "index_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    generation: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ChunkFilterCount(Base):
+    """Chunks per (``permit_type``, ``region``), kept current by ingestion for query planning.
+
+    Missing metadata values are stored as ``""``.
+    """
+
+    __tablename__ = "chunk_filter_counts"
+
+    permit_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    region: Mapped[str] = mapped_column(String(32), primary_key=True)
+    chunks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
 class Template(Base):
     __tablename__ = "templates"
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -67,6 +67,26 @@ class RetrievalMeta(BaseModel):
         description="ISO date of the most recent regulatory update considered.",
         examples=["2024-07-01"],
     )
+    vector_strategy: Literal["ann", "ann_filtered", "exact", "partition"] | None = Field(
+        default=None,
+        description="How the vector search ran for the permit_type/region filters, as chosen by the query planner.",
+        examples=["ann_filtered"],
+    )
+    filter_selectivity: float | None = Field(
+        default=None,
+        description="Estimated share of indexed chunks passing the filters (1.0 without filters).",
+        examples=[0.12],
+    )
+    filter_rows: int | None = Field(
+        default=None,
+        description="Estimated number of chunks passing the filters.",
+        examples=[18240],
+    )
+    answer_cache: Literal["exact", "semantic"] | None = Field(
+        default=None,
+        description="Set when the answer was served from the answer cache, by match type.",
+        examples=["semantic"],
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -25,11 +25,12 @@ class FieldResolver:
             "region": context.get("region"),
             "business_profile": context.get("business_profile"),
             "uploaded_docs": context.get("uploaded_docs"),
-            "form_schema": self.schema,
             "known_mappings": self.known_mappings,
             "missing_fields": missing_fields,
         }
-        response = await self.gemini.call_resolver(self.prompt, payload)
+        # The schema is identical for every request against a template version, so it
+        # travels with the system prompt as a cacheable prefix.
+        response = await self.gemini.call_resolver(self.prompt, payload, static_context={"form_schema": self.schema})
         records = self._parse_response(response)
         return records
 
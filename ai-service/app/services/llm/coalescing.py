@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+import orjson
+
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_calls_total = metrics.counter("llm_coalesce_calls_total", "LLM calls routed through single-flight, by method.")
+_shared_total = metrics.counter(
+    "llm_coalesce_shared_total", "LLM calls that joined an identical in-flight upstream call, by method."
+)
+_abandoned_total = metrics.counter(
+    "llm_coalesce_abandoned_total", "Upstream calls cancelled because every waiter went away, by method."
+)
+_ratio = metrics.gauge("llm_coalesce_ratio", "Share of LLM calls served by another caller's in-flight request.")
+
+
+def request_key(endpoint: str, payload: dict[str, Any]) -> str:
+    body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(endpoint.encode("utf-8") + b"\0" + body).hexdigest()
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: asyncio.Task[T]
+    label: str
+    waiters: int = field(default=0)
+
+
+class SingleFlight(Generic[T]):
+    """Share one upstream awaitable between concurrent callers with the same key.
+
+    The upstream call runs in its own task. A waiter that is cancelled only detaches
+    itself; the upstream task is cancelled once the last waiter has gone. Results are
+    not cached: the key is released as soon as the upstream call settles.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight[T]] = {}
+        self._calls = 0
+        self._shared = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]], label: str = "call") -> T:
+        flight = self._flights.get(key)
+        self._calls += 1
+        _calls_total.inc(method=label)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(factory()), label=label)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._release(key, flight))
+        else:
+            self._shared += 1
+            _shared_total.inc(method=label)
+        _ratio.set(self._shared / self._calls)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+                self._release(key, flight)
+                _abandoned_total.inc(method=flight.label)
+                logger.debug("llm_coalesce_abandoned", method=flight.label)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _release(self, key: str, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.task.done() and not flight.task.cancelled():
+            # Mark the exception as retrieved when every waiter already left.
+            flight.task.exception()
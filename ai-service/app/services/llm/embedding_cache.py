@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.session import get_sessionmaker
+from app.models import EmbeddingCacheEntry
+
+logger = get_logger(__name__)
+
+_hits_total = metrics.counter("embedding_cache_hits_total", "Embedding cache hits by tier (memory/store).")
+_misses_total = metrics.counter("embedding_cache_misses_total", "Embedding lookups that required a provider call.")
+_evictions_total = metrics.counter("embedding_cache_evictions_total", "Entries evicted from the in-process LRU.")
+_store_errors_total = metrics.counter(
+    "embedding_cache_store_errors_total", "Failed reads/writes against the persistent embedding cache."
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class EmbeddingKey:
+    model: str
+    dimension: int
+    text_sha256: str
+
+    @classmethod
+    def for_text(cls, model: str, dimension: int, text: str) -> EmbeddingKey:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return cls(model=model, dimension=dimension, text_sha256=digest)
+
+
+class EmbeddingCache:
+    """Bounded in-process LRU backed by the ``embedding_cache`` table.
+
+    Keys include the embedding model and dimension, so changing ``GEMINI_MODEL_EMBED``
+    or ``VECTOR_DIM`` never serves stale vectors; rows written under another model or
+    dimension are purged on first store access.
+    In SQLite fallback mode the table lives in the fallback database file.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        persist: bool = True,
+        sessionmaker: Callable[[], async_sessionmaker[AsyncSession]] = get_sessionmaker,
+    ) -> None:
+        self.max_entries = max_entries
+        self.persist = persist
+        self._sessionmaker = sessionmaker
+        self._entries: OrderedDict[EmbeddingKey, list[float]] = OrderedDict()
+        self._purged_scopes: set[tuple[str, int]] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_many(self, keys: Iterable[EmbeddingKey]) -> dict[EmbeddingKey, list[float]]:
+        found: dict[EmbeddingKey, list[float]] = {}
+        pending: list[EmbeddingKey] = []
+        for key in dict.fromkeys(keys):
+            vector = self._entries.get(key)
+            if vector is None:
+                pending.append(key)
+                continue
+            self._entries.move_to_end(key)
+            found[key] = vector
+        if found:
+            _hits_total.inc(len(found), tier="memory")
+        if pending and self.persist:
+            stored = await self._load(pending)
+            if stored:
+                _hits_total.inc(len(stored), tier="store")
+                for key, vector in stored.items():
+                    self._remember(key, vector)
+                found.update(stored)
+        missing = sum(1 for key in pending if key not in found)
+        if missing:
+            _misses_total.inc(missing)
+        return found
+
+    async def put_many(self, items: dict[EmbeddingKey, list[float]]) -> None:
+        for key, vector in items.items():
+            self._remember(key, vector)
+        if items and self.persist:
+            await self._store(items)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _remember(self, key: EmbeddingKey, vector: list[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            _evictions_total.inc()
+
+    async def _load(self, keys: list[EmbeddingKey]) -> dict[EmbeddingKey, list[float]]:
+        by_scope: dict[tuple[str, int], dict[str, EmbeddingKey]] = {}
+        for key in keys:
+            by_scope.setdefault((key.model, key.dimension), {})[key.text_sha256] = key
+        found: dict[EmbeddingKey, list[float]] = {}
+        try:
+            async with self._sessionmaker()() as session:
+                for (model, dimension), digests in by_scope.items():
+                    await self._purge_other_scopes(session, model, dimension)
+                    stmt = select(EmbeddingCacheEntry).where(
+                        EmbeddingCacheEntry.model == model,
+                        EmbeddingCacheEntry.dimension == dimension,
+                        EmbeddingCacheEntry.text_sha256.in_(list(digests)),
+                    )
+                    for row in (await session.execute(stmt)).scalars():
+                        found[digests[row.text_sha256]] = _decode(row.vector)
+        except SQLAlchemyError as exc:
+            _store_errors_total.inc(op="load")
+            logger.warning("embedding_cache_load_failed", error=str(exc))
+        return found
+
+    async def _store(self, items: dict[EmbeddingKey, list[float]]) -> None:
+        try:
+            async with self._sessionmaker()() as session:
+                for key, vector in items.items():
+                    await session.merge(
+                        EmbeddingCacheEntry(
+                            model=key.model,
+                            dimension=key.dimension,
+                            text_sha256=key.text_sha256,
+                            vector=_encode(vector),
+                        )
+                    )
+                await session.commit()
+        except SQLAlchemyError as exc:
+            _store_errors_total.inc(op="store")
+            logger.warning("embedding_cache_store_failed", error=str(exc))
+
+    async def _purge_other_scopes(self, session: AsyncSession, model: str, dimension: int) -> None:
+        if (model, dimension) in self._purged_scopes:
+            return
+        result = await session.execute(
+            delete(EmbeddingCacheEntry).where(
+                (EmbeddingCacheEntry.model != model) | (EmbeddingCacheEntry.dimension != dimension)
+            )
+        )
+        await session.commit()
+        self._purged_scopes.add((model, dimension))
+        purged = getattr(result, "rowcount", 0) or 0
+        if purged:
+            logger.info("embedding_cache_purged_stale_model", model=model, dimension=dimension, rows=purged)
+
+
+def _encode(vector: list[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _decode(data: bytes) -> list[float]:
+    return [float(value) for value in np.frombuffer(data, dtype=np.float32)]
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    settings = get_settings()
+    return EmbeddingCache(
+        max_entries=settings.embedding_cache_max_entries,
+        persist=settings.embedding_cache_persist,
+    )
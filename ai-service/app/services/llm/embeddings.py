@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import unicodedata
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol, cast
+
+import numpy as np
+
+from app.core.config import AppSettings
+
+PostFn = Callable[..., Awaitable[dict[str, Any]]]
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+
+class EmbeddingProvider(Protocol):
+    """Turns texts into fixed-size vectors; ``model_id``/``dimension_key`` scope cache entries."""
+
+    model_id: str
+    dimension_key: int
+
+    async def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+class GeminiEmbeddingProvider:
+    """Remote embeddings through ``embedContent`` / ``batchEmbedContents``.
+
+    Every request asks for ``outputDimensionality=dimension``. Reduced-size Gemini
+    embeddings are truncations of the full vector and are not unit length, so each
+    vector is cut to ``dimension`` (should the API ignore the parameter) and
+    L2-renormalised.
+    """
+
+    def __init__(
+        self, post: PostFn, model_path: str, batch_size: int, max_concurrency: int, dimension: int
+    ) -> None:
+        self._post = post
+        self.model_id = model_path
+        self.dimension = dimension
+        self.dimension_key = dimension
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [await self._embed_single(texts[0])]
+        size = max(1, self.batch_size)
+        batches = [texts[start : start + size] for start in range(0, len(texts), size)]
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def run(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._embed_batch(batch)
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    async def _embed_single(self, text: str) -> list[float]:
+        payload = {
+            "model": self.model_id,
+            "content": {
+                "parts": [{"text": text}],
+            },
+            "outputDimensionality": self.dimension,
+        }
+        endpoint = f"{self.model_id}:embedContent"
+        data = await self._post(endpoint, payload, call_type="embed")
+        embedding: Any | None = data.get("embedding")
+        if embedding is None and "embeddings" in data:
+            embeddings = data.get("embeddings")
+            if isinstance(embeddings, list) and embeddings:
+                embedding = embeddings[0]
+        return self._fit(parse_embedding(embedding))
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        payload = {
+            "requests": [
+                {"model": self.model_id, "content": {"parts": [{"text": text}]}, "outputDimensionality": self.dimension}
+                for text in texts
+            ]
+        }
+        endpoint = f"{self.model_id}:batchEmbedContents"
+        data = await self._post(endpoint, payload, call_type="embed")
+        embeddings = data.get("embeddings")
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            raise ValueError("Batch embedding response size mismatch from Gemini")
+        return [self._fit(parse_embedding(embedding)) for embedding in embeddings]
+
+    def _fit(self, values: list[float]) -> list[float]:
+        if len(values) < self.dimension:
+            raise ValueError(f"Gemini returned {len(values)} dimensions, expected {self.dimension}")
+        vector = np.asarray(values[: self.dimension], dtype=np.float64)
+        norm = float(np.linalg.norm(vector))
+        return cast(list[float], (vector / norm).tolist() if norm else vector.tolist())
+
+
+def parse_embedding(embedding: Any) -> list[float]:
+    values = None
+    if isinstance(embedding, dict):
+        values = embedding.get("values") or embedding.get("value")
+    if not isinstance(values, list):
+        raise ValueError("Empty embedding response from Gemini")
+    try:
+        return [float(value) for value in values]
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid embedding response from Gemini") from exc
+
+
+class HashingEmbeddingProvider:
+    """CPU-only embeddings from signed feature hashing of character n-grams.
+
+    Every UTF-8 byte n-gram (``ngram_range`` inclusive) of the lower-cased text is hashed
+    with 64-bit FNV-1a into one of ``dimension`` buckets with a hash-derived sign; counts
+    are log-damped and L2-normalised. The projection is stateless, so queries and
+    documents embedded on different hosts agree without a fitted vocabulary. A whole
+    batch is hashed in one pass over the concatenated bytes.
+    """
+
+    version = "v1"
+
+    def __init__(self, dimension: int, ngram_range: tuple[int, int] = (3, 5)) -> None:
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+        self.model_id = f"local/hashing-{self.version}-n{ngram_range[0]}{ngram_range[1]}"
+        self.dimension_key = dimension
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        if sum(len(text) for text in texts) > 200_000:
+            matrix = await asyncio.to_thread(self.embed_matrix, texts)
+        else:
+            matrix = self.embed_matrix(texts)
+        return cast(list[list[float]], matrix.tolist())
+
+    def embed_matrix(self, texts: list[str]) -> np.ndarray:
+        encoded = [
+            f" {unicodedata.normalize('NFKC', text).lower()} ".encode() for text in texts
+        ]
+        lengths = np.fromiter((len(item) for item in encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        doc_ids = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+        ends = np.cumsum(lengths)
+
+        counts = np.zeros(len(encoded) * self.dimension, dtype=np.float64)
+        with np.errstate(over="ignore"):
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                starts = len(data) - n + 1
+                if starts <= 0:
+                    continue
+                hashes = np.full(starts, _FNV_OFFSET ^ np.uint64(n), dtype=np.uint64)
+                for offset in range(n):
+                    hashes ^= data[offset : offset + starts]
+                    hashes *= _FNV_PRIME
+                start_docs = doc_ids[:starts]
+                valid = np.arange(starts) + n <= ends[start_docs]
+                hashes = hashes[valid]
+                buckets = (hashes % np.uint64(self.dimension)).astype(np.int64)
+                signs = np.where((hashes >> np.uint64(63)) == 1, -1.0, 1.0)
+                np.add.at(counts, start_docs[valid] * self.dimension + buckets, signs)
+
+        matrix = counts.reshape(len(encoded), self.dimension)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return cast(np.ndarray, (matrix / norms).astype(np.float32))
+
+
+def build_embedding_provider(settings: AppSettings, post: PostFn, model_path: str) -> EmbeddingProvider:
+    if settings.embedding_provider == "local":
+        return HashingEmbeddingProvider(settings.vector_dim)
+    return GeminiEmbeddingProvider(
+        post,
+        model_path,
+        batch_size=settings.llm_embed_batch_size,
+        max_concurrency=settings.llm_embed_max_concurrency,
+        dimension=settings.vector_dim,
+    )
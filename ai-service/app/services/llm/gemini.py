@@ -1,34 +1,66 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from collections.abc import Iterable
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterable
 from functools import lru_cache
 from typing import Any, cast
 
 import httpx
+import orjson
 from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
 
-from app.core.config import get_settings
+from app.core.config import AppSettings, get_settings
 from app.core.logging import get_logger
+from app.services.llm.coalescing import SingleFlight, request_key
+from app.services.llm.embedding_cache import EmbeddingCache, EmbeddingKey, get_embedding_cache
+from app.services.llm.embeddings import EmbeddingProvider, build_embedding_provider
+from app.services.llm.governor import LLMGovernor, estimate_tokens, get_llm_governor
+from app.services.llm.hedging import Hedger
+from app.services.llm.prefix_cache import PrefixCache
+from app.services.llm.telemetry import CallTelemetry, model_from_endpoint, should_log_payload
+from app.services.llm.transport import LLMTransport, get_llm_transport
 
 logger = get_logger(__name__)
 
 
 class GeminiClient:
-    def __init__(self) -> None:
-        settings = get_settings()
+    def __init__(
+        self,
+        transport: LLMTransport | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        governor: LLMGovernor | None = None,
+        embedder: EmbeddingProvider | None = None,
+        prefix_cache: PrefixCache | None = None,
+        settings: AppSettings | None = None,
+    ) -> None:
+        settings = settings or get_settings()
+        self._transport = transport or get_llm_transport()
+        if embedding_cache is None and settings.embedding_cache_enabled:
+            embedding_cache = get_embedding_cache()
+        self._embedding_cache = embedding_cache
+        self._governor = governor or get_llm_governor()
+        if prefix_cache is None and settings.llm_prefix_cache_enabled:
+            prefix_cache = PrefixCache(settings)
+        self._prefix_cache = prefix_cache
+        self._hedger = Hedger(settings) if settings.llm_hedge_enabled else None
+        self._singleflight: SingleFlight[dict[str, Any]] | None = (
+            SingleFlight() if settings.llm_coalesce_enabled else None
+        )
         self._api_key = settings.gemini_api_key.get_secret_value()
         self._qa_model = settings.gemini_model_qa
         self._embed_model = settings.gemini_model_embed
         self._qa_model_path = self._normalize_model_name(self._qa_model)
         self._embed_model_path = self._normalize_model_name(self._embed_model)
-        self._timeout = settings.llm_timeout_seconds
         self._max_retries = settings.llm_max_retries
-        self._base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self._payload_log_sample_rate = settings.llm_payload_log_sample_rate
+        self._base_url = settings.gemini_base_url.rstrip("/")
         self._default_headers = {
             "x-goog-api-key": self._api_key,
             "Content-Type": "application/json",
         }
+        self._embedder = embedder or build_embedding_provider(settings, self._post, self._embed_model_path)
 
     def _normalize_model_name(self, model_name: str) -> str:
         """
@@ -39,87 +71,237 @@ class GeminiClient:
             return model_name
         return f"models/{model_name}"
 
-    async def _post(self, endpoint: str, payload: dict[str, Any]) -> dict[str, Any]:
+    async def _post(
+        self, endpoint: str, payload: dict[str, Any], call_type: str, attempts: int | None = None
+    ) -> dict[str, Any]:
+        def call() -> Awaitable[dict[str, Any]]:
+            if self._hedger is None:
+                return self._send(endpoint, payload, call_type, attempts)
+            return self._hedger.run(call_type, lambda: self._send(endpoint, payload, call_type, attempts))
+
+        if self._singleflight is None:
+            return await call()
+        return await self._singleflight.do(request_key(endpoint, payload), call, label=call_type)
+
+    async def _send(
+        self, endpoint: str, payload: dict[str, Any], call_type: str, attempts: int | None = None
+    ) -> dict[str, Any]:
         url = f"{self._base_url}/{endpoint}"
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
+        body = orjson.dumps(payload)
+        estimated_tokens = estimate_tokens(len(body))
+        telemetry = CallTelemetry(call_type, model_from_endpoint(endpoint), request_bytes=len(body))
+        outcome = "error"
+        try:
             async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(self._max_retries),
+                stop=stop_after_attempt(attempts or self._max_retries),
                 wait=wait_exponential(min=1, max=8),
                 retry=retry_if_exception_type(httpx.HTTPError),
                 reraise=True,
             ):
                 with attempt:
-                    response = await client.post(url, json=payload, headers=self._default_headers)
+                    telemetry.begin_attempt()
+                    queued_at = time.perf_counter()
+                    await self._governor.acquire(estimated_tokens)
+                    telemetry.queued(time.perf_counter() - queued_at)
+                    status: int | None = None
+                    used_tokens: int | None = None
+                    cancelled = False
                     try:
-                        response.raise_for_status()
-                    except httpx.HTTPStatusError as exc:  # pragma: no cover - defensive log
-                        logger.error(
-                            "gemini_api_error",
-                            url=url,
-                            status=exc.response.status_code,
-                            response_body=exc.response.text,
+                        telemetry.sent()
+                        response = await self._transport.post(
+                            url, content=body, headers=self._default_headers, trace=telemetry.trace
                         )
+                        telemetry.headers_received()
+                        status = telemetry.status = response.status_code
+                        telemetry.response_bytes = len(response.content)
+                        try:
+                            response.raise_for_status()
+                        except httpx.HTTPStatusError as exc:  # pragma: no cover - defensive log
+                            logger.error(
+                                "gemini_api_error",
+                                url=url,
+                                status=exc.response.status_code,
+                                response_body=exc.response.text,
+                            )
+                            raise
+                        data = cast(dict[str, Any], response.json())
+                        telemetry.usage(data)
+                        used_tokens = data.get("usageMetadata", {}).get("totalTokenCount")
+                    except asyncio.CancelledError:
+                        cancelled = True
                         raise
-                    data = cast(dict[str, Any], response.json())
-                    logger.debug("gemini_api_response", payload=payload, data=data)
+                    finally:
+                        if cancelled:
+                            self._governor.abandon()
+                        else:
+                            self._governor.release(status, estimated_tokens, used_tokens)
+                    if should_log_payload(self._payload_log_sample_rate):
+                        logger.debug("gemini_api_response", payload=payload, data=data)
+                    outcome = "ok"
                     return data
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            telemetry.finish(outcome)
         raise RuntimeError("Gemini API call failed")
 
     async def embed_text(self, text: str) -> list[float]:
-        payload = {
-            "model": self._embed_model_path,
-            "content": {
-                "parts": [{"text": text}],
-            },
-        }
-        endpoint = f"{self._embed_model_path}:embedContent"
-        data = await self._post(endpoint, payload)
-        embedding: Any | None = data.get("embedding")
-        if embedding is None and "embeddings" in data:
-            embeddings = data.get("embeddings")
-            if isinstance(embeddings, list) and embeddings:
-                embedding = embeddings[0]
-        values = None
-        if isinstance(embedding, dict):
-            values = embedding.get("values") or embedding.get("value")
-        if not isinstance(values, list):
-            raise ValueError("Empty embedding response from Gemini")
-        try:
-            return [float(value) for value in values]
-        except (TypeError, ValueError) as exc:
-            raise ValueError("Invalid embedding response from Gemini") from exc
+        return (await self.embed_texts([text]))[0]
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed many texts with the configured provider, preserving input order.
+
+        Cached vectors are served first; only the remaining unique texts reach the
+        provider (``EMBEDDING_PROVIDER``), which batches remote calls as needed.
+        """
+        if not texts:
+            return []
+        if self._embedding_cache is None:
+            return await self._embedder.embed(texts)
+        keys = [self._embedding_key(text) for text in texts]
+        vectors = await self._embedding_cache.get_many(keys)
+        pending = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if pending:
+            fresh = dict(zip(pending, await self._embedder.embed(list(pending.values()))))
+            await self._embedding_cache.put_many(fresh)
+            vectors.update(fresh)
+        return [vectors[key] for key in keys]
+
+    def _embedding_key(self, text: str) -> EmbeddingKey:
+        return EmbeddingKey.for_text(self._embedder.model_id, self._embedder.dimension_key, text)
 
     async def generate_answer(self, prompt: str, contents: Iterable[dict[str, Any]]) -> dict[str, Any]:
-        payload = {
-            "system_instruction": {"parts": [{"text": prompt}]},
-            "contents": list(contents),
-            "safetySettings": [
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_LOW_AND_ABOVE"}
-            ],
-        }
-        endpoint = f"{self._qa_model_path}:generateContent"
-        return await self._post(endpoint, payload)
+        return await self._generate(prompt, list(contents), [], call_type="generate", extra=_SAFETY)
 
-    async def call_resolver(self, prompt: str, context: dict[str, Any]) -> dict[str, Any]:
-        payload = {
-            "system_instruction": {"parts": [{"text": prompt}]},
-            "contents": [
-                {
-                    "role": "user",
-                    "parts": [
-                        {
-                            "text": json.dumps(context, ensure_ascii=False),
-                        }
-                    ],
-                }
-            ],
-        }
+    async def stream_answer(
+        self, prompt: str, contents: Iterable[dict[str, Any]]
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield partial ``GenerateContentResponse`` objects from ``streamGenerateContent``."""
+        handle = await self._prefix_handle(prompt, [])
+        if handle is not None:
+            payload = {"cachedContent": handle, "contents": list(contents), **_SAFETY}
+        else:
+            payload = {"system_instruction": _system(prompt), "contents": list(contents), **_SAFETY}
+        body = orjson.dumps(payload)
+        estimated_tokens = estimate_tokens(len(body))
+        url = f"{self._base_url}/{self._qa_model_path}:streamGenerateContent?alt=sse"
+        telemetry = CallTelemetry("generate", model_from_endpoint(self._qa_model_path), request_bytes=len(body))
+        telemetry.begin_attempt()
+        queued_at = time.perf_counter()
+        await self._governor.acquire(estimated_tokens)
+        telemetry.queued(time.perf_counter() - queued_at)
+        status: int | None = None
+        cancelled = False
+        outcome = "error"
+        try:
+            telemetry.sent()
+            async with self._transport.stream(
+                url, content=body, headers=self._default_headers, trace=telemetry.trace
+            ) as response:
+                telemetry.headers_received()
+                status = telemetry.status = response.status_code
+                if response.is_error:
+                    await response.aread()
+                    logger.error(
+                        "gemini_api_error",
+                        url=url,
+                        status=response.status_code,
+                        response_body=response.text,
+                    )
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    telemetry.response_bytes += len(line) + 1
+                    if not line.startswith("data:"):
+                        continue
+                    data = line.removeprefix("data:").strip()
+                    if not data:
+                        continue
+                    try:
+                        event = json.loads(data)
+                    except json.JSONDecodeError:
+                        logger.warning("gemini_stream_parse_failed", line=data[:200])
+                        continue
+                    if isinstance(event, dict):
+                        telemetry.usage(event)
+                        yield event
+            outcome = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled = True
+            outcome = "cancelled"
+            raise
+        finally:
+            if cancelled:
+                self._governor.abandon()
+            else:
+                self._governor.release(status, estimated_tokens)
+            if handle is not None and outcome == "error" and self._prefix_cache is not None:
+                self._prefix_cache.invalidate(handle)
+            telemetry.finish(outcome)
+
+    async def call_resolver(
+        self,
+        prompt: str,
+        context: dict[str, Any],
+        static_context: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Run a JSON-in/JSON-out resolver prompt.
+
+        ``static_context`` holds request-independent inputs (e.g. a template
+        ``form_schema``); with prefix caching enabled it is registered together with
+        the system prompt and reused by handle, otherwise it is merged into ``context``.
+        """
+        if static_context and self._prefix_cache is not None:
+            prefix_turns = [_user_turn(static_context)]
+        else:
+            prefix_turns = []
+            context = {**(static_context or {}), **context}
+        return await self._generate(prompt, [_user_turn(context)], prefix_turns, call_type="resolver")
+
+    async def _generate(
+        self,
+        prompt: str,
+        contents: list[dict[str, Any]],
+        prefix_turns: list[dict[str, Any]],
+        call_type: str,
+        extra: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
         endpoint = f"{self._qa_model_path}:generateContent"
-        return await self._post(endpoint, payload)
+        handle = await self._prefix_handle(prompt, prefix_turns)
+        if handle is not None:
+            payload = {"cachedContent": handle, "contents": contents, **(extra or {})}
+            try:
+                # One attempt only: any failure falls through to the retried inline path.
+                return await self._post(endpoint, payload, call_type=call_type, attempts=1)
+            except httpx.HTTPError as exc:
+                logger.warning("llm_prefix_cache_call_failed", handle=handle, error=str(exc))
+                cast(PrefixCache, self._prefix_cache).invalidate(handle)
+        payload = {"system_instruction": _system(prompt), "contents": [*prefix_turns, *contents], **(extra or {})}
+        return await self._post(endpoint, payload, call_type=call_type)
+
+    async def _prefix_handle(self, prompt: str, prefix_turns: list[dict[str, Any]]) -> str | None:
+        if self._prefix_cache is None or not prompt:
+            return None
+        prefix: dict[str, Any] = {"model": self._qa_model_path, "systemInstruction": _system(prompt)}
+        if prefix_turns:
+            prefix["contents"] = prefix_turns
+
+        async def create(ttl_seconds: int) -> str:
+            data = await self._post("cachedContents", {**prefix, "ttl": f"{ttl_seconds}s"}, "cache", attempts=1)
+            return str(data["name"])
 
-    async def rerank(self, query: str, candidates: list[str]) -> list[int]:
+        return await self._prefix_cache.get_or_create(prefix, create)
+
+    async def rerank(self, query: str, candidates: list[str], model: str | None = None) -> list[int]:
+        order, _ = await self.rerank_with_usage(query, candidates, model)
+        return order
+
+    async def rerank_with_usage(
+        self, query: str, candidates: list[str], model: str | None = None
+    ) -> tuple[list[int], dict[str, Any]]:
+        """Rank ``candidates`` with ``model`` (default: the QA model) and return its ``usageMetadata``."""
         if not candidates:
-            return []
+            return [], {}
         payload = {
             "system_instruction": {
                 "parts": [
@@ -135,17 +317,34 @@ class GeminiClient:
                 }
             ],
         }
-        endpoint = f"{self._qa_model_path}:generateContent"
-        data = await self._post(endpoint, payload)
+        model_path = self._normalize_model_name(model) if model else self._qa_model_path
+        endpoint = f"{model_path}:generateContent"
+        data = await self._post(endpoint, payload, call_type="rerank")
+        usage = data.get("usageMetadata") or {}
         try:
             text = data["candidates"][0]["content"]["parts"][0]["text"]
             ranking = json.loads(text)
             order = ranking.get("order")
             if isinstance(order, list):
-                return [int(idx) for idx in order]
+                return [int(idx) for idx in order], usage
         except (KeyError, json.JSONDecodeError, ValueError, TypeError):
             logger.warning("gemini_rerank_parse_failed", data=data)
-        return list(range(len(candidates)))
+        return list(range(len(candidates))), usage
+
+
+_SAFETY: dict[str, Any] = {
+    "safetySettings": [
+        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_LOW_AND_ABOVE"}
+    ]
+}
+
+
+def _system(prompt: str) -> dict[str, Any]:
+    return {"parts": [{"text": prompt}]}
+
+
+def _user_turn(context: dict[str, Any]) -> dict[str, Any]:
+    return {"role": "user", "parts": [{"text": json.dumps(context, ensure_ascii=False)}]}
 
 
 @lru_cache(maxsize=1)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import time
+from collections import deque
+from collections.abc import Callable
+from functools import lru_cache
+
+from app.core.config import AppSettings, get_settings
+from app.core.errors import ModelUnavailableError
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+_OVERLOAD_STATUSES = frozenset({429, 503})
+_FAILURE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_pacing_delay_seconds = metrics.counter(
+    "llm_governor_pacing_delay_seconds_total", "Seconds spent waiting for RPM/TPM budget, by budget."
+)
+_rejected_total = metrics.counter("llm_governor_rejected_total", "Calls rejected because the circuit was open.")
+_concurrency_limit = metrics.gauge("llm_governor_concurrency_limit", "Current AIMD concurrency limit.")
+_circuit_state = metrics.gauge("llm_circuit_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open.")
+_circuit_opened_total = metrics.counter("llm_circuit_opened_total", "Times the LLM circuit breaker opened.")
+
+
+def estimate_tokens(payload_bytes: int) -> int:
+    """Rough prompt size estimate (about four bytes of JSON per token)."""
+    return max(1, payload_bytes // 4)
+
+
+class PacingBucket:
+    """Per-minute budget that hands out reservations instead of rejecting.
+
+    Reserving may drive the balance negative; the caller then sleeps for the returned
+    delay, which queues concurrent callers behind each other in arrival order.
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._clock = clock
+        self._last = clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, amount: float) -> float:
+        if not self.enabled:
+            return 0.0
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Correct a reservation once the real usage is known (positive delta charges more)."""
+        if self.enabled:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class CircuitState(enum.IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class LLMGovernor:
+    """Process-wide admission control for Gemini calls.
+
+    * paces calls against requests-per-minute and tokens-per-minute budgets;
+    * bounds concurrency with an AIMD limit that halves on 429/503 and grows by
+      roughly one slot per window of successful calls;
+    * opens a circuit breaker after consecutive failures so callers fail fast with
+      :class:`ModelUnavailableError` until a half-open probe succeeds.
+    """
+
+    def __init__(self, settings: AppSettings | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        settings = settings or get_settings()
+        self._clock = clock
+        self.requests = PacingBucket(settings.llm_requests_per_minute, clock)
+        self.tokens = PacingBucket(settings.llm_tokens_per_minute, clock)
+        self.min_limit = max(1, settings.llm_concurrency_min)
+        self.max_limit = max(self.min_limit, settings.llm_concurrency_max)
+        self.limit = float(min(max(settings.llm_concurrency_initial, self.min_limit), self.max_limit))
+        self.in_flight = 0
+        self.decrease_interval_seconds = 1.0
+        self._last_decrease = float("-inf")
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self.failure_threshold = max(1, settings.llm_breaker_failure_threshold)
+        self.cooldown_seconds = settings.llm_breaker_cooldown_seconds
+        self.state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        _concurrency_limit.set(self.limit)
+        _circuit_state.set(self.state)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        probing = self._check_circuit()
+        try:
+            await self._pace(estimated_tokens)
+            await self._wait_for_slot()
+        except BaseException:
+            if probing:
+                self._probe_in_flight = False
+            raise
+        self.in_flight += 1
+
+    async def _pace(self, estimated_tokens: int) -> None:
+        request_delay = self.requests.reserve(1)
+        token_delay = self.tokens.reserve(estimated_tokens)
+        if request_delay > 0:
+            _pacing_delay_seconds.inc(request_delay, budget="rpm")
+        if token_delay > 0:
+            _pacing_delay_seconds.inc(token_delay, budget="tpm")
+        delay = max(request_delay, token_delay)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _wait_for_slot(self) -> None:
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    self._wake_next()
+                raise
+
+    def release(self, status: int | None, estimated_tokens: int = 0, used_tokens: int | None = None) -> None:
+        """Record the outcome of an admitted call; ``status`` is None for transport failures."""
+        self.in_flight = max(0, self.in_flight - 1)
+        if used_tokens is not None:
+            self.tokens.adjust(used_tokens - estimated_tokens)
+
+        if status in _OVERLOAD_STATUSES:
+            # A burst of 429s from calls admitted together counts as one congestion signal.
+            now = self._clock()
+            if now - self._last_decrease >= self.decrease_interval_seconds:
+                self.limit = max(float(self.min_limit), self.limit / 2)
+                self._last_decrease = now
+        elif status is not None and status < 400:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        _concurrency_limit.set(self.limit)
+
+        if status is None or status in _FAILURE_STATUSES:
+            self._record_failure()
+        elif status < 400:
+            self._record_success()
+        else:
+            self._probe_in_flight = False
+        self._wake_next()
+
+    def abandon(self) -> None:
+        """Return the slot of a call cancelled by its caller without judging the provider."""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._probe_in_flight = False
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _check_circuit(self) -> bool:
+        """Raise when the circuit rejects calls; return True when this call is the half-open probe."""
+        if self.state is CircuitState.OPEN:
+            if self._clock() - self._opened_at < self.cooldown_seconds:
+                _rejected_total.inc()
+                raise ModelUnavailableError("Gemini circuit breaker is open")
+            self._set_state(CircuitState.HALF_OPEN)
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                _rejected_total.inc()
+                raise ModelUnavailableError("Gemini circuit breaker is probing")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state is CircuitState.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state is not CircuitState.OPEN:
+                _circuit_opened_total.inc()
+                logger.warning("llm_circuit_opened", consecutive_failures=self._consecutive_failures)
+            self._opened_at = self._clock()
+            self._set_state(CircuitState.OPEN)
+
+    def _record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state is not CircuitState.CLOSED:
+            logger.info("llm_circuit_closed")
+            self._set_state(CircuitState.CLOSED)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self.state = state
+        _circuit_state.set(state)
+
+
+@lru_cache(maxsize=1)
+def get_llm_governor() -> LLMGovernor:
+    return LLMGovernor()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+import numpy as np
+
+from app.core.config import AppSettings, get_settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_fired_total = metrics.counter("llm_hedge_fired_total", "Duplicate requests fired after the hedge delay, by call type.")
+_won_total = metrics.counter("llm_hedge_won_total", "Hedged requests that finished before the primary, by call type.")
+_budget_exhausted_total = metrics.counter(
+    "llm_hedge_budget_exhausted_total", "Hedges skipped because the extra-traffic budget was spent, by call type."
+)
+_hedge_delay_seconds = metrics.gauge("llm_hedge_delay_seconds", "Current hedge trigger delay, by call type.")
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies with an on-demand percentile."""
+
+    def __init__(self, window: int = 256) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+
+class HedgeBudget:
+    """Caps hedges at ``ratio`` extra requests per primary request.
+
+    Each primary call earns ``ratio`` credits (bounded by ``burst``); a hedge spends one.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self.credits = 0.0
+
+    def earn(self) -> None:
+        self.credits = min(self.burst, self.credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.credits >= 1.0:
+            self.credits -= 1.0
+            return True
+        return False
+
+
+class Hedger:
+    """Fire a duplicate call when the primary outlives the tracked latency percentile.
+
+    Whichever attempt finishes first with a result wins; the other is cancelled. If the
+    first finisher fails, the remaining attempt is awaited instead.
+    """
+
+    def __init__(self, settings: AppSettings | None = None) -> None:
+        settings = settings or get_settings()
+        self.percentile = settings.llm_hedge_percentile
+        self.min_samples = settings.llm_hedge_min_samples
+        self.call_types = {
+            item.strip() for item in settings.llm_hedge_call_types.split(",") if item.strip()
+        }
+        self.budget = HedgeBudget(settings.llm_hedge_max_ratio)
+        self._trackers: dict[str, LatencyTracker] = {}
+
+    def tracker(self, call_type: str) -> LatencyTracker:
+        return self._trackers.setdefault(call_type, LatencyTracker())
+
+    def delay_for(self, call_type: str) -> float | None:
+        tracker = self.tracker(call_type)
+        if len(tracker) < self.min_samples:
+            return None
+        delay = tracker.percentile(self.percentile)
+        _hedge_delay_seconds.set(delay, call_type=call_type)
+        return delay
+
+    async def run(self, call_type: str, factory: Callable[[], Awaitable[T]]) -> T:
+        if call_type not in self.call_types:
+            return await factory()
+        self.budget.earn()
+        delay = self.delay_for(call_type)
+        tracker = self.tracker(call_type)
+        primary: asyncio.Task[T] = asyncio.create_task(self._timed(tracker, factory))
+        if delay is None:
+            return await primary
+
+        hedge: asyncio.Task[T] | None = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.budget.try_spend():
+                _budget_exhausted_total.inc(call_type=call_type)
+                return await primary
+
+            _fired_total.inc(call_type=call_type)
+            logger.debug("llm_hedge_fired", call_type=call_type, delay=delay)
+            hedge = asyncio.create_task(self._timed(tracker, factory))
+            pending: set[asyncio.Task[T]] = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    if winner is hedge:
+                        _won_total.inc(call_type=call_type)
+                    return winner.result()
+            # Both attempts failed: surface the primary's error.
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    @staticmethod
+    async def _timed(tracker: LatencyTracker, factory: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        result = await factory()
+        tracker.record(time.perf_counter() - started)
+        return result
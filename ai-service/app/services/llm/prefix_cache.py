@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from app.core.config import AppSettings, get_settings
+from app.core.errors import ModelUnavailableError
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.services.llm.coalescing import request_key
+
+logger = get_logger(__name__)
+
+# Stop handing out a handle this long before its TTL so in-flight calls never race expiry.
+_REFRESH_MARGIN_SECONDS = 60.0
+# After a failed create (e.g. prefix below the provider's minimum size) go inline for a while.
+_FAILURE_BACKOFF_SECONDS = 300.0
+
+_hits_total = metrics.counter("llm_prefix_cache_hits_total", "Calls that reused a cached prompt prefix.")
+_creates_total = metrics.counter("llm_prefix_cache_creates_total", "cachedContents registrations sent upstream.")
+_fallbacks_total = metrics.counter(
+    "llm_prefix_cache_fallbacks_total", "Calls sent with an inline prompt instead of a cached prefix, by reason."
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPrefix:
+    name: str
+    expires_at: float
+
+
+class PrefixCache:
+    """Maps stable prompt prefixes to provider ``cachedContents`` handles.
+
+    Prefixes are keyed by a hash of their full content (model, system instruction and
+    leading turns), so a new template ``version_date`` or prompt edit yields a new
+    entry while the old one ages out on TTL. ``get_or_create`` returns ``None``
+    whenever the caller should fall back to sending the prefix inline.
+    """
+
+    def __init__(self, settings: AppSettings | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        settings = settings or get_settings()
+        self.ttl_seconds = settings.llm_prefix_cache_ttl_seconds
+        self.max_entries = settings.llm_prefix_cache_max_entries
+        self._clock = clock
+        self._handles: OrderedDict[str, CachedPrefix] = OrderedDict()
+        self._failed_until: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    @staticmethod
+    def key_for(prefix: dict[str, Any]) -> str:
+        return request_key("cachedContents", prefix)
+
+    async def get_or_create(
+        self, prefix: dict[str, Any], create: Callable[[int], Awaitable[str]]
+    ) -> str | None:
+        key = self.key_for(prefix)
+        now = self._clock()
+        cached = self._handles.get(key)
+        if cached is not None and cached.expires_at - _REFRESH_MARGIN_SECONDS > now:
+            self._handles.move_to_end(key)
+            _hits_total.inc()
+            return cached.name
+        if self._failed_until.get(key, 0.0) > now:
+            _fallbacks_total.inc(reason="backoff")
+            return None
+
+        _creates_total.inc()
+        try:
+            name = await create(int(self.ttl_seconds))
+        except (httpx.HTTPError, ModelUnavailableError, KeyError, TypeError) as exc:
+            self._failed_until[key] = self._clock() + _FAILURE_BACKOFF_SECONDS
+            self._handles.pop(key, None)
+            _fallbacks_total.inc(reason="create_failed")
+            logger.warning("llm_prefix_cache_create_failed", error=str(exc))
+            return None
+        self._failed_until.pop(key, None)
+        self._handles[key] = CachedPrefix(name, self._clock() + self.ttl_seconds)
+        self._handles.move_to_end(key)
+        while len(self._handles) > self.max_entries:
+            self._handles.popitem(last=False)
+        return name
+
+    def invalidate(self, name: str) -> None:
+        """Forget a handle the provider rejected (expired or deleted server-side)."""
+        for key, cached in list(self._handles.items()):
+            if cached.name == name:
+                del self._handles[key]
+        _fallbacks_total.inc(reason="invalidated")
@@ -0,0 +1,4 @@
+from app.services.llm.standin.config import LatencyProfile, StandinConfig
+from app.services.llm.standin.server import create_app, synthetic_embedding
+
+__all__ = ["LatencyProfile", "StandinConfig", "create_app", "synthetic_embedding"]
@@ -0,0 +1,23 @@
+"""Run the Gemini stand-in: ``python -m app.services.llm.standin --port 7800``.
+
+Behaviour is configured through ``STANDIN_*`` environment variables (see README).
+"""
+from __future__ import annotations
+
+import argparse
+
+import uvicorn
+
+from app.services.llm.standin.server import create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Gemini API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7800)
+    args = parser.parse_args()
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
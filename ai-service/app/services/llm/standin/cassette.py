@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from app.services.llm.coalescing import request_key
+
+
+@dataclass(slots=True)
+class Recording:
+    key: str
+    endpoint: str
+    status: int
+    body: dict[str, Any] | None = None
+    events: list[dict[str, Any]] | None = None
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(
+            {
+                "key": self.key,
+                "endpoint": self.endpoint,
+                "status": self.status,
+                "body": self.body,
+                "events": self.events,
+            }
+        )
+
+
+class Cassette:
+    """Append-only JSONL store of upstream responses keyed by (endpoint, request body)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._recordings: dict[str, Recording] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for line in self.path.read_bytes().splitlines():
+                if not line.strip():
+                    continue
+                raw = orjson.loads(line)
+                self._recordings[raw["key"]] = Recording(
+                    key=raw["key"],
+                    endpoint=raw["endpoint"],
+                    status=raw["status"],
+                    body=raw.get("body"),
+                    events=raw.get("events"),
+                )
+
+    def __len__(self) -> int:
+        return len(self._recordings)
+
+    @staticmethod
+    def key_for(endpoint: str, payload: dict[str, Any]) -> str:
+        return request_key(endpoint, payload)
+
+    def get(self, endpoint: str, payload: dict[str, Any]) -> Recording | None:
+        return self._recordings.get(self.key_for(endpoint, payload))
+
+    def add(self, recording: Recording) -> None:
+        with self._lock:
+            self._recordings[recording.key] = recording
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as handle:
+                handle.write(recording.to_json() + b"\n")
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Literal
+
+StandinMode = Literal["synthetic", "record", "replay"]
+
+DEFAULT_UPSTREAM_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+
+@dataclass(frozen=True, slots=True)
+class LatencyProfile:
+    """Log-normal latency: ``median_ms * exp(sigma * N(0, 1))``."""
+
+    median_ms: float = 0.0
+    sigma: float = 0.0
+
+
+@dataclass(slots=True)
+class StandinConfig:
+    mode: StandinMode = "synthetic"
+    vector_dim: int = 768
+    cassette_path: str | None = None
+    upstream_url: str = DEFAULT_UPSTREAM_URL
+    upstream_api_key: str | None = None
+    latency: dict[str, LatencyProfile] = field(default_factory=dict)
+    stream_chunk_delay_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    seed: int = 0
+    # Extra latency per 1k uncached prompt tokens, so prefix caching shows up in timings.
+    prefill_ms_per_1k_tokens: float = 0.0
+    cache_min_tokens: int = 0
+
+    @classmethod
+    def from_env(cls) -> StandinConfig:
+        mode = os.getenv("STANDIN_MODE", "synthetic")
+        if mode not in ("synthetic", "record", "replay"):
+            raise ValueError(f"Unsupported STANDIN_MODE: {mode}")
+        return cls(
+            mode=mode,  # type: ignore[arg-type]
+            vector_dim=int(os.getenv("STANDIN_VECTOR_DIM", os.getenv("VECTOR_DIM", "768"))),
+            cassette_path=os.getenv("STANDIN_CASSETTE"),
+            upstream_url=os.getenv("STANDIN_UPSTREAM_URL", DEFAULT_UPSTREAM_URL),
+            upstream_api_key=os.getenv("STANDIN_UPSTREAM_API_KEY") or os.getenv("GEMINI_API_KEY"),
+            latency=parse_latency(os.getenv("STANDIN_LATENCY", "")),
+            stream_chunk_delay_ms=float(os.getenv("STANDIN_STREAM_CHUNK_DELAY_MS", "0")),
+            error_rate=float(os.getenv("STANDIN_ERROR_RATE", "0")),
+            error_status=int(os.getenv("STANDIN_ERROR_STATUS", "429")),
+            seed=int(os.getenv("STANDIN_SEED", "0")),
+            prefill_ms_per_1k_tokens=float(os.getenv("STANDIN_PREFILL_MS_PER_1K_TOKENS", "0")),
+            cache_min_tokens=int(os.getenv("STANDIN_CACHE_MIN_TOKENS", "0")),
+        )
+
+
+def parse_latency(spec: str) -> dict[str, LatencyProfile]:
+    """Parse ``method=median_ms[:sigma]`` pairs, e.g. ``embedContent=60:0.3,generateContent=1500:0.6``.
+
+    The method ``*`` applies to every method without its own entry.
+    """
+    profiles: dict[str, LatencyProfile] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        method, _, values = item.partition("=")
+        median, _, sigma = values.partition(":")
+        profiles[method.strip()] = LatencyProfile(float(median), float(sigma or 0.0))
+    return profiles
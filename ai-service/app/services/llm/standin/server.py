@@ -0,0 +1,315 @@
+"""Local stand-in for the subset of the Generative Language API used by ``GeminiClient``.
+
+Point ``GEMINI_BASE_URL`` at ``http://<host>:<port>/v1beta`` to use it.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, cast
+
+import httpx
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.logging import get_logger
+from app.services.llm.standin.cassette import Cassette, Recording
+from app.services.llm.standin.config import LatencyProfile, StandinConfig
+
+logger = get_logger(__name__)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_STATUS_NAMES = {
+    400: "INVALID_ARGUMENT",
+    404: "NOT_FOUND",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+
+
+@lru_cache(maxsize=4096)
+def _token_vector(token: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def synthetic_embedding(text: str, dim: int) -> list[float]:
+    """Deterministic unit vector; texts sharing words get correlated vectors."""
+    tokens = _TOKEN.findall(text.lower()) or [""]
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokens:
+        vector += _token_vector(token, dim)
+    norm = float(np.linalg.norm(vector)) or 1.0
+    return cast(list[float], (vector / norm).tolist())
+
+
+def _user_text(payload: dict[str, Any]) -> str:
+    texts: list[str] = []
+    for content in payload.get("contents", []):
+        for part in content.get("parts", []):
+            if isinstance(part, dict) and isinstance(part.get("text"), str):
+                texts.append(part["text"])
+    return "\n".join(texts)
+
+
+def synthetic_text(payload: dict[str, Any]) -> str:
+    # Only the latest turn carries the request; earlier turns are static context.
+    user_text = _user_text({"contents": payload.get("contents", [])[-1:]})
+    try:
+        context = json.loads(user_text)
+    except json.JSONDecodeError:
+        context = None
+    if isinstance(context, dict) and "candidates" in context and "query" in context:
+        query_tokens = set(_TOKEN.findall(str(context["query"]).lower()))
+        scores = [
+            len(query_tokens & set(_TOKEN.findall(str(candidate).lower())))
+            for candidate in context["candidates"]
+        ]
+        order = sorted(range(len(scores)), key=lambda idx: (-scores[idx], idx))
+        return json.dumps({"order": order})
+    if isinstance(context, dict) and "missing_fields" in context:
+        return "[]"
+    if isinstance(context, dict):
+        return "{}"
+    return (
+        "Berdasarkan Sumber #1, pelaku usaha perlu melengkapi persyaratan yang disebutkan dalam konteks. "
+        "Jawaban ini dihasilkan oleh stand-in lokal untuk pengujian."
+    )
+
+
+def _tokens(body: bytes) -> int:
+    return max(1, len(body) // 4)
+
+
+def _usage(body: bytes, text: str, cached_tokens: int = 0) -> dict[str, int]:
+    prompt_tokens = _tokens(body) + cached_tokens
+    candidate_tokens = len(text.split())
+    usage = {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": candidate_tokens,
+        "totalTokenCount": prompt_tokens + candidate_tokens,
+    }
+    if cached_tokens:
+        usage["cachedContentTokenCount"] = cached_tokens
+    return usage
+
+
+def _error(status: int, message: str) -> Response:
+    body = {"error": {"code": status, "message": message, "status": _STATUS_NAMES.get(status, "")}}
+    return Response(orjson.dumps(body), status_code=status, media_type="application/json")
+
+
+@dataclass(slots=True)
+class CachedContent:
+    name: str
+    model: str
+    tokens: int
+    expires_at: float
+
+
+def _parse_ttl(value: Any) -> float:
+    if isinstance(value, str) and value.endswith("s"):
+        return float(value[:-1])
+    return 3600.0
+
+
+def _candidate(text: str, finish: bool) -> dict[str, Any]:
+    candidate: dict[str, Any] = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finish:
+        candidate["finishReason"] = "STOP"
+    return candidate
+
+
+def _sse(events: list[dict[str, Any]], delay_seconds: float) -> AsyncIterator[bytes]:
+    async def iterator() -> AsyncIterator[bytes]:
+        for idx, event in enumerate(events):
+            if idx and delay_seconds > 0:
+                await asyncio.sleep(delay_seconds)
+            yield b"data: " + orjson.dumps(event) + b"\r\n\r\n"
+
+    return iterator()
+
+
+class GeminiStandin:
+    def __init__(self, config: StandinConfig) -> None:
+        self.config = config
+        self.rng = np.random.default_rng(config.seed)
+        self.cassette = Cassette(config.cassette_path) if config.cassette_path else None
+        if config.mode != "synthetic" and self.cassette is None:
+            raise ValueError("record/replay modes require STANDIN_CASSETTE")
+        self.calls: dict[str, int] = {}
+        self.cached_contents: dict[str, CachedContent] = {}
+        self.cached_tokens_served = 0
+        # Replay requests answered synthetically because the cassette had no recording.
+        self.replay_misses = 0
+
+    def latency_for(self, method: str) -> float:
+        profile = self.config.latency.get(method) or self.config.latency.get("*") or LatencyProfile()
+        if profile.median_ms <= 0:
+            return 0.0
+        return profile.median_ms * float(np.exp(profile.sigma * self.rng.standard_normal())) / 1000
+
+    def injected_error(self) -> Response | None:
+        if self.config.error_rate <= 0 or self.rng.random() >= self.config.error_rate:
+            return None
+        return _error(self.config.error_status, "Injected by stand-in")
+
+    def create_cached_content(self, body: bytes) -> Response:
+        self.calls["cachedContents"] = self.calls.get("cachedContents", 0) + 1
+        payload: dict[str, Any] = orjson.loads(body or b"{}")
+        tokens = _tokens(body)
+        if tokens < self.config.cache_min_tokens:
+            return _error(400, f"Cached content is too small: {tokens} < {self.config.cache_min_tokens} tokens")
+        name = f"cachedContents/standin-{len(self.cached_contents) + 1}"
+        ttl = _parse_ttl(payload.get("ttl"))
+        self.cached_contents[name] = CachedContent(name, str(payload.get("model", "")), tokens, time.monotonic() + ttl)
+        return self._json({"name": name, "model": payload.get("model"), "usageMetadata": {"totalTokenCount": tokens}})
+
+    def _resolve_cached(self, model: str, payload: dict[str, Any]) -> tuple[int, Response | None]:
+        name = payload.get("cachedContent")
+        if not name:
+            return 0, None
+        cached = self.cached_contents.get(str(name))
+        if cached is None or cached.expires_at <= time.monotonic():
+            self.cached_contents.pop(str(name), None)
+            return 0, _error(404, f"CachedContent not found (or expired): {name}")
+        if cached.model.removeprefix("models/") != model:
+            return 0, _error(400, "Model does not match the cached content model")
+        self.cached_tokens_served += cached.tokens
+        return cached.tokens, None
+
+    async def handle(self, model: str, method: str, body: bytes, stream: bool) -> Response:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        payload: dict[str, Any] = orjson.loads(body or b"{}")
+        endpoint = f"models/{model}:{method}"
+
+        if self.config.mode == "record":
+            return await self._record(endpoint, payload, body, stream)
+
+        cached_tokens, cache_error = self._resolve_cached(model, payload)
+        if cache_error is not None:
+            return cache_error
+        delay = self.latency_for(method) + self.prefill_delay(body)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        error = self.injected_error()
+        if error is not None:
+            return error
+
+        if self.config.mode == "replay" and self.cassette is not None:
+            recording = self.cassette.get(endpoint, payload)
+            if recording is not None:
+                return self._replay(recording)
+            self.replay_misses += 1
+            logger.info("standin_replay_miss", endpoint=endpoint)
+
+        return self._synthetic(method, payload, body, cached_tokens)
+
+    def prefill_delay(self, body: bytes) -> float:
+        """Only the uncached part of the prompt pays prefill time."""
+        return self.config.prefill_ms_per_1k_tokens * _tokens(body) / 1000 / 1000
+
+    def _synthetic(self, method: str, payload: dict[str, Any], body: bytes, cached_tokens: int = 0) -> Response:
+        if method == "embedContent":
+            dim = int(payload.get("outputDimensionality") or self.config.vector_dim)
+            text = _user_text({"contents": [payload.get("content", {})]})
+            return self._json({"embedding": {"values": synthetic_embedding(text, dim)}})
+        if method == "batchEmbedContents":
+            embeddings = []
+            for request in payload.get("requests", []):
+                dim = int(request.get("outputDimensionality") or self.config.vector_dim)
+                text = _user_text({"contents": [request.get("content", {})]})
+                embeddings.append({"values": synthetic_embedding(text, dim)})
+            return self._json({"embeddings": embeddings})
+        if method == "generateContent":
+            text = synthetic_text(payload)
+            usage = _usage(body, text, cached_tokens)
+            return self._json({"candidates": [_candidate(text, True)], "usageMetadata": usage})
+        if method == "streamGenerateContent":
+            text = synthetic_text(payload)
+            words = text.split(" ")
+            pieces = [" ".join(words[idx : idx + 4]) + " " for idx in range(0, len(words), 4)]
+            events: list[dict[str, Any]] = [{"candidates": [_candidate(piece, False)]} for piece in pieces]
+            events.append({"candidates": [_candidate("", True)], "usageMetadata": _usage(body, text, cached_tokens)})
+            return self._stream(events)
+        raise HTTPException(status_code=404, detail=f"Unsupported method {method}")
+
+    def _replay(self, recording: Recording) -> Response:
+        if recording.events is not None:
+            return self._stream(recording.events)
+        return Response(orjson.dumps(recording.body), status_code=recording.status, media_type="application/json")
+
+    async def _record(self, endpoint: str, payload: dict[str, Any], body: bytes, stream: bool) -> Response:
+        if self.cassette is None:
+            raise RuntimeError("record mode requires a cassette")
+        url = f"{self.config.upstream_url.rstrip('/')}/{endpoint}"
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.config.upstream_api_key or ""}
+        async with httpx.AsyncClient(timeout=120) as client:
+            if stream:
+                events: list[dict[str, Any]] = []
+                async with client.stream("POST", url, params={"alt": "sse"}, content=body, headers=headers) as upstream:
+                    async for line in upstream.aiter_lines():
+                        if line.startswith("data:") and line.removeprefix("data:").strip():
+                            events.append(orjson.loads(line.removeprefix("data:")))
+                    status = upstream.status_code
+                recording = Recording(Cassette.key_for(endpoint, payload), endpoint, status, events=events)
+            else:
+                upstream_response = await client.post(url, content=body, headers=headers)
+                recording = Recording(
+                    Cassette.key_for(endpoint, payload),
+                    endpoint,
+                    upstream_response.status_code,
+                    body=upstream_response.json(),
+                )
+        if recording.status < 400:
+            self.cassette.add(recording)
+        return self._replay(recording)
+
+    def _json(self, data: dict[str, Any]) -> Response:
+        return Response(orjson.dumps(data), media_type="application/json")
+
+    def _stream(self, events: list[dict[str, Any]]) -> StreamingResponse:
+        return StreamingResponse(
+            _sse(events, self.config.stream_chunk_delay_ms / 1000),
+            media_type="text/event-stream",
+        )
+
+
+def create_app(config: StandinConfig | None = None) -> FastAPI:
+    standin = GeminiStandin(config or StandinConfig.from_env())
+    app = FastAPI(title="Gemini stand-in", docs_url=None, redoc_url=None)
+    app.state.standin = standin
+
+    @app.post("/v1beta/models/{target:path}")
+    async def model_call(target: str, request: Request) -> Response:
+        model, _, method = target.rpartition(":")
+        if not model:
+            raise HTTPException(status_code=404, detail="Expected models/{model}:{method}")
+        stream = method == "streamGenerateContent"
+        return await standin.handle(model, method, await request.body(), stream)
+
+    @app.post("/v1beta/cachedContents")
+    async def cached_contents(request: Request) -> Response:
+        return standin.create_cached_content(await request.body())
+
+    @app.get("/stats")
+    async def stats() -> dict[str, Any]:
+        return {
+            "mode": standin.config.mode,
+            "calls": standin.calls,
+            "cached_contents": len(standin.cached_contents),
+            "cached_tokens_served": standin.cached_tokens_served,
+            "replay_misses": standin.replay_misses,
+        }
+
+    return app
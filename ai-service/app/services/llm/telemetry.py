@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+_BYTE_BUCKETS = (256, 1_024, 4_096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304)
+
+_calls_total = metrics.counter("llm_calls_total", "Logical LLM calls by call type, model and outcome.")
+_retries_total = metrics.counter("llm_call_retries_total", "Extra attempts made after a failed LLM request.")
+_tokens_total = metrics.counter(
+    "llm_tokens_total", "Tokens reported in usageMetadata, by call type, model and kind (prompt/candidates/cached)."
+)
+_queue_wait_seconds = metrics.histogram(
+    "llm_call_queue_wait_seconds", "Time spent waiting on the governor before sending."
+)
+_connect_seconds = metrics.histogram(
+    "llm_call_connect_seconds", "TCP/TLS connect time; zero when a pooled connection was reused."
+)
+_ttfb_seconds = metrics.histogram("llm_call_ttfb_seconds", "Time from sending the request to response headers.")
+_duration_seconds = metrics.histogram(
+    "llm_call_duration_seconds", "End-to-end latency of a logical call, including queueing and retries."
+)
+_request_bytes = metrics.histogram("llm_call_request_bytes", "Serialized request body size.", _BYTE_BUCKETS)
+_response_bytes = metrics.histogram("llm_call_response_bytes", "Response body size.", _BYTE_BUCKETS)
+
+
+def model_from_endpoint(endpoint: str) -> str:
+    """``models/gemini-1.5-flash:generateContent`` -> ``gemini-1.5-flash``."""
+    return endpoint.split(":", 1)[0].removeprefix("models/")
+
+
+@dataclass(slots=True)
+class CallTelemetry:
+    """Timings and sizes for one logical LLM call, exported once via ``finish``."""
+
+    call_type: str
+    model: str
+    request_bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    attempts: int = 0
+    queue_wait: float = 0.0
+    connect: float = 0.0
+    ttfb: float | None = None
+    response_bytes: int = 0
+    status: int | None = None
+    prompt_tokens: int | None = None
+    candidate_tokens: int | None = None
+    cached_tokens: int | None = None
+    _sent_at: float = 0.0
+    _connect_started: float | None = None
+
+    def begin_attempt(self) -> None:
+        self.attempts += 1
+        self.connect = 0.0
+        self.ttfb = None
+        self._connect_started = None
+
+    def queued(self, seconds: float) -> None:
+        self.queue_wait += seconds
+
+    def sent(self) -> None:
+        self._sent_at = time.perf_counter()
+
+    def headers_received(self) -> None:
+        if self.ttfb is None:
+            self.ttfb = time.perf_counter() - self._sent_at
+
+    async def trace(self, event: str, info: dict[str, Any]) -> None:
+        """httpcore trace hook (``extensions={"trace": ...}``) for connect and TTFB."""
+        if event == "connection.connect_tcp.started":
+            self._connect_started = time.perf_counter()
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            if self._connect_started is not None:
+                self.connect = time.perf_counter() - self._connect_started
+        elif event.endswith(".receive_response_headers.complete"):
+            self.headers_received()
+
+    def usage(self, data: dict[str, Any]) -> None:
+        usage = data.get("usageMetadata")
+        if isinstance(usage, dict):
+            self.prompt_tokens = usage.get("promptTokenCount", self.prompt_tokens)
+            self.candidate_tokens = usage.get("candidatesTokenCount", self.candidate_tokens)
+            self.cached_tokens = usage.get("cachedContentTokenCount", self.cached_tokens)
+
+    def finish(self, outcome: str) -> None:
+        total = time.perf_counter() - self.started
+        labels = {"call_type": self.call_type, "model": self.model}
+        _calls_total.inc(outcome=outcome, call_type=self.call_type, model=self.model)
+        if self.attempts > 1:
+            _retries_total.inc(self.attempts - 1, call_type=self.call_type, model=self.model)
+        _queue_wait_seconds.observe(self.queue_wait, **labels)
+        _duration_seconds.observe(total, **labels)
+        _request_bytes.observe(self.request_bytes, **labels)
+        if self.ttfb is not None:
+            _connect_seconds.observe(self.connect, **labels)
+            _ttfb_seconds.observe(self.ttfb, **labels)
+            _response_bytes.observe(self.response_bytes, **labels)
+        if self.prompt_tokens:
+            _tokens_total.inc(self.prompt_tokens, kind="prompt", **labels)
+        if self.candidate_tokens:
+            _tokens_total.inc(self.candidate_tokens, kind="candidates", **labels)
+        if self.cached_tokens:
+            _tokens_total.inc(self.cached_tokens, kind="cached", **labels)
+        logger.debug(
+            "llm_call",
+            outcome=outcome,
+            status=self.status,
+            attempts=self.attempts,
+            queue_wait=round(self.queue_wait, 4),
+            connect=round(self.connect, 4),
+            ttfb=None if self.ttfb is None else round(self.ttfb, 4),
+            total=round(total, 4),
+            request_bytes=self.request_bytes,
+            response_bytes=self.response_bytes,
+            prompt_tokens=self.prompt_tokens,
+            candidate_tokens=self.candidate_tokens,
+            cached_tokens=self.cached_tokens,
+            **labels,
+        )
+
+
+def should_log_payload(sample_rate: float) -> bool:
+    return sample_rate > 0 and (sample_rate >= 1 or random.random() < sample_rate)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import importlib.util
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, cast
+
+import httpx
+
+from app.core.config import AppSettings, get_settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+TraceHook = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+_requests_total = metrics.counter("llm_http_requests_total", "HTTP requests sent through the LLM connection pool.")
+_saturated_total = metrics.counter(
+    "llm_http_pool_saturated_total",
+    "Requests that started while every pooled connection slot was already in use.",
+)
+_pool_timeouts_total = metrics.counter(
+    "llm_http_pool_timeouts_total", "Requests that gave up waiting for a free pooled connection."
+)
+_in_flight = metrics.gauge("llm_http_in_flight", "Requests currently in flight on the LLM connection pool.")
+_in_flight_peak = metrics.gauge("llm_http_in_flight_peak", "Highest concurrent in-flight request count observed.")
+_pool_limit = metrics.gauge("llm_http_pool_max_connections", "Configured maximum connections for the LLM pool.")
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class LLMTransport:
+    """Process-wide pooled HTTP client shared by every Gemini call.
+
+    The underlying ``httpx.AsyncClient`` keeps TLS sessions alive between calls and,
+    when ``h2`` is installed, multiplexes concurrent requests over HTTP/2 streams.
+    """
+
+    def __init__(
+        self,
+        settings: AppSettings | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.settings = settings or get_settings()
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._in_flight = 0
+        self._max_connections = self.settings.llm_pool_max_connections
+        self._http2 = self.settings.llm_http2 and (transport is not None or _http2_available())
+        if self.settings.llm_http2 and not self._http2:
+            logger.warning("llm_http2_unavailable", reason="h2 package not installed")
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self._max_connections,
+            max_keepalive_connections=self.settings.llm_pool_max_keepalive,
+            keepalive_expiry=self.settings.llm_keepalive_expiry_seconds,
+        )
+        timeout = httpx.Timeout(
+            self.settings.llm_timeout_seconds,
+            pool=self.settings.llm_pool_timeout_seconds,
+        )
+        kwargs: dict[str, Any] = {"limits": limits, "timeout": timeout}
+        if self._transport is not None:
+            kwargs["transport"] = self._transport
+        else:
+            kwargs["http2"] = self._http2
+        return httpx.AsyncClient(**kwargs)
+
+    async def open(self) -> None:
+        if self.is_open:
+            return
+        self._client = self._build_client()
+        _pool_limit.set(self._max_connections)
+        logger.info(
+            "llm_transport_opened",
+            http2=self._http2,
+            max_connections=self._max_connections,
+            max_keepalive=self.settings.llm_pool_max_keepalive,
+            keepalive_expiry=self.settings.llm_keepalive_expiry_seconds,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is None:
+            return
+        client, self._client = self._client, None
+        await client.aclose()
+        logger.info("llm_transport_closed")
+
+    async def post(
+        self, url: str, *, content: bytes, headers: dict[str, str], trace: TraceHook | None = None
+    ) -> httpx.Response:
+        client = await self._ensure_client()
+        with self._track():
+            return await client.post(url, content=content, headers=headers, extensions=_extensions(trace))
+
+    @asynccontextmanager
+    async def stream(
+        self, url: str, *, content: bytes, headers: dict[str, str], trace: TraceHook | None = None
+    ) -> AsyncIterator[httpx.Response]:
+        client = await self._ensure_client()
+        with self._track():
+            async with client.stream(
+                "POST", url, content=content, headers=headers, extensions=_extensions(trace)
+            ) as response:
+                yield response
+
+    async def _ensure_client(self) -> httpx.AsyncClient:
+        if not self.is_open:
+            await self.open()
+        return cast(httpx.AsyncClient, self._client)
+
+    @contextmanager
+    def _track(self) -> Iterator[None]:
+        _requests_total.inc()
+        if self._in_flight >= self._max_connections:
+            _saturated_total.inc()
+        self._in_flight += 1
+        _in_flight.set(self._in_flight)
+        _in_flight_peak.set_max(self._in_flight)
+        try:
+            yield
+        except httpx.PoolTimeout:
+            _pool_timeouts_total.inc()
+            raise
+        finally:
+            self._in_flight -= 1
+            _in_flight.set(self._in_flight)
+
+
+def _extensions(trace: TraceHook | None) -> dict[str, Any] | None:
+    return {"trace": trace} if trace is not None else None
+
+
+@lru_cache(maxsize=1)
+def get_llm_transport() -> LLMTransport:
+    return LLMTransport()
@@ -0,0 +1,167 @@
+"""Re-embed every stored chunk at the configured ``VECTOR_DIM`` and embedding model.
+
+Run after changing ``VECTOR_DIM``, ``GEMINI_MODEL_EMBED`` or ``EMBEDDING_PROVIDER``:
+
+    python -m app.services.rag.ingestion.reembed            # only if the stored dimension differs
+    python -m app.services.rag.ingestion.reembed --force    # e.g. after a model change
+    python -m app.services.rag.ingestion.reembed --check    # exit 1 when a re-embed is needed
+
+On Postgres, new vectors are written to a staging ``embedding_next vector(VECTOR_DIM)``
+column in committed batches, so an interrupted run resumes where it stopped. The
+staging column then replaces ``chunks.embedding`` in one transaction (recreating the
+generated quantized column when ``VECTOR_STORAGE`` asks for one) and the ANN index is
+rebuilt concurrently. On the SQLite fallback, rows are updated in place and the local
+vector index is dropped so that the next search rebuilds it. Pause ingestion while it runs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import AppSettings, get_settings
+from app.core.logging import get_logger
+from app.db.session import dialect_name, get_engine, get_sessionmaker
+from app.db.vector_index import ANN_INDEX_NAME, QUANTIZED_COLUMN, create_index_sql, quantized_column_sql
+from app.models import Chunk
+from app.services.llm.gemini import GeminiClient, get_gemini_client
+from app.services.rag.retrieval.cache import bump_generation
+from app.services.rag.retrieval.local_index import get_local_vector_index
+
+logger = get_logger(__name__)
+
+
+def _literal(vector: list[float]) -> str:
+    return "[" + ",".join(repr(float(value)) for value in vector) + "]"
+
+
+def _is_postgres(session: AsyncSession) -> bool:
+    return dialect_name(session) == "postgresql"
+
+
+async def stored_dimension(session: AsyncSession) -> int | None:
+    """Dimension of ``chunks.embedding``: the column type on Postgres, else a stored row."""
+    if _is_postgres(session):
+        typmod = await session.scalar(
+            text(
+                "SELECT atttypmod FROM pg_attribute "
+                "WHERE attrelid = 'chunks'::regclass AND attname = 'embedding' AND NOT attisdropped"
+            )
+        )
+        if typmod is not None and typmod > 0:
+            return int(typmod)
+    embedding = await session.scalar(select(Chunk.embedding).limit(1))
+    return None if embedding is None else len(embedding)
+
+
+async def reembed(
+    session: AsyncSession,
+    gemini: GeminiClient,
+    settings: AppSettings,
+    batch_size: int = 256,
+) -> int:
+    if _is_postgres(session):
+        count = await _reembed_postgres(session, gemini, settings, batch_size)
+    else:
+        count = await _reembed_in_place(session, gemini, batch_size)
+        get_local_vector_index().drop()
+    logger.info("reembed_completed", chunks=count, dimension=settings.vector_dim)
+    return count
+
+
+async def _reembed_postgres(
+    session: AsyncSession, gemini: GeminiClient, settings: AppSettings, batch_size: int
+) -> int:
+    dim = int(settings.vector_dim)
+    await session.execute(text(f"ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_next vector({dim})"))
+    await session.commit()
+
+    count = 0
+    while True:
+        rows = (
+            await session.execute(
+                text("SELECT id, text FROM chunks WHERE embedding_next IS NULL ORDER BY id LIMIT :limit"),
+                {"limit": batch_size},
+            )
+        ).all()
+        if not rows:
+            break
+        vectors = await gemini.embed_texts([row.text for row in rows])
+        await session.execute(
+            text("UPDATE chunks SET embedding_next = CAST(:vector AS vector) WHERE id = :id"),
+            [{"id": row.id, "vector": _literal(vector)} for row, vector in zip(rows, vectors)],
+        )
+        await session.commit()
+        count += len(rows)
+        logger.info("reembed_batch", chunks=count)
+
+    await session.execute(text(f"DROP INDEX IF EXISTS {ANN_INDEX_NAME}"))
+    # The generated quantized copy depends on ``embedding`` and is recomputed from the new one.
+    await session.execute(text(f"ALTER TABLE chunks DROP COLUMN IF EXISTS {QUANTIZED_COLUMN}"))
+    await session.execute(text("ALTER TABLE chunks DROP COLUMN embedding"))
+    await session.execute(text("ALTER TABLE chunks RENAME COLUMN embedding_next TO embedding"))
+    await session.execute(text("ALTER TABLE chunks ALTER COLUMN embedding SET NOT NULL"))
+    quantized = quantized_column_sql(settings)
+    if quantized is not None:
+        await session.execute(text(quantized))
+    await bump_generation(session)
+    await session.commit()
+
+    ddl = create_index_sql(settings)
+    if ddl is not None:
+        async with get_engine().connect() as connection:
+            autocommit = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await autocommit.execute(text(ddl))
+    return count
+
+
+async def _reembed_in_place(session: AsyncSession, gemini: GeminiClient, batch_size: int) -> int:
+    count = 0
+    last_id = 0
+    while True:
+        rows = (
+            await session.execute(
+                select(Chunk.id, Chunk.text).where(Chunk.id > last_id).order_by(Chunk.id).limit(batch_size)
+            )
+        ).all()
+        if not rows:
+            break
+        vectors = await gemini.embed_texts([row.text for row in rows])
+        for row, vector in zip(rows, vectors):
+            await session.execute(update(Chunk).where(Chunk.id == row.id).values(embedding=vector))
+        count += len(rows)
+        last_id = rows[-1].id
+    await bump_generation(session)
+    await session.commit()
+    return count
+
+
+async def _run(args: argparse.Namespace) -> int:
+    settings = get_settings()
+    async with get_sessionmaker()() as session:
+        current = await stored_dimension(session)
+        needed = current is not None and current != settings.vector_dim
+        print(f"stored dimension={current} configured VECTOR_DIM={settings.vector_dim}")
+        if args.check:
+            return 1 if needed else 0
+        if not (needed or args.force):
+            print("nothing to do")
+            return 0
+        count = await reembed(session, get_gemini_client(), settings, args.batch_size)
+    print(f"re-embedded {count} chunks at {settings.vector_dim} dimensions")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--force", action="store_true", help="re-embed even if the dimension already matches")
+    parser.add_argument("--check", action="store_true", help="only report; exit 1 if a re-embed is needed")
+    sys.exit(asyncio.run(_run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
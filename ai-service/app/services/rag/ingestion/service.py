@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import hashlib
-from datetime import datetime
+from collections import Counter
+from datetime import UTC, date, datetime
 from typing import Any
 
 from sqlalchemy import delete, select
@@ -9,16 +10,32 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.db.partitions import get_partition_router
+from app.db.session import dialect_name
 from app.models import Chunk as ChunkModel
 from app.models import Document, DocumentType
 from app.services.llm.gemini import get_gemini_client
 from app.services.rag.ingestion.chunker import Chunk, chunk_text
 from app.services.rag.ingestion.html import extract_sections, fetch_html, normalize_html
 from app.services.rag.ingestion.pdf import chunk_pages, fetch_pdf, pdf_to_markdown
+from app.services.rag.pipeline.answer_cache import get_answer_cache
+from app.services.rag.retrieval.cache import bump_generation
+from app.services.rag.retrieval.local_index import LocalVectorIndex, get_local_vector_index
+from app.services.rag.retrieval.planner import adjust_filter_counts, filter_key
 
 logger = get_logger(__name__)
 
 
+def _parse_version_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        logger.warning("ingestion_invalid_version_date", version_date=value)
+        return None
+
+
 class IngestionService:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -51,10 +68,16 @@ class IngestionService:
 
         sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
 
+        if dialect_name(self.session) != "sqlite":
+            # Before this transaction touches chunks; see app.db.partitions.
+            await get_partition_router().ensure(self.settings, permit_type, region)
+
         stmt = select(Document).where(Document.url == url)
         result = await self.session.execute(stmt)
         document = result.scalar_one_or_none()
 
+        stale_ids: list[int] = []
+        count_deltas: Counter[tuple[str, str]] = Counter()
         if document is None:
             document = Document(
                 url=url,
@@ -63,50 +86,76 @@ class IngestionService:
                 sha256=sha,
             )
             self.session.add(document)
-            await self.session.flush()
         else:
+            stale = await self.session.execute(select(ChunkModel.id).where(ChunkModel.document_id == document.id))
+            stale_ids = list(stale.scalars())
+            count_deltas[filter_key(document.permit_type, document.region)] -= len(stale_ids)
             document.sha256 = sha
             document.type = document_type
-            await self.session.flush()
             await self.session.execute(delete(ChunkModel).where(ChunkModel.document_id == document.id))
 
+        document.permit_type = permit_type
+        document.region = region
+        document.title = source_title or None
+        document.version_date = _parse_version_date(version_date)
+        document.language = "id"
+        document.selectors = selectors
+        document.ingested_at = datetime.now(UTC)
+        await self.session.flush()
+
         all_chunks: list[Chunk] = []
         for section_title, section_text in sections:
             chunks = chunk_text(section_text, section_title)
             all_chunks.extend(chunks)
 
-        stored_chunks = await self._store_chunks(document.id, all_chunks, {
-            "source_url": url,
-            "source_title": source_title,
-            "permit_type": permit_type,
-            "region": region,
-            "language": "id",
-            "version_date": version_date,
-            "selectors": selectors,
-            "ingested_at": datetime.utcnow().isoformat(),
-        })
+        stored_chunks = await self._store_chunks(document, all_chunks)
+        count_deltas[filter_key(permit_type, region)] += len(stored_chunks)
+        await adjust_filter_counts(self.session, count_deltas)
+        await bump_generation(self.session)
 
         await self.session.commit()
 
+        local_index = self._local_index()
+        if local_index is not None:
+            # Only after commit, so the index never points at rows that were rolled back.
+            local_index.remove(stale_ids)
+            local_index.append(
+                [chunk_model.id for chunk_model in stored_chunks],
+                [chunk_model.embedding for chunk_model in stored_chunks],
+            )
+
+        # Other workers notice the changed document hash when they next serve a hit.
+        get_answer_cache().invalidate_sources([url])
+
         logger.info("ingestion_completed", url=url, chunks=len(stored_chunks))
         return {"url": url, "chunks": len(stored_chunks)}
 
-    async def _store_chunks(
-        self,
-        document_id: int,
-        chunks: list[Chunk],
-        metadata_base: dict[str, Any],
-    ) -> list[int]:
-        stored_ids: list[int] = []
-        for chunk in chunks:
-            embedding = await self.gemini.embed_text(chunk.text)
-            chunk_model = ChunkModel(
-                document_id=document_id,
+    async def _store_chunks(self, document: Document, chunks: list[Chunk]) -> list[ChunkModel]:
+        if not chunks:
+            return []
+        embeddings = await self.gemini.embed_texts([chunk.text for chunk in chunks])
+        chunk_models = [
+            ChunkModel(
+                document_id=document.id,
+                permit_type=document.permit_type or "",
+                region=document.region or "",
                 text=chunk.text,
-                chunk_metadata={**metadata_base, "section": chunk.section, "order": chunk.order},
+                chunk_metadata={"section": chunk.section, "order": chunk.order},
                 embedding=embedding,
             )
-            self.session.add(chunk_model)
-            await self.session.flush()
-            stored_ids.append(chunk_model.id)
-        return stored_ids
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+        self.session.add_all(chunk_models)
+        await self.session.flush()
+        return chunk_models
+
+    def _local_index(self) -> LocalVectorIndex | None:
+        """The mmap vector index when running on the SQLite fallback, once it has been built.
+
+        Before the first local vector search builds it from the database, there is
+        nothing to keep in sync.
+        """
+        if dialect_name(self.session) != "sqlite":
+            return None
+        index = get_local_vector_index()
+        return index if index.exists else None
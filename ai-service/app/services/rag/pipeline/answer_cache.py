@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import copy
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.services.llm.embedding_cache import normalize_text
+
+_lookups_total = metrics.counter(
+    "rag_answer_cache_lookups_total", "Answer cache lookups by outcome (hit_exact/hit_semantic/stale/miss)."
+)
+_evictions_total = metrics.counter("rag_answer_cache_evictions_total", "Answer cache entries dropped, by reason.")
+_entries = metrics.gauge("rag_answer_cache_entries", "Answers currently held in the in-process cache.")
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+AnswerKey = tuple[str, str, str]
+
+
+def normalize_question(question: str) -> str:
+    return _TRAILING_PUNCTUATION.sub("", normalize_text(question).casefold())
+
+
+@dataclass(slots=True)
+class CachedAnswer:
+    result: dict[str, Any]
+    # Cited document URL -> hash of its text and cited metadata when the answer was produced.
+    sources: dict[str, str]
+    embedding: np.ndarray | None
+    expires_at: float
+
+
+class AnswerCache:
+    """Bounded, TTL'd LRU of RAG answers keyed by normalised question and filters.
+
+    Besides exact hits, ``nearest`` finds a cached question under the same ``permit_type``
+    and ``region`` whose embedding has cosine similarity of at least ``similarity_threshold``
+    (the pipeline only asks with ``ANSWER_CACHE_SEMANTIC``). Entries remember a hash of the
+    text and cited metadata of every cited document so callers can reject them once
+    ingestion changes a source; ``invalidate_sources`` drops them eagerly in the ingesting
+    process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._clock = clock
+        self._entries: OrderedDict[AnswerKey, CachedAnswer] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(question: str, permit_type: str | None, region: str | None) -> AnswerKey:
+        return normalize_question(question), permit_type or "", region or ""
+
+    def get(self, key: AnswerKey) -> CachedAnswer | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            self._drop(key, "ttl")
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def nearest(self, key: AnswerKey, embedding: Sequence[float]) -> tuple[AnswerKey, CachedAnswer] | None:
+        """The most similar cached question in the same filter scope, if above the threshold."""
+        now = self._clock()
+        for expired in [name for name, entry in self._entries.items() if entry.expires_at <= now]:
+            self._drop(expired, "ttl")
+        candidates = [
+            (name, entry, entry.embedding)
+            for name, entry in self._entries.items()
+            if name[1:] == key[1:] and entry.embedding is not None and len(entry.embedding) == len(embedding)
+        ]
+        if not candidates:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        similarity = np.stack([vector for *_, vector in candidates]) @ query
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.similarity_threshold:
+            return None
+        name, entry, _ = candidates[best]
+        self._entries.move_to_end(name)
+        return name, entry
+
+    def put(
+        self,
+        key: AnswerKey,
+        result: dict[str, Any],
+        sources: dict[str, str],
+        embedding: Sequence[float] | None = None,
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        vector = None
+        if embedding is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            vector = vector / (np.linalg.norm(vector) or 1.0)
+        self._entries[key] = CachedAnswer(
+            result=copy.deepcopy(result),
+            sources=dict(sources),
+            embedding=vector,
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest, "size")
+        _entries.set(len(self._entries))
+
+    def invalidate(self, key: AnswerKey, reason: str = "stale") -> None:
+        if key in self._entries:
+            self._drop(key, reason)
+
+    def invalidate_sources(self, urls: Iterable[str]) -> int:
+        """Drop every answer citing one of ``urls``; returns how many were dropped."""
+        targets = set(urls)
+        stale = [key for key, entry in self._entries.items() if targets & entry.sources.keys()]
+        for key in stale:
+            self._drop(key, "ingestion")
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        _entries.set(0)
+
+    @staticmethod
+    def record(outcome: str) -> None:
+        _lookups_total.inc(outcome=outcome)
+
+    def _drop(self, key: AnswerKey, reason: str) -> None:
+        del self._entries[key]
+        _evictions_total.inc(reason=reason)
+        _entries.set(len(self._entries))
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> AnswerCache:
+    settings = get_settings()
+    return AnswerCache(
+        max_entries=settings.answer_cache_max_entries,
+        ttl_seconds=settings.answer_cache_ttl_seconds,
+        similarity_threshold=settings.answer_cache_similarity,
+    )
@@ -1,17 +1,32 @@
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
+from collections.abc import AsyncIterator, Iterable
 from typing import Any
 
+import httpx
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.errors import ModelUnavailableError
 from app.core.logging import get_logger
 from app.core.prompts import get_prompt
+from app.models import Document
 from app.services.llm.gemini import get_gemini_client
+from app.services.rag.pipeline.answer_cache import AnswerCache, get_answer_cache
 from app.services.rag.retrieval.service import RetrievalService, RetrievedChunk
 
 logger = get_logger(__name__)
 
+StreamEvent = tuple[str, dict[str, Any]]
+
+# What a cached answer depends on per cited document: its text (``sha256``) and the
+# metadata that ends up in citations and retrieval metadata.
+_SOURCE_COLUMNS = (Document.sha256, Document.title, Document.version_date, Document.permit_type, Document.region)
+
 
 class RagPipeline:
     def __init__(self, session: AsyncSession) -> None:
@@ -20,6 +35,7 @@ class RagPipeline:
         self.retrieval = RetrievalService(session)
         self.gemini = get_gemini_client()
         self.prompt = get_prompt("q&a system prompt")
+        self.answer_cache = get_answer_cache() if self.settings.answer_cache_enabled else None
 
     async def answer(self, payload: dict[str, Any]) -> dict[str, Any]:
         question: str = payload["question"].strip()
@@ -30,6 +46,10 @@ class RagPipeline:
             return self._cannot_verify()
 
         filters = {"permit_type": permit_type, "region": region}
+        cached = await self._cached_answer(question, filters)
+        if cached is not None:
+            return cached
+
         chunks = await self.retrieval.search(question, filters)
         if not chunks:
             logger.info("rag_no_chunks", question=question)
@@ -48,18 +68,151 @@ class RagPipeline:
             return self._cannot_verify()
 
         retrieval_meta = self._build_retrieval_meta(chunks)
-        model_meta = {
-            "model": self.settings.gemini_model_qa,
-            "prompt_tokens": response.get("usageMetadata", {}).get("promptTokenCount"),
-            "response_tokens": response.get("usageMetadata", {}).get("candidatesTokenCount"),
-        }
+        model_meta = self._build_model_meta(response.get("usageMetadata", {}))
 
-        return {
+        result = {
             "answer_md": answer_text,
             "citations": citations,
             "retrieval_meta": retrieval_meta,
             "model_meta": model_meta,
         }
+        await self._remember_answer(question, filters, result)
+        return result
+
+    async def answer_stream(self, payload: dict[str, Any]) -> AsyncIterator[StreamEvent]:
+        """Stream an answer as ``(event, data)`` pairs.
+
+        Emits ``meta`` (citations and retrieval metadata) once retrieval finishes, then
+        one ``token`` event per streamed text delta, and always ends with ``done``
+        carrying the complete answer or the "cannot verify" fallback.
+        """
+        question: str = payload["question"].strip()
+        if not question:
+            yield "done", self._cannot_verify()
+            return
+
+        filters = {"permit_type": payload.get("permit_type"), "region": payload.get("region")}
+        cached = await self._cached_answer(question, filters)
+        if cached is not None:
+            yield "meta", {"citations": cached["citations"], "retrieval_meta": cached["retrieval_meta"]}
+            yield "token", {"text": cached["answer_md"]}
+            yield "done", cached
+            return
+
+        chunks = await self.retrieval.search(question, filters)
+        if not chunks:
+            logger.info("rag_no_chunks", question=question)
+            yield "done", self._cannot_verify()
+            return
+
+        citations = self._build_citations(chunks)
+        if not citations:
+            yield "done", self._cannot_verify()
+            return
+
+        retrieval_meta = self._build_retrieval_meta(chunks)
+        yield "meta", {"citations": citations, "retrieval_meta": retrieval_meta}
+
+        contents = self._build_contents(question, self._build_context_block(chunks))
+        parts: list[str] = []
+        usage: dict[str, Any] = {}
+        try:
+            async for response in self.gemini.stream_answer(self.prompt, contents):
+                usage = response.get("usageMetadata") or usage
+                delta = self._extract_delta(response)
+                if delta:
+                    parts.append(delta)
+                    yield "token", {"text": delta}
+        except (httpx.HTTPError, ModelUnavailableError) as exc:
+            logger.warning("rag_stream_failed", error=str(exc))
+            yield "done", self._cannot_verify()
+            return
+
+        answer_text = "".join(parts).strip()
+        if not answer_text:
+            yield "done", self._cannot_verify()
+            return
+
+        result = {
+            "answer_md": answer_text,
+            "citations": citations,
+            "retrieval_meta": retrieval_meta,
+            "model_meta": self._build_model_meta(usage),
+        }
+        await self._remember_answer(question, filters, result)
+        yield "done", result
+
+    async def _cached_answer(self, question: str, filters: dict[str, str | None]) -> dict[str, Any] | None:
+        """A previous answer to the same (or, with ``ANSWER_CACHE_SEMANTIC``, a semantically
+        equivalent) question, if still valid.
+
+        Hits are checked against the current content and cited metadata of every cited
+        document, so an answer is never served after ingestion has changed one of its sources.
+        """
+        if self.answer_cache is None:
+            return None
+        key = AnswerCache.key(question, filters.get("permit_type"), filters.get("region"))
+        outcome = "exact"
+        entry = self.answer_cache.get(key)
+        if entry is None and not self.settings.answer_cache_semantic:
+            AnswerCache.record("miss")
+            return None
+        if entry is None:
+            outcome = "semantic"
+            embedding = await self._question_embedding(question)
+            match = self.answer_cache.nearest(key, embedding) if embedding is not None else None
+            if match is None:
+                AnswerCache.record("miss")
+                return None
+            key, entry = match
+        if await self._source_hashes(entry.sources) != entry.sources:
+            self.answer_cache.invalidate(key)
+            AnswerCache.record("stale")
+            return None
+        AnswerCache.record(f"hit_{outcome}")
+        logger.info("rag_answer_cache_hit", kind=outcome)
+        result = copy.deepcopy(entry.result)
+        result["retrieval_meta"]["answer_cache"] = outcome
+        return result
+
+    async def _remember_answer(self, question: str, filters: dict[str, str | None], result: dict[str, Any]) -> None:
+        if self.answer_cache is None:
+            return
+        sources = await self._source_hashes(citation["url"] for citation in result["citations"])
+        self.answer_cache.put(
+            AnswerCache.key(question, filters.get("permit_type"), filters.get("region")),
+            result,
+            sources,
+            await self._question_embedding(question) if self.settings.answer_cache_semantic else None,
+        )
+
+    async def _question_embedding(self, question: str) -> list[float] | None:
+        """The question's embedding for semantic cache lookups; ``None`` when it cannot be had.
+
+        Only the cache depends on it, so failures must not fail the answer.
+        """
+        try:
+            return await self.gemini.embed_text(question)
+        except ModelUnavailableError:
+            return None
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("rag_answer_cache_embedding_failed", error=str(exc))
+            return None
+
+    async def _source_hashes(self, urls: Iterable[str]) -> dict[str, str]:
+        """Cited URL -> hash of the document's text hash and the metadata answers cite."""
+        stmt = select(Document.url, *_SOURCE_COLUMNS).where(Document.url.in_(list(urls)))
+        return {
+            url: hashlib.sha256(json.dumps(values, default=str).encode("utf-8")).hexdigest()
+            for url, *values in (await self.session.execute(stmt)).all()
+        }
+
+    def _build_model_meta(self, usage: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "model": self.settings.gemini_model_qa,
+            "prompt_tokens": usage.get("promptTokenCount"),
+            "response_tokens": usage.get("candidatesTokenCount"),
+        }
 
     def _build_context_block(self, chunks: list[RetrievedChunk]) -> str:
         blocks: list[str] = []
@@ -108,6 +261,14 @@ class RagPipeline:
             logger.warning("gemini_answer_parse_failed", response=response)
         return ""
 
+    @staticmethod
+    def _extract_delta(response: dict[str, Any]) -> str:
+        try:
+            parts = response["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError, TypeError):
+            return ""
+        return "".join(part.get("text", "") for part in parts if isinstance(part, dict))
+
     def _build_citations(self, chunks: list[RetrievedChunk]) -> list[dict[str, Any]]:
         citations: list[dict[str, Any]] = []
         seen: set[str] = set()
@@ -134,10 +295,14 @@ class RagPipeline:
             if isinstance(version_value, str):
                 versions.append(version_value)
         latest = max(versions) if versions else None
-        return {
+        meta: dict[str, Any] = {
             "chunks_considered": len(chunks),
             "latest_version_date": latest,
         }
+        plan = getattr(self.retrieval, "last_plan", None)
+        if plan is not None:
+            meta.update(plan.as_meta())
+        return meta
 
     @staticmethod
     def _cannot_verify() -> dict[str, Any]:
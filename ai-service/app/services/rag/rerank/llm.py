@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.config import AppSettings, get_settings
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.services.llm.gemini import GeminiClient
+from app.services.rag.rerank.service import best_window
+
+logger = get_logger(__name__)
+
+_TOKEN_BUCKETS = (500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000)
+
+_query_tokens = metrics.histogram(
+    "rerank_query_prompt_tokens", "Prompt tokens spent on LLM reranking per query, by mode.", _TOKEN_BUCKETS
+)
+_query_seconds = metrics.histogram("rerank_query_seconds", "Wall time of LLM reranking per query, by mode.")
+
+
+@dataclass(slots=True)
+class RerankResult:
+    order: list[int]
+    mode: str
+    calls: int = 0
+    prompt_tokens: int = 0
+    candidate_tokens: int = 0
+    input_chars: int = 0
+    elapsed: float = 0.0
+    # Wall time of each Gemini call (one per shard); ``elapsed`` is bounded by the slowest.
+    call_seconds: list[float] = field(default_factory=list)
+
+
+def _complete_order(order: list[int], size: int) -> list[int]:
+    """Drop duplicates and out-of-range indices, then append anything the model skipped."""
+    seen: dict[int, None] = {}
+    for idx in order:
+        if 0 <= idx < size:
+            seen.setdefault(idx, None)
+    return [*seen, *(idx for idx in range(size) if idx not in seen)]
+
+
+class LLMReranker:
+    """Gemini-backed reranking with optional budgeting.
+
+    In ``llm`` mode every candidate goes in full to the QA model in one call. In
+    ``llm_budgeted`` mode each candidate is cut to its best-matching window of
+    ``RERANK_WINDOW_WORDS``, the cheaper ``GEMINI_MODEL_RERANK`` is used, and candidates
+    are dealt round-robin (by ``prior`` order) into shards of ``RERANK_SHARD_SIZE`` that
+    are ranked in parallel. Shards therefore have a similar quality spread, and the
+    merge interleaves them by relative position within each shard, breaking ties by
+    the prior order. Sharding cuts prompt tokens and per-call prefill, but the query
+    waits for its slowest shard, so with a large fixed per-call latency the wall time
+    can exceed a single full call.
+    """
+
+    def __init__(self, gemini: GeminiClient, settings: AppSettings | None = None) -> None:
+        self.gemini = gemini
+        settings = settings or get_settings()
+        self.budgeted = settings.rerank_mode == "llm_budgeted"
+        self.mode = settings.rerank_mode
+        self.model = settings.gemini_model_rerank
+        self.window_words = settings.rerank_window_words
+        self.shard_size = max(1, settings.rerank_shard_size)
+
+    async def rerank(self, query: str, texts: list[str], prior: list[int] | None = None) -> RerankResult:
+        started = time.perf_counter()
+        prior = prior if prior is not None else list(range(len(texts)))
+        if self.budgeted:
+            passages = [best_window(text, query, self.window_words) for text in texts]
+            shard_count = math.ceil(len(texts) / self.shard_size) or 1
+            shards = [prior[offset::shard_count] for offset in range(shard_count)]
+            model: str | None = self.model
+        else:
+            passages = texts
+            shards = [prior]
+            model = None
+
+        timed = await asyncio.gather(
+            *(self._timed_call(query, [passages[idx] for idx in shard], model) for shard in shards)
+        )
+        responses = [response for response, _ in timed]
+        result = RerankResult(
+            order=self._merge(shards, responses, prior),
+            mode=self.mode,
+            calls=len(shards),
+            call_seconds=[seconds for _, seconds in timed],
+        )
+        for _, usage in responses:
+            result.prompt_tokens += int(usage.get("promptTokenCount") or 0)
+            result.candidate_tokens += int(usage.get("candidatesTokenCount") or 0)
+        result.input_chars = sum(len(passages[idx]) for shard in shards for idx in shard)
+        result.elapsed = time.perf_counter() - started
+
+        _query_tokens.observe(result.prompt_tokens, mode=result.mode)
+        _query_seconds.observe(result.elapsed, mode=result.mode)
+        logger.info(
+            "rerank_llm_completed",
+            mode=result.mode,
+            calls=result.calls,
+            candidates=len(texts),
+            prompt_tokens=result.prompt_tokens,
+            candidate_tokens=result.candidate_tokens,
+            input_chars=result.input_chars,
+            elapsed=round(result.elapsed, 4),
+        )
+        return result
+
+    async def _timed_call(
+        self, query: str, passages: list[str], model: str | None
+    ) -> tuple[tuple[list[int], dict[str, Any]], float]:
+        started = time.perf_counter()
+        response = await self.gemini.rerank_with_usage(query, passages, model)
+        return response, time.perf_counter() - started
+
+    @staticmethod
+    def _merge(
+        shards: list[list[int]], responses: list[tuple[list[int], dict[str, Any]]], prior: list[int]
+    ) -> list[int]:
+        prior_rank = {idx: rank for rank, idx in enumerate(prior)}
+        keyed: list[tuple[float, int, int]] = []
+        for shard, (order, _) in zip(shards, responses):
+            for position, local in enumerate(_complete_order(order, len(shard))):
+                candidate = shard[local]
+                keyed.append((position / len(shard), prior_rank[candidate], candidate))
+        return [candidate for *_, candidate in sorted(keyed)]
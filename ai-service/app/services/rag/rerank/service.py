@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any, cast
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Question words and connectives that carry no ranking signal in Indonesian queries.
+STOPWORDS = frozenset(
+    {
+        "ada", "adalah", "agar", "akan", "apa", "apakah", "atau", "bagaimana", "bagi", "dalam",
+        "dan", "dapat", "dari", "dengan", "di", "harus", "ini", "itu", "jika", "juga", "ke",
+        "oleh", "pada", "saja", "saya", "sebagai", "tersebut", "untuk", "yang",
+    }
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def best_window(text: str, query: str, width: int) -> str:
+    """The ``width``-word span of ``text`` containing the most query-term occurrences."""
+    words = text.split()
+    if width <= 0 or len(words) <= width:
+        return text
+    terms = set(tokenize(query))
+    hits = np.fromiter(
+        (any(token in terms for token in _TOKEN.findall(word.lower())) for word in words),
+        dtype=np.int32,
+        count=len(words),
+    )
+    cumulative = np.concatenate(([0], np.cumsum(hits)))
+    start = int(np.argmax(cumulative[width:] - cumulative[:-width]))
+    return " ".join(words[start : start + width])
+
+
+def bm25_scores(
+    query: str, texts: Sequence[str], k1: float = 1.2, b: float = 0.75
+) -> np.ndarray:
+    """Okapi BM25 of ``query`` against ``texts``, with IDF taken over the candidates."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not texts:
+        return np.zeros(len(texts), dtype=np.float64)
+    index = {term: col for col, term in enumerate(terms)}
+    tf = np.zeros((len(texts), len(terms)), dtype=np.float64)
+    lengths = np.empty(len(texts), dtype=np.float64)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        lengths[row] = len(tokens)
+        for term, count in Counter(token for token in tokens if token in index).items():
+            tf[row, index[term]] = count
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+    avg_length = float(lengths.mean()) or 1.0
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    return cast(np.ndarray, ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1))
+
+
+def cosine_scores(query_embedding: Sequence[float], embeddings: Sequence[Any | None]) -> np.ndarray:
+    """Cosine similarity per candidate; candidates without an embedding score NaN."""
+    scores = np.full(len(embeddings), np.nan, dtype=np.float64)
+    present = [idx for idx, vector in enumerate(embeddings) if vector is not None and len(vector)]
+    if not present:
+        return scores
+    query = np.asarray(query_embedding, dtype=np.float32)
+    matrix = np.asarray([embeddings[idx] for idx in present], dtype=np.float32)
+    if matrix.shape[1] != query.shape[0]:
+        return scores
+    denom = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+    denom[denom == 0] = 1.0
+    scores[present] = (matrix @ query) / denom
+    return scores
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.zeros_like(values)
+    low, high = values[finite].min(), values[finite].max()
+    scaled = np.zeros_like(values) if high <= low else (values - low) / (high - low)
+    return np.where(finite, scaled, 0.0)
+
+
+class LocalReranker:
+    """Rank candidates by a weighted blend of BM25 and query-embedding cosine.
+
+    Both signals are min-max scaled across the candidate set before blending, so
+    ``lexical_weight`` is a plain mixing ratio. Without a query embedding, or when no
+    candidate carries one, the ranking is purely lexical.
+    """
+
+    def __init__(self, lexical_weight: float = 0.4) -> None:
+        self.lexical_weight = lexical_weight
+
+    def scores(
+        self,
+        query: str,
+        texts: Sequence[str],
+        query_embedding: Sequence[float] | None = None,
+        embeddings: Sequence[Any | None] | None = None,
+    ) -> np.ndarray:
+        lexical = _min_max(bm25_scores(query, texts))
+        if query_embedding is None or embeddings is None:
+            return lexical
+        cosine = cosine_scores(query_embedding, embeddings)
+        if not np.isfinite(cosine).any():
+            return lexical
+        return self.lexical_weight * lexical + (1 - self.lexical_weight) * _min_max(cosine)
+
+    def rerank(
+        self,
+        query: str,
+        texts: Sequence[str],
+        query_embedding: Sequence[float] | None = None,
+        embeddings: Sequence[Any | None] | None = None,
+    ) -> list[int]:
+        scores = self.scores(query, texts, query_embedding, embeddings)
+        # Stable sort keeps the fused retrieval order for ties.
+        return [int(idx) for idx in np.argsort(-scores, kind="stable")]
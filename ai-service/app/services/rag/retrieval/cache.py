@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import AppSettings, get_settings
+from app.core.metrics import metrics
+from app.models import IndexState
+from app.services.llm.embedding_cache import normalize_text
+from app.services.rag.retrieval.planner import QueryPlan
+
+_lookups_total = metrics.counter("retrieval_cache_lookups_total", "Retrieval cache lookups by outcome (hit/miss).")
+_evictions_total = metrics.counter("retrieval_cache_evictions_total", "Retrieval cache entries dropped, by reason.")
+
+_INDEX_STATE_ID = 1
+
+# Settings that change what ``RetrievalService.search`` returns for the same query.
+_FINGERPRINT_FIELDS = (
+    "retrieval_topk",
+    "rerank_topk",
+    "rerank_candidates",
+    "rerank_mode",
+    "rerank_lexical_weight",
+    "rerank_window_words",
+    "rerank_shard_size",
+    "gemini_model_rerank",
+    "rrf_k",
+    "rrf_vector_weight",
+    "rrf_text_weight",
+    "fts_config",
+    "vector_index_type",
+    "vector_hnsw_ef_search",
+    "vector_ivfflat_probes",
+    "vector_storage",
+    "vector_rescore_oversample",
+    "vector_iterative_scan",
+    "planner_exact_max_rows",
+    "chunk_partitioning",
+    "local_vector_ivf_probes",
+    "embedding_provider",
+    "gemini_model_embed",
+)
+
+
+class CachedChunk(NamedTuple):
+    """What a cached search keeps of a ``RetrievedChunk``: no ORM rows, no embedding."""
+
+    text: str
+    metadata: dict[str, Any]
+    score: float
+    ranks: tuple[tuple[str, int], ...]
+    distance: float | None
+    text_rank: float | None
+
+
+class CachedSearch(NamedTuple):
+    """Cached chunks plus the vector-leg plan that produced them, for ``retrieval_meta``."""
+
+    chunks: tuple[CachedChunk, ...]
+    plan: QueryPlan | None
+
+
+def settings_fingerprint(settings: AppSettings) -> str:
+    values = {name: getattr(settings, name) for name in _FINGERPRINT_FIELDS}
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+async def current_generation(session: AsyncSession) -> int:
+    generation = await session.scalar(select(IndexState.generation).where(IndexState.id == _INDEX_STATE_ID))
+    return int(generation or 0)
+
+
+async def bump_generation(session: AsyncSession) -> None:
+    """Advance the index generation as part of the caller's transaction."""
+    result = await session.execute(
+        update(IndexState)
+        .where(IndexState.id == _INDEX_STATE_ID)
+        .values(generation=IndexState.generation + 1)
+    )
+    if not result.rowcount:  # type: ignore[attr-defined]
+        session.add(IndexState(id=_INDEX_STATE_ID, generation=1))
+
+
+class RetrievalCache:
+    """Bounded, TTL'd LRU of final search results.
+
+    Keys combine the normalised query hash, the filters, a fingerprint of the retrieval
+    settings and the index generation, so any ingestion (which bumps the generation in
+    the shared database) makes every earlier entry unreachable in all workers; those
+    entries then age out through the LRU bound or the TTL.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, CachedSearch]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(query: str, filters: dict[str, str | None], fingerprint: str, generation: int) -> str:
+        digest = hashlib.sha256(normalize_text(query).casefold().encode("utf-8")).hexdigest()
+        scope = "|".join(f"{name}={filters.get(name) or ''}" for name in sorted(filters))
+        return f"{generation}:{fingerprint}:{scope}:{digest}"
+
+    def get(self, key: str) -> CachedSearch | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            _lookups_total.inc(outcome="miss")
+            return None
+        expires_at, search = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            _evictions_total.inc(reason="ttl")
+            _lookups_total.inc(outcome="miss")
+            return None
+        self._entries.move_to_end(key)
+        _lookups_total.inc(outcome="hit")
+        return search
+
+    def put(self, key: str, chunks: tuple[CachedChunk, ...], plan: QueryPlan | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, CachedSearch(chunks, plan))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            _evictions_total.inc(reason="size")
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+@lru_cache(maxsize=1)
+def get_retrieval_cache() -> RetrievalCache:
+    settings = get_settings()
+    return RetrievalCache(
+        max_entries=settings.retrieval_cache_max_entries,
+        ttl_seconds=settings.retrieval_cache_ttl_seconds,
+    )
@@ -0,0 +1,402 @@
+"""Memory-mapped vector index for the SQLite fallback, where pgvector is unavailable.
+
+The index lives in a directory shared by every worker process:
+
+* ``vectors.f32`` - L2-normalised float32 rows, appended in place
+* ``ids.i64`` - the chunk id of each row; tombstoned rows are overwritten with ``-1``
+* ``lists.i32`` - the IVF list of each row (``-1`` until the index is trained)
+* ``centroids.f32`` / ``meta.json`` - IVF centroids and the index header
+
+Readers map the files read-only and remap when another process has appended or
+retrained; writers serialise on an advisory lock file. With ``LOCAL_VECTOR_IVF_LISTS``
+unset the search is an exact brute-force scan. Otherwise the rows are clustered with
+spherical k-means once there are enough of them, and a query only scans the rows of
+its ``LOCAL_VECTOR_IVF_PROBES`` nearest lists.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+from collections.abc import AsyncIterator, Collection, Iterable, Iterator, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, cast
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.models import Chunk
+
+if sys.platform == "win32":  # pragma: no cover - Windows
+    import msvcrt
+else:
+    import fcntl
+
+logger = get_logger(__name__)
+
+# k-means needs a few dozen points per centroid to be meaningful.
+_MIN_ROWS_PER_LIST = 39
+_TRAIN_SAMPLE_PER_LIST = 256
+_TRAIN_ITERATIONS = 10
+
+
+def _lock(handle: BinaryIO, blocking: bool = True) -> bool:
+    try:
+        if sys.platform == "win32":  # pragma: no cover - Windows
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    except OSError:  # pragma: no cover - Windows reports a held lock as a plain OSError
+        if blocking:
+            raise
+        return False
+    return True
+
+
+def _unlock(handle: BinaryIO) -> None:
+    if sys.platform == "win32":  # pragma: no cover - Windows
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def _exclusive(path: Path) -> Iterator[None]:
+    with path.open("a+b") as handle:
+        _lock(handle)
+        try:
+            yield
+        finally:
+            _unlock(handle)
+
+
+@asynccontextmanager
+async def _exclusive_async(path: Path, poll_seconds: float = 0.05) -> AsyncIterator[None]:
+    """:func:`_exclusive` for coroutines: polls for the lock instead of blocking the event loop."""
+    with path.open("a+b") as handle:
+        while not _lock(handle, blocking=False):
+            await asyncio.sleep(poll_seconds)
+        try:
+            yield
+        finally:
+            _unlock(handle)
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return cast(np.ndarray, (matrix / norms).astype(np.float32, copy=False))
+
+
+@dataclass(slots=True)
+class _Snapshot:
+    key: tuple[int, int]
+    vectors: np.ndarray
+    ids: np.ndarray
+    lists: np.ndarray
+    centroids: np.ndarray | None
+    # First row of each id, when some id was appended twice (see ``build_from_database``).
+    unique: np.ndarray | None = None
+
+
+class LocalVectorIndex:
+    def __init__(self, path: str | Path, ivf_lists: int = 0, ivf_probes: int = 8) -> None:
+        self.path = Path(path)
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = max(1, ivf_probes)
+        self._snapshot: _Snapshot | None = None
+        self.build_lock = asyncio.Lock()
+        self.build_task: asyncio.Task[int] | None = None
+
+    @property
+    def exists(self) -> bool:
+        return (self.path / "meta.json").exists()
+
+    @property
+    def count(self) -> int:
+        """Live (non-tombstoned) rows."""
+        snapshot = self._refresh()
+        if snapshot is None:
+            return 0
+        live = snapshot.ids >= 0
+        if snapshot.unique is not None:
+            live &= snapshot.unique
+        return int(np.count_nonzero(live))
+
+    def create(self, dimension: int) -> None:
+        """Start an empty index (idempotent for the same dimension)."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with _exclusive(self.path / ".lock"):
+            if self.exists:
+                return
+            for name in ("vectors.f32", "ids.i64", "lists.i32"):
+                (self.path / name).touch()
+            self._write_meta({"dim": dimension, "trained": False})
+
+    def drop(self) -> None:
+        """Delete the index; the next local vector search rebuilds it from the database."""
+        if not self.path.exists():
+            return
+        with _exclusive(self.path / ".lock"):
+            # meta.json first, so concurrent readers see "no index" rather than a partial one.
+            for name in ("meta.json", "vectors.f32", "ids.i64", "lists.i32", "centroids.f32"):
+                (self.path / name).unlink(missing_ok=True)
+        self._snapshot = None
+
+    def append(self, ids: Sequence[int], vectors: Sequence[Sequence[float]]) -> None:
+        if not ids:
+            return
+        matrix = _normalise(np.asarray(vectors, dtype=np.float32))
+        if not self.exists:
+            self.create(matrix.shape[1])
+        with _exclusive(self.path / ".lock"):
+            meta = self._read_meta()
+            if matrix.shape[1] != meta["dim"]:
+                raise ValueError(f"embedding dimension {matrix.shape[1]} != index dimension {meta['dim']}")
+            lists = np.full(len(ids), -1, dtype=np.int32)
+            if meta["trained"]:
+                centroids = np.fromfile(self.path / "centroids.f32", dtype=np.float32).reshape(-1, meta["dim"])
+                lists = np.argmax(matrix @ centroids.T, axis=1).astype(np.int32)
+            # ids last: readers size their view by it, so a row is only visible once complete.
+            with (self.path / "vectors.f32").open("ab") as handle:
+                handle.write(matrix.tobytes())
+            with (self.path / "lists.i32").open("ab") as handle:
+                handle.write(lists.tobytes())
+            with (self.path / "ids.i64").open("ab") as handle:
+                handle.write(np.asarray(ids, dtype=np.int64).tobytes())
+            if self.ivf_lists and not meta["trained"]:
+                self._maybe_train(meta)
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Tombstone every row holding one of ``ids``; returns the number of rows removed."""
+        targets = np.fromiter(ids, dtype=np.int64)
+        if not targets.size or not self.exists:
+            return 0
+        with _exclusive(self.path / ".lock"):
+            stored = np.memmap(self.path / "ids.i64", dtype=np.int64, mode="r+") if self._rows() else None
+            if stored is None:
+                return 0
+            hits = np.isin(stored, targets)
+            removed = int(np.count_nonzero(hits))
+            if removed:
+                stored[hits] = -1
+                stored.flush()
+            del stored
+        return removed
+
+    def train(self) -> None:
+        """(Re)cluster all live rows into ``ivf_lists`` lists."""
+        if not self.ivf_lists or not self.exists:
+            return
+        with _exclusive(self.path / ".lock"):
+            self._train(self._read_meta())
+
+    def search(
+        self, query: Sequence[float], k: int, allowed: Collection[int] | None = None
+    ) -> list[tuple[int, float]]:
+        """The ``k`` nearest chunk ids by cosine distance, closest first.
+
+        With ``allowed``, only those ids are ranked, exactly (IVF probing is skipped).
+        """
+        snapshot = self._refresh()
+        if snapshot is None or k <= 0 or not len(snapshot.ids):
+            return []
+        vector = np.asarray(query, dtype=np.float32)
+        if vector.shape[0] != snapshot.vectors.shape[1]:
+            logger.warning(
+                "local_vector_index_dimension_mismatch", query=vector.shape[0], index=snapshot.vectors.shape[1]
+            )
+            return []
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+
+        live = snapshot.ids >= 0
+        if snapshot.unique is not None:
+            live &= snapshot.unique
+        if allowed is not None:
+            live &= np.isin(snapshot.ids, np.fromiter(allowed, dtype=np.int64))
+        elif snapshot.centroids is not None:
+            probes = np.argsort(-(snapshot.centroids @ vector))[: self.ivf_probes]
+            live &= np.isin(snapshot.lists, probes) | (snapshot.lists < 0)
+        rows = np.flatnonzero(live)
+        if not rows.size:
+            return []
+        similarity = snapshot.vectors[rows] @ vector
+        if rows.size > k:
+            top = np.argpartition(-similarity, k - 1)[:k]
+        else:
+            top = np.arange(rows.size)
+        top = top[np.argsort(-similarity[top], kind="stable")]
+        return [(int(snapshot.ids[rows[idx]]), float(1.0 - similarity[idx])) for idx in top]
+
+    def _rows(self) -> int:
+        return (self.path / "ids.i64").stat().st_size // 8
+
+    def _refresh(self) -> _Snapshot | None:
+        if not self.exists:
+            self._snapshot = None
+            return None
+        rows = self._rows()
+        key = (rows, (self.path / "meta.json").stat().st_mtime_ns)
+        if self._snapshot is not None and self._snapshot.key == key:
+            return self._snapshot
+        meta = self._read_meta()
+        dim = int(meta["dim"])
+        vectors: np.ndarray
+        ids: np.ndarray
+        lists: np.ndarray
+        if rows:
+            vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r", shape=(rows, dim))
+            ids = np.memmap(self.path / "ids.i64", dtype=np.int64, mode="r", shape=(rows,))
+            lists = np.memmap(self.path / "lists.i32", dtype=np.int32, mode="r", shape=(rows,))
+        else:
+            vectors = np.empty((0, dim), dtype=np.float32)
+            ids = np.empty(0, dtype=np.int64)
+            lists = np.empty(0, dtype=np.int32)
+        centroids = None
+        if meta["trained"]:
+            centroids = np.fromfile(self.path / "centroids.f32", dtype=np.float32).reshape(-1, dim)
+        unique = None
+        live = np.flatnonzero(ids >= 0)
+        _, first = np.unique(ids[live], return_index=True)
+        if first.size < live.size:
+            unique = np.zeros(rows, dtype=bool)
+            unique[live[first]] = True
+        self._snapshot = _Snapshot(
+            key=key, vectors=vectors, ids=ids, lists=lists, centroids=centroids, unique=unique
+        )
+        return self._snapshot
+
+    def _read_meta(self) -> dict[str, Any]:
+        return cast(dict[str, Any], json.loads((self.path / "meta.json").read_text()))
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        scratch = self.path / "meta.json.tmp"
+        scratch.write_text(json.dumps(meta))
+        os.replace(scratch, self.path / "meta.json")
+
+    def _maybe_train(self, meta: dict[str, Any]) -> None:
+        ids = np.fromfile(self.path / "ids.i64", dtype=np.int64)
+        if np.count_nonzero(ids >= 0) >= self.ivf_lists * _MIN_ROWS_PER_LIST:
+            self._train(meta)
+
+    def _train(self, meta: dict[str, Any]) -> None:
+        dim = int(meta["dim"])
+        rows = self._rows()
+        vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r", shape=(rows, dim))
+        live = np.flatnonzero(np.fromfile(self.path / "ids.i64", dtype=np.int64) >= 0)
+        if live.size < self.ivf_lists:
+            return
+        rng = np.random.default_rng(0)
+        sample_size = min(live.size, self.ivf_lists * _TRAIN_SAMPLE_PER_LIST)
+        sample = np.asarray(vectors[np.sort(rng.choice(live, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, self.ivf_lists, replace=False)]
+        for _ in range(_TRAIN_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~np.any(sums, axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalise(sums)
+
+        lists = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, 65_536):
+            block = np.asarray(vectors[start : start + 65_536])
+            lists[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        del vectors
+        # Replace rather than rewrite, so readers still mapping the old lists are unaffected.
+        self._snapshot = None
+        for name, array in (("centroids.f32", centroids.astype(np.float32)), ("lists.i32", lists)):
+            array.tofile(self.path / f"{name}.tmp")
+            os.replace(self.path / f"{name}.tmp", self.path / name)
+        self._write_meta({**meta, "trained": True})
+        logger.info("local_vector_index_trained", lists=self.ivf_lists, rows=int(live.size))
+
+
+_INDEX_FILES = ("vectors.f32", "ids.i64", "lists.i32", "centroids.f32")
+
+
+async def _load_chunks(
+    session: AsyncSession, index: LocalVectorIndex, after_id: int, batch_size: int
+) -> tuple[int, int]:
+    """Append every stored chunk with an id above ``after_id``; returns (rows loaded, last id)."""
+    loaded = 0
+    while True:
+        stmt = select(Chunk.id, Chunk.embedding).where(Chunk.id > after_id).order_by(Chunk.id).limit(batch_size)
+        rows = (await session.execute(stmt)).all()
+        if not rows:
+            return loaded, after_id
+        index.append([row.id for row in rows], [row.embedding for row in rows])
+        loaded += len(rows)
+        after_id = rows[-1].id
+
+
+async def build_from_database(session: AsyncSession, index: LocalVectorIndex, batch_size: int = 1000) -> int:
+    """Populate an index that does not exist yet from every stored chunk embedding.
+
+    Called lazily before the first local vector search; until then ingestion leaves the
+    index alone, so rows committed in the meantime are picked up here. The rows are
+    loaded into a scratch directory and moved into place with ``meta.json`` last, so an
+    interrupted build leaves no index behind and the next search starts over. Rows
+    committed while the build ran are loaded after the move; if ingestion appends them
+    too, readers keep only the first row of such an id.
+    """
+    async with index.build_lock:
+        index.path.mkdir(parents=True, exist_ok=True)
+        # Another worker may hold the file lock for the whole build; wait without blocking the loop.
+        async with _exclusive_async(index.path / ".build.lock"):
+            if index.exists:
+                return 0
+            scratch = LocalVectorIndex(index.path / ".build", ivf_lists=index.ivf_lists, ivf_probes=index.ivf_probes)
+            scratch.drop()
+            loaded, last_id = await _load_chunks(session, scratch, 0, batch_size)
+            if not loaded:
+                return 0
+            with _exclusive(index.path / ".lock"):
+                for name in (*_INDEX_FILES, "meta.json"):
+                    if (scratch.path / name).exists():
+                        os.replace(scratch.path / name, index.path / name)
+            shutil.rmtree(scratch.path, ignore_errors=True)
+            caught_up, _ = await _load_chunks(session, index, last_id, batch_size)
+            loaded += caught_up
+    logger.info("local_vector_index_built", rows=loaded, path=str(index.path))
+    return loaded
+
+
+async def ensure_built(index: LocalVectorIndex, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    """Run :func:`build_from_database` once, in its own task and session.
+
+    Callers wait under their own timeouts; cancelling them does not interrupt the
+    build, which the next search would otherwise have to start again.
+    """
+    if index.exists:
+        return
+    if index.build_task is None or index.build_task.done():
+        index.build_task = asyncio.create_task(_build_in_session(index, sessionmaker))
+    await asyncio.shield(index.build_task)
+
+
+async def _build_in_session(index: LocalVectorIndex, sessionmaker: async_sessionmaker[AsyncSession]) -> int:
+    async with sessionmaker() as session:
+        return await build_from_database(session, index)
+
+
+@lru_cache(maxsize=1)
+def get_local_vector_index() -> LocalVectorIndex:
+    settings = get_settings()
+    return LocalVectorIndex(
+        settings.local_vector_index_path,
+        ivf_lists=settings.local_vector_ivf_lists,
+        ivf_probes=settings.local_vector_ivf_probes,
+    )
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import AppSettings
+from app.core.metrics import metrics
+from app.db.partitions import partition_keys
+from app.db.vector_index import query_parameters, rescore_candidates
+from app.models import ChunkFilterCount
+
+_plans_total = metrics.counter("retrieval_plans_total", "Vector leg query plans by strategy.")
+
+Strategy = Literal["ann", "ann_filtered", "exact", "partition"]
+FilterKey = tuple[str, str]
+
+# pgvector rejects larger hnsw.ef_search values.
+MAX_HNSW_EF_SEARCH = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class QueryPlan:
+    """How the vector leg runs for one set of metadata filters.
+
+    ``ann`` is a plain index scan (no filters). ``ann_filtered`` keeps the ANN index but
+    widens the scan by the inverse filter selectivity, and lets pgvector continue with
+    an iterative scan when ``VECTOR_ITERATIVE_SCAN`` allows it. ``exact`` skips the ANN index
+    and ranks every chunk passing the filters, for subsets of at most
+    ``PLANNER_EXACT_MAX_ROWS`` chunks, where an index scan would mostly find rows the
+    filter then discards. ``partition`` applies when every filter is a partition key
+    (``CHUNK_PARTITIONING``): the pruned partitions hold only matching chunks, so their own
+    ANN indexes are scanned as configured.
+    """
+
+    strategy: Strategy
+    selectivity: float = 1.0
+    matching_rows: int | None = None
+    parameters: dict[str, str] = field(default_factory=dict)
+
+    def as_meta(self) -> dict[str, Any]:
+        return {
+            "vector_strategy": self.strategy,
+            "filter_selectivity": round(self.selectivity, 4),
+            "filter_rows": self.matching_rows,
+        }
+
+
+def filter_key(permit_type: str | None, region: str | None) -> FilterKey:
+    return permit_type or "", region or ""
+
+
+async def load_filter_counts(session: AsyncSession) -> dict[FilterKey, int]:
+    rows = await session.execute(select(ChunkFilterCount.permit_type, ChunkFilterCount.region, ChunkFilterCount.chunks))
+    return {(permit_type, region): int(chunks) for permit_type, region, chunks in rows.all()}
+
+
+async def adjust_filter_counts(session: AsyncSession, deltas: Mapping[FilterKey, int]) -> None:
+    """Apply chunk count changes as part of the caller's transaction."""
+    for (permit_type, region), delta in deltas.items():
+        if not delta:
+            continue
+        result = await session.execute(
+            update(ChunkFilterCount)
+            .where(ChunkFilterCount.permit_type == permit_type, ChunkFilterCount.region == region)
+            .values(chunks=ChunkFilterCount.chunks + delta)
+        )
+        if not result.rowcount:  # type: ignore[attr-defined]
+            session.add(ChunkFilterCount(permit_type=permit_type, region=region, chunks=max(delta, 0)))
+
+
+def plan_query(settings: AppSettings, counts: Mapping[FilterKey, int], filters: Mapping[str, str | None]) -> QueryPlan:
+    permit_type, region = filters.get("permit_type"), filters.get("region")
+    if not permit_type and not region:
+        strategy: Strategy = "exact" if settings.vector_index_type == "none" else "ann"
+        return _record(QueryPlan(strategy, parameters=query_parameters(settings)))
+
+    total = sum(counts.values())
+    matching = sum(
+        chunks
+        for (key_permit, key_region), chunks in counts.items()
+        if (not permit_type or key_permit == permit_type) and (not region or key_region == region)
+    )
+    selectivity = matching / total if total else 0.0
+    if settings.vector_index_type == "none":
+        return _record(QueryPlan("exact", selectivity, matching))
+    if matching <= settings.planner_exact_max_rows:
+        # Keep the planner off the ANN index; filter first, then rank the survivors exactly.
+        return _record(QueryPlan("exact", selectivity, matching, {"enable_indexscan": "off"}))
+
+    keys = partition_keys(settings)
+    active = {name for name, value in (("permit_type", permit_type), ("region", region)) if value}
+    if keys and active <= set(keys):
+        return _record(QueryPlan("partition", selectivity, matching, query_parameters(settings)))
+
+    # Within the partitions left after pruning on permit_type, if any.
+    scope = total
+    if permit_type and "permit_type" in keys:
+        scope = sum(chunks for (key_permit, _), chunks in counts.items() if key_permit == permit_type)
+    scoped = matching / scope
+
+    parameters = query_parameters(settings)
+    if settings.vector_index_type == "hnsw":
+        wanted = rescore_candidates(settings) if settings.vector_storage != "float" else settings.retrieval_topk
+        ef_search = max(int(parameters["hnsw.ef_search"]), math.ceil(wanted / scoped))
+        parameters["hnsw.ef_search"] = str(min(ef_search, MAX_HNSW_EF_SEARCH))
+    else:
+        probes = math.ceil(int(settings.vector_ivfflat_probes) / scoped)
+        parameters["ivfflat.probes"] = str(min(probes, int(settings.vector_ivfflat_lists)))
+    if settings.vector_iterative_scan != "off":
+        parameters[f"{settings.vector_index_type}.iterative_scan"] = settings.vector_iterative_scan
+    return _record(QueryPlan("ann_filtered", selectivity, matching, parameters))
+
+
+def _record(plan: QueryPlan) -> QueryPlan:
+    _plans_total.inc(strategy=plan.strategy)
+    return plan
@@ -1,110 +1,314 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from dataclasses import dataclass
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
 from typing import Any
 
-from sqlalchemy import Select, func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+import httpx
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Select, bindparam, cast, func, literal, literal_column, select, text
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql.expression import ColumnClause
 
 from app.core.config import get_settings
+from app.core.errors import ModelUnavailableError
 from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.session import dialect_name, get_sessionmaker
+from app.db.vector_index import coarse_distance_sql, rescore_candidates, set_query_parameters
 from app.models import Chunk, Document
 from app.services.llm.gemini import get_gemini_client
+from app.services.rag.rerank.llm import LLMReranker
+from app.services.rag.rerank.service import LocalReranker
+from app.services.rag.retrieval.cache import (
+    CachedChunk,
+    RetrievalCache,
+    current_generation,
+    get_retrieval_cache,
+    settings_fingerprint,
+)
+from app.services.rag.retrieval.local_index import ensure_built, get_local_vector_index
+from app.services.rag.retrieval.planner import QueryPlan, load_filter_counts, plan_query
 
 logger = get_logger(__name__)
 
+# Generated in Postgres only (see the 20241026_05 migration), so it is not mapped on Chunk.
+_TEXT_SEARCH: ColumnClause[Any] = literal_column("chunks.text_search")
+
+_leg_outcomes = metrics.counter("retrieval_leg_outcomes_total", "Retrieval legs by leg and outcome.")
+_leg_seconds = metrics.histogram("retrieval_leg_seconds", "Wall time of completed retrieval legs.")
+
 
 @dataclass(slots=True)
 class RetrievedChunk:
+    """A retrieved chunk with its fused score and the raw signal from each leg.
+
+    ``ranks`` maps leg name (``vector`` / ``text``) to the 1-based rank the chunk had in
+    that leg. ``distance`` is the cosine distance from the vector leg and ``text_rank``
+    the ``ts_rank_cd`` from the Postgres lexical leg, when those legs found it.
+    """
+
     text: str
     metadata: dict[str, Any]
     score: float
+    embedding: Any | None = None
+    ranks: dict[str, int] = field(default_factory=dict)
+    distance: float | None = None
+    text_rank: float | None = None
 
 
 class RetrievalService:
-    def __init__(self, session: AsyncSession) -> None:
+    """Hybrid vector + lexical retrieval.
+
+    The vector leg (query embedding, then the ANN query on ``session``) and the lexical
+    leg (on its own pooled session) run concurrently, each under its own timeout. A leg
+    that fails or runs late contributes nothing; the merge goes ahead with the rest.
+    Complete (non-degraded) results are cached per index generation, see
+    :class:`RetrievalCache`. How the vector leg ran for the filters (see
+    :class:`QueryPlan`) is kept on ``last_plan`` for the retrieval metadata.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        sessionmaker: Callable[[], async_sessionmaker[AsyncSession]] = get_sessionmaker,
+    ) -> None:
         self.session = session
+        self.sessionmaker = sessionmaker
         self.settings = get_settings()
         self.gemini = get_gemini_client()
+        self.reranker = LocalReranker(self.settings.rerank_lexical_weight)
+        self.cache = get_retrieval_cache() if self.settings.retrieval_cache_enabled else None
+        self.last_plan: QueryPlan | None = None
 
     async def search(
         self, query: str, filters: dict[str, str | None]
     ) -> list[RetrievedChunk]:
-        embedding = await self.gemini.embed_text(query)
-        vector_results: list[RetrievedChunk] = []
-        if self._supports_vector_search():
-            vector_stmt = self._build_vector_stmt(embedding, filters).limit(
-                self.settings.retrieval_topk
-            )
-            vector_rows = (await self.session.execute(vector_stmt)).all()
-            vector_results = [self._row_to_chunk(row, base=0.5) for row in vector_rows]
+        self.last_plan = None
+        cache_key: str | None = None
+        if self.cache is not None:
+            generation = await current_generation(self.session)
+            cache_key = RetrievalCache.key(query, filters, settings_fingerprint(self.settings), generation)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.last_plan = cached.plan
+                return [self._from_cached(item) for item in cached.chunks]
 
-        text_stmt = self._build_text_stmt(query, filters).limit(
-            self.settings.retrieval_topk
-        )
-        text_rows = (await self.session.execute(text_stmt)).all()
-        text_results = [self._row_to_chunk(row, base=0.3) for row in text_rows]
+        embedding: list[float] | None = None
 
-        combined = self._merge_results(vector_results, text_results)
+        async def vector_leg() -> list[RetrievedChunk] | None:
+            nonlocal embedding
+            try:
+                embedding = await self.gemini.embed_text(query)
+            except ModelUnavailableError:
+                logger.warning("retrieval_embedding_unavailable")
+                return []
+            except (httpx.HTTPError, ValueError) as exc:
+                # Transport failure after retries, or an unusable embedding response.
+                logger.warning("retrieval_embedding_failed", error=str(exc))
+                _leg_outcomes.inc(leg="vector", outcome="error")
+                return None
+            return await self._vector_results(embedding, filters)
+
+        vector_results, text_results = await asyncio.gather(
+            self._run_leg("vector", vector_leg(), self.settings.retrieval_vector_timeout_seconds),
+            self._run_leg("text", self._text_results(query, filters), self.settings.retrieval_text_timeout_seconds),
+        )
+        if vector_results is None:
+            # The vector query may have been cancelled mid-flight; reset the shared session.
+            await self.session.rollback()
 
-        texts = [chunk.text for chunk in combined]
-        rerank_indices = await self.gemini.rerank(query, texts)
+        combined = self._merge_results(vector_results or [], text_results or [])
+        combined = combined[: self.settings.rerank_candidates]
+        rerank_indices, reranked_fully = await self._rerank(query, embedding, combined)
         reranked = [combined[i] for i in rerank_indices if i < len(combined)]
         if not reranked:
             reranked = combined
-        return reranked[: self.settings.rerank_topk]
+        results = reranked[: self.settings.rerank_topk]
+
+        complete = reranked_fully and embedding is not None and None not in (vector_results, text_results)
+        if self.cache is not None and cache_key is not None and complete:
+            self.cache.put(cache_key, tuple(self._to_cached(chunk) for chunk in results), self.last_plan)
+        return results
+
+    @staticmethod
+    def _to_cached(chunk: RetrievedChunk) -> CachedChunk:
+        return CachedChunk(
+            text=chunk.text,
+            metadata=dict(chunk.metadata),
+            score=chunk.score,
+            ranks=tuple(chunk.ranks.items()),
+            distance=chunk.distance,
+            text_rank=chunk.text_rank,
+        )
+
+    @staticmethod
+    def _from_cached(item: CachedChunk) -> RetrievedChunk:
+        return RetrievedChunk(
+            text=item.text,
+            metadata=dict(item.metadata),
+            score=item.score,
+            ranks=dict(item.ranks),
+            distance=item.distance,
+            text_rank=item.text_rank,
+        )
+
+    async def _run_leg(
+        self, leg: str, results: Awaitable[list[RetrievedChunk] | None], timeout: float
+    ) -> list[RetrievedChunk] | None:
+        """Await one leg; ``None`` when it timed out or failed (already counted and logged)."""
+        started = time.perf_counter()
+        try:
+            found = await asyncio.wait_for(results, timeout)
+        except TimeoutError:
+            logger.warning("retrieval_leg_timeout", leg=leg, timeout=timeout)
+            _leg_outcomes.inc(leg=leg, outcome="timeout")
+            return None
+        except (SQLAlchemyError, OSError, httpx.HTTPError, ValueError) as exc:
+            logger.warning("retrieval_leg_failed", leg=leg, error=str(exc))
+            _leg_outcomes.inc(leg=leg, outcome="error")
+            return None
+        if found is None:
+            return None
+        _leg_outcomes.inc(leg=leg, outcome="ok")
+        _leg_seconds.observe(time.perf_counter() - started, leg=leg)
+        return found
+
+    async def _vector_results(
+        self, embedding: list[float], filters: dict[str, str | None]
+    ) -> list[RetrievedChunk]:
+        counts = await load_filter_counts(self.session) if any(filters.values()) else {}
+        plan = self.last_plan = plan_query(self.settings, counts, filters)
+        if self._using_sqlite():
+            return await self._local_vector_results(embedding, filters, plan)
+        vector_stmt = self._build_vector_stmt(embedding, filters, plan).limit(
+            self.settings.retrieval_topk
+        )
+        # The knobs are SET LOCAL, i.e. they would last for the rest of the request's
+        # transaction (``enable_indexscan=off`` included); rolling back a savepoint undoes them.
+        savepoint = await self.session.begin_nested()
+        try:
+            await set_query_parameters(self.session, plan.parameters)
+            vector_rows = (await self.session.execute(vector_stmt)).all()
+            return [self._row_to_chunk(row, "vector", rank) for rank, row in enumerate(vector_rows, start=1)]
+        finally:
+            await savepoint.rollback()
+
+    async def _local_vector_results(
+        self, embedding: list[float], filters: dict[str, str | None], plan: QueryPlan
+    ) -> list[RetrievedChunk]:
+        """Vector leg without pgvector: nearest ids from the mmap index, rows from SQLite."""
+        index = get_local_vector_index()
+        # Its own session on the same database: the build outlives this leg's timeout.
+        await ensure_built(index, async_sessionmaker(bind=self.session.bind, expire_on_commit=False))
+        limit = self.settings.retrieval_topk
+        allowed: list[int] | None = None
+        fetch = limit
+        if plan.strategy == "exact" and any(filters.values()):
+            allowed = list((await self.session.scalars(self._chunk_ids_stmt(filters))).all())
+        elif plan.strategy != "ann" and plan.selectivity > 0:
+            # Metadata filters are applied after the index lookup, so over-fetch to keep recall.
+            fetch = math.ceil(limit / plan.selectivity)
+        hits = dict(await asyncio.to_thread(index.search, embedding, fetch, allowed))
+        if not hits:
+            return []
+        stmt = select(Chunk, Document).join(Document, Chunk.document_id == Document.id).where(Chunk.id.in_(hits))
+        stmt = self._apply_metadata_filters(stmt, filters)
+        rows = sorted((await self.session.execute(stmt)).all(), key=lambda row: hits[row[0].id])[:limit]
+        return [
+            self._row_to_chunk((row[0], row[1], hits[row[0].id]), "vector", rank)
+            for rank, row in enumerate(rows, start=1)
+        ]
+
+    async def _text_results(
+        self, query: str, filters: dict[str, str | None]
+    ) -> list[RetrievedChunk]:
+        text_stmt = self._build_text_stmt(query, filters).limit(
+            self.settings.retrieval_topk
+        )
+        async with self.sessionmaker()() as session:
+            text_rows = (await session.execute(text_stmt)).all()
+        return [self._row_to_chunk(row, "text", rank) for rank, row in enumerate(text_rows, start=1)]
+
+    async def _rerank(
+        self, query: str, embedding: list[float] | None, candidates: list[RetrievedChunk]
+    ) -> tuple[list[int], bool]:
+        """Candidate order, and whether the configured reranker produced it."""
+        texts = [chunk.text for chunk in candidates]
+        local_order = self.reranker.rerank(query, texts, embedding, [chunk.embedding for chunk in candidates])
+        if self.settings.rerank_mode == "local":
+            return local_order, True
+        try:
+            result = await LLMReranker(self.gemini, self.settings).rerank(query, texts, prior=local_order)
+        except (ModelUnavailableError, httpx.HTTPError, ValueError) as exc:
+            logger.warning("retrieval_rerank_unavailable", error=str(exc))
+            return local_order, False
+        return result.order, True
 
     def _build_vector_stmt(
+        self, embedding: list[float], filters: dict[str, str | None], plan: QueryPlan | None = None
+    ) -> Select[Any]:
+        distance = Chunk.embedding.cosine_distance(embedding).label("distance")
+        stmt = select(Chunk, Document, distance).join(Document, Chunk.document_id == Document.id)
+        if self.settings.vector_storage == "float" or (plan is not None and plan.strategy == "exact"):
+            stmt = self._apply_metadata_filters(stmt, filters)
+        else:
+            # Two-stage search: coarse candidates from the quantized index, exact float rescoring.
+            stmt = stmt.where(Chunk.id.in_(self._build_coarse_stmt(embedding, filters)))
+        return stmt.order_by(distance)
+
+    def _build_coarse_stmt(
         self, embedding: list[float], filters: dict[str, str | None]
     ) -> Select[Any]:
-        stmt = select(Chunk, Document).join(Document, Chunk.document_id == Document.id)
-        stmt = self._apply_metadata_filters(stmt, filters)
-        stmt = stmt.order_by(Chunk.embedding.cosine_distance(embedding))
-        return stmt
+        coarse_distance = text(coarse_distance_sql(self.settings)).bindparams(
+            bindparam("query", embedding, type_=Vector())
+        )
+        stmt = self._chunk_ids_stmt(filters)
+        return stmt.order_by(coarse_distance).limit(rescore_candidates(self.settings))
+
+    def _chunk_ids_stmt(self, filters: dict[str, str | None]) -> Select[Any]:
+        return self._apply_metadata_filters(select(Chunk.id), filters)
 
     def _build_text_stmt(
         self, query: str, filters: dict[str, str | None]
     ) -> Select[Any]:
-        like_term = f"%{query.lower()}%"
         stmt = select(Chunk, Document).join(Document, Chunk.document_id == Document.id)
-        stmt = stmt.where(func.lower(Chunk.text).like(like_term))
+        if self._using_sqlite():
+            like_term = f"%{query.lower()}%"
+            stmt = stmt.where(func.lower(Chunk.text).like(like_term))
+            stmt = self._apply_metadata_filters(stmt, filters)
+            return stmt.order_by(func.length(Chunk.text))
+        ts_query = func.websearch_to_tsquery(cast(literal(self.settings.fts_config), REGCONFIG), query)
+        text_rank = func.ts_rank_cd(_TEXT_SEARCH, ts_query).label("text_rank")
+        stmt = stmt.add_columns(text_rank).where(_TEXT_SEARCH.op("@@")(ts_query))
         stmt = self._apply_metadata_filters(stmt, filters)
-        stmt = stmt.order_by(func.length(Chunk.text))
-        return stmt
+        return stmt.order_by(text_rank.desc())
 
     def _apply_metadata_filters(
         self, stmt: Select[Any], filters: dict[str, str | None]
     ) -> Select[Any]:
-        for key in ("permit_type", "region"):
-            value = filters.get(key)
+        # The chunk copies are the partition keys, so these predicates also prune partitions.
+        for column in (Chunk.permit_type, Chunk.region):
+            value = filters.get(column.key)
             if not value:
                 continue
-            stmt = stmt.where(self._metadata_field(key) == value)
+            stmt = stmt.where(column == value)
         return stmt
 
-    def _metadata_field(self, key: str) -> Any:
-        if self._using_sqlite():
-            return func.json_extract(Chunk.chunk_metadata, f'$.{key}')
-        return Chunk.chunk_metadata[key].astext
-
-    def _supports_vector_search(self) -> bool:
-        return not self._using_sqlite()
-
     def _using_sqlite(self) -> bool:
-        bind = getattr(self.session, "bind", None)
-        if bind is None:
-            return False
-        sync_engine = getattr(bind, "sync_engine", None)
-        if sync_engine is not None:
-            dialect_name = sync_engine.dialect.name
-        else:
-            dialect_name = bind.dialect.name
-        return dialect_name.lower() == "sqlite"
+        return dialect_name(self.session) == "sqlite"
 
     def _merge_results(
         self, vector_results: list[RetrievedChunk], text_results: list[RetrievedChunk]
     ) -> list[RetrievedChunk]:
+        """Reciprocal rank fusion: ``score = sum(weight_leg / (RRF_K + rank_leg))``."""
+        weights = {"vector": self.settings.rrf_vector_weight, "text": self.settings.rrf_text_weight}
         merged: dict[str, RetrievedChunk] = {}
         for item in vector_results + text_results:
             key = "::".join(
@@ -114,24 +318,48 @@ class RetrievalService:
                     str(item.metadata.get('order')),
                 ]
             )
-            if key in merged:
-                merged[key].score = max(merged[key].score, item.score)
-            else:
-                merged[key] = item
+            existing = merged.setdefault(key, item)
+            if existing is not item:
+                existing.ranks.update(item.ranks)
+                existing.distance = existing.distance if existing.distance is not None else item.distance
+                existing.text_rank = existing.text_rank if existing.text_rank is not None else item.text_rank
+                existing.embedding = existing.embedding if existing.embedding is not None else item.embedding
+        for item in merged.values():
+            item.score = sum(
+                weights[leg] / (self.settings.rrf_k + rank) for leg, rank in item.ranks.items()
+            )
         return sorted(merged.values(), key=lambda x: x.score, reverse=True)
 
-    def _row_to_chunk(self, row: Any, base: float) -> RetrievedChunk:
+    def _row_to_chunk(self, row: Any, leg: str, rank: int) -> RetrievedChunk:
         chunk: Chunk = row[0]
         document: Document = row[1]
         metadata_raw = chunk.chunk_metadata
         if isinstance(metadata_raw, str):
             try:
-                metadata = json.loads(metadata_raw)
+                position = json.loads(metadata_raw)
             except json.JSONDecodeError:  # pragma: no cover - defensive
-                metadata = {}
+                position = {}
         else:
-            metadata = dict(metadata_raw)
-        metadata.setdefault("source_title", metadata.get("source_title") or document.url)
-        metadata.setdefault("version_date", metadata.get("version_date"))
-        return RetrievedChunk(text=chunk.text, metadata=metadata, score=base)
-
+            position = dict(metadata_raw)
+        metadata = {
+            "source_url": document.url,
+            "source_title": document.title or document.url,
+            "permit_type": document.permit_type,
+            "region": document.region,
+            "language": document.language,
+            "version_date": document.version_date.isoformat() if document.version_date else None,
+            "selectors": document.selectors,
+            "ingested_at": document.ingested_at.isoformat() if document.ingested_at else None,
+            "section": position.get("section"),
+            "order": position.get("order"),
+        }
+        raw = float(row[2]) if len(row) > 2 and row[2] is not None else None
+        return RetrievedChunk(
+            text=chunk.text,
+            metadata=metadata,
+            score=0.0,
+            embedding=chunk.embedding,
+            ranks={leg: rank},
+            distance=raw if leg == "vector" else None,
+            text_rank=raw if leg == "text" else None,
+        )
@@ -0,0 +1 @@
+"""Micro-benchmarks for the AI service hot paths."""
@@ -0,0 +1,129 @@
+"""Recall@k and latency of the pgvector ANN index against exact search.
+
+Requires a Postgres with the ``vector`` extension at ``DATABASE_URL``. For each corpus
+size a scratch table is filled with clustered unit vectors, indexed with the configured
+``VECTOR_INDEX_TYPE`` / build parameters, and queried with a sweep of search-time
+parameters (``hnsw.ef_search`` or ``ivfflat.probes``). Exact neighbours come from the
+same query with index scans disabled. The scratch table is dropped afterwards.
+
+    python -m benchmarks.ann_recall --sizes 10000,50000,100000 --dim 768 --k 24
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import get_settings
+from app.db.vector_index import create_index_sql
+
+TABLE = "ann_bench_vectors"
+INDEX = "ix_ann_bench_vectors_embedding"
+
+
+def _vectors(rng: np.random.Generator, count: int, dim: int, clusters: int) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, count)
+    data = centers[assignment] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def _literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+
+
+async def _load(conn: AsyncConnection, data: np.ndarray, batch: int = 1000) -> None:
+    await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    await conn.execute(text(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding vector({data.shape[1]}))"))
+    for start in range(0, len(data), batch):
+        rows = [{"id": start + idx, "embedding": _literal(vec)} for idx, vec in enumerate(data[start : start + batch])]
+        insert = f"INSERT INTO {TABLE} (id, embedding) VALUES (:id, CAST(:embedding AS vector))"  # noqa: S608
+        await conn.execute(text(insert), rows)
+
+
+async def _search(conn: AsyncConnection, query: np.ndarray, k: int, knobs: dict[str, str]) -> list[int]:
+    # The connection is in autocommit mode, so knobs are set per session and reset afterwards.
+    for name, value in knobs.items():
+        await conn.execute(text("SELECT set_config(:name, :value, false)"), {"name": name, "value": value})
+    try:
+        result = await conn.execute(
+            text(f"SELECT id FROM {TABLE} ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),  # noqa: S608
+            {"q": _literal(query), "k": k},
+        )
+        return [row[0] for row in result]
+    finally:
+        for name in knobs:
+            await conn.execute(text(f"RESET {name}"))
+
+
+async def _run(args: argparse.Namespace) -> None:
+    settings = get_settings().model_copy(update={"vector_dim": args.dim, "vector_storage": "float"})
+    if settings.vector_index_type == "none":
+        raise SystemExit("VECTOR_INDEX_TYPE=none: nothing to benchmark")
+    knob = "hnsw.ef_search" if settings.vector_index_type == "hnsw" else "ivfflat.probes"
+    sweep = [int(value) for value in args.sweep.split(",")]
+    ddl = create_index_sql(settings, table=TABLE, name=INDEX)
+    if ddl is None:
+        raise SystemExit(f"dim={args.dim} cannot be indexed as vector")
+
+    engine = create_async_engine(
+        settings.database_url.get_secret_value(), isolation_level="AUTOCOMMIT", future=True
+    )
+    rng = np.random.default_rng(args.seed)
+    print(f"index={settings.vector_index_type} dim={args.dim} k={args.k} queries={args.queries}")
+    try:
+        async with engine.connect() as conn:
+            for size in (int(value) for value in args.sizes.split(",")):
+                data = _vectors(rng, size, args.dim, args.clusters)
+                queries = _vectors(rng, args.queries, args.dim, args.clusters)
+                await _load(conn, data)
+                started = time.perf_counter()
+                await conn.execute(text(ddl))
+                build_seconds = time.perf_counter() - started
+                await conn.execute(text(f"ANALYZE {TABLE}"))
+
+                exact_seconds: list[float] = []
+                truth: list[set[int]] = []
+                for query in queries:
+                    started = time.perf_counter()
+                    truth.append(set(await _search(conn, query, args.k, {"enable_indexscan": "off"})))
+                    exact_seconds.append(time.perf_counter() - started)
+                print(
+                    f"n={size:>8} build {build_seconds:7.2f}s  exact p50 {np.median(exact_seconds) * 1000:8.2f} ms"
+                )
+
+                for value in sweep:
+                    seconds: list[float] = []
+                    recalls: list[float] = []
+                    for query, expected in zip(queries, truth):
+                        started = time.perf_counter()
+                        found = await _search(conn, query, args.k, {knob: str(value)})
+                        seconds.append(time.perf_counter() - started)
+                        recalls.append(len(expected & set(found)) / args.k)
+                    print(
+                        f"           {knob}={value:<5} recall@{args.k} {np.mean(recalls):6.3f}  "
+                        f"p50 {np.median(seconds) * 1000:8.2f} ms  p95 {np.percentile(seconds, 95) * 1000:8.2f} ms"
+                    )
+            await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,50000,100000")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--sweep", default="10,20,40,80,160", help="ef_search (HNSW) or probes (IVFFlat) values")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare per-chunk ``embedContent`` calls against batched ``batchEmbedContents``.
+
+Gemini is simulated with an in-process ``httpx.MockTransport`` that charges a fixed
+round-trip latency per HTTP request plus a small per-text cost, so the numbers reflect
+request fan-out rather than network noise.
+
+    python -m benchmarks.embed_batching --chunks 300 --rtt-ms 80
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, cast
+
+import httpx
+import orjson
+
+from app.core.config import AppSettings
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.embeddings import GeminiEmbeddingProvider
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.transport import LLMTransport
+
+
+def _mock_transport(rtt_ms: float, per_text_ms: float, dim: int) -> httpx.MockTransport:
+    vector = [0.01] * dim
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body: dict[str, Any] = orjson.loads(request.content)
+        if request.url.path.endswith(":batchEmbedContents"):
+            count = len(body["requests"])
+            await asyncio.sleep((rtt_ms + per_text_ms * count) / 1000)
+            return httpx.Response(200, json={"embeddings": [{"values": vector}] * count})
+        await asyncio.sleep((rtt_ms + per_text_ms) / 1000)
+        return httpx.Response(200, json={"embedding": {"values": vector}})
+
+    return httpx.MockTransport(handler)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    transport = LLMTransport(AppSettings(), transport=_mock_transport(args.rtt_ms, args.per_text_ms, args.dim))
+    # A zero-capacity, non-persistent cache keeps both runs honest.
+    client = GeminiClient(transport=transport, embedding_cache=EmbeddingCache(max_entries=0, persist=False))
+    embedder = cast(GeminiEmbeddingProvider, client._embedder)
+    embedder.batch_size = args.batch_size
+    embedder.max_concurrency = args.concurrency
+    texts = [f"potongan regulasi {idx}" for idx in range(args.chunks)]
+
+    start = time.perf_counter()
+    for text in texts:
+        await client.embed_text(text)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors = await client.embed_texts(texts)
+    batched = time.perf_counter() - start
+    if len(vectors) != len(texts):
+        raise RuntimeError("batched embedding returned the wrong number of vectors")
+    await transport.aclose()
+
+    print(f"chunks={args.chunks} batch_size={args.batch_size} concurrency={args.concurrency} rtt_ms={args.rtt_ms}")
+    print(f"sequential embed_text : {sequential:8.3f}s  {args.chunks / sequential:10.1f} chunks/s")
+    print(f"batched embed_texts   : {batched:8.3f}s  {args.chunks / batched:10.1f} chunks/s")
+    print(f"speedup               : {sequential / batched:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rtt-ms", type=float, default=80.0)
+    parser.add_argument("--per-text-ms", type=float, default=0.5)
+    parser.add_argument("--dim", type=int, default=768)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Storage, index build time, query latency and recall at reduced embedding dimensions.
+
+Gemini's reduced ``outputDimensionality`` embeddings are prefixes of the full vector,
+renormalised. This benchmark truncates a 768-dimensional corpus the same way and, for
+each ``--dims`` value, measures recall@k against exact neighbours at full dimension.
+
+By default the corpus is synthetic: clustered vectors whose per-dimension variance
+decays with the index, like Matryoshka-trained embeddings. Pass ``--embeddings`` with
+an ``.npy`` matrix of real 768-d Gemini embeddings for representative recall numbers.
+
+``--backend local`` (default) uses the SQLite-fallback ``LocalVectorIndex`` (exact and
+IVF). ``--backend postgres`` loads a scratch pgvector table at ``DATABASE_URL``, builds
+the configured ANN index, and reports table + index size.
+
+    python -m benchmarks.embedding_dims --rows 50000 --dims 256,512,768
+    python -m benchmarks.embedding_dims --backend postgres --rows 50000 --embeddings chunks.npy
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.db.vector_index import create_index_sql, query_parameters
+from app.services.rag.retrieval.local_index import LocalVectorIndex
+from benchmarks.ann_recall import INDEX, TABLE, _load, _search
+
+FULL_DIMENSION = 768
+
+
+def _corpus(rng: np.random.Generator, count: int, clusters: int) -> np.ndarray:
+    scale = (np.arange(FULL_DIMENSION) + 1.0) ** -0.5
+    centers = rng.standard_normal((clusters, FULL_DIMENSION)) * scale
+    noise = 0.6 * rng.standard_normal((count, FULL_DIMENSION)) * scale
+    return (centers[rng.integers(0, clusters, count)] + noise).astype(np.float32)
+
+
+def _truncate(matrix: np.ndarray, dim: int) -> np.ndarray:
+    head = matrix[:, :dim]
+    return head / np.linalg.norm(head, axis=1, keepdims=True)
+
+
+def _recall(truth: list[set[int]], found: list[set[int]], k: int) -> float:
+    return float(np.mean([len(a & b) / k for a, b in zip(truth, found)]))
+
+
+def _report(dim: int, label: str, build: float, seconds: list[float], recall: float, size: str) -> None:
+    print(
+        f"dim={dim:<4} {label:<8} build {build:7.2f}s  p50 {np.median(seconds) * 1000:8.2f} ms  "
+        f"p95 {np.percentile(seconds, 95) * 1000:8.2f} ms  recall {recall:6.3f}  {size}"
+    )
+
+
+def _run_local(args: argparse.Namespace, data: np.ndarray, queries: np.ndarray, truth: list[set[int]]) -> None:
+    lists = args.lists or int(np.sqrt(len(data)))
+    with tempfile.TemporaryDirectory() as scratch:
+        for dim in args.dims:
+            corpus, probe = _truncate(data, dim), _truncate(queries, dim)
+            for label, ivf_lists in (("exact", 0), ("ivf", lists)):
+                index = LocalVectorIndex(Path(scratch) / f"{dim}-{label}", ivf_lists=ivf_lists, ivf_probes=args.probes)
+                started = time.perf_counter()
+                for start in range(0, len(corpus), 10_000):
+                    block = corpus[start : start + 10_000]
+                    index.append(list(range(start, start + len(block))), block)
+                build = time.perf_counter() - started
+                seconds: list[float] = []
+                found: list[set[int]] = []
+                for query in probe:
+                    started = time.perf_counter()
+                    found.append({chunk_id for chunk_id, _ in index.search(query, args.k)})
+                    seconds.append(time.perf_counter() - started)
+                size = sum(path.stat().st_size for path in index.path.iterdir()) / len(corpus)
+                _report(dim, label, build, seconds, _recall(truth, found, args.k), f"{size:7.0f} B/chunk")
+
+
+async def _run_postgres(
+    args: argparse.Namespace, data: np.ndarray, queries: np.ndarray, truth: list[set[int]]
+) -> None:
+    base = get_settings()
+    engine = create_async_engine(base.database_url.get_secret_value(), isolation_level="AUTOCOMMIT", future=True)
+    try:
+        async with engine.connect() as conn:
+            for dim in args.dims:
+                settings = base.model_copy(update={"vector_dim": dim, "vector_storage": "float"})
+                corpus, probe = _truncate(data, dim), _truncate(queries, dim)
+                await _load(conn, corpus)
+                ddl = create_index_sql(settings, table=TABLE, name=INDEX)
+                started = time.perf_counter()
+                if ddl is not None:
+                    await conn.execute(text(ddl))
+                build = time.perf_counter() - started
+                await conn.execute(text(f"ANALYZE {TABLE}"))
+                seconds: list[float] = []
+                found: list[set[int]] = []
+                for query in probe:
+                    started = time.perf_counter()
+                    found.append(set(await _search(conn, query, args.k, query_parameters(settings))))
+                    seconds.append(time.perf_counter() - started)
+                table_bytes = await conn.scalar(text(f"SELECT pg_table_size('{TABLE}')"))
+                index_bytes = await conn.scalar(text(f"SELECT pg_indexes_size('{TABLE}')"))
+                size = f"table {table_bytes / len(corpus):7.0f} B/chunk  index {index_bytes / len(corpus):7.0f} B/chunk"
+                _report(dim, settings.vector_index_type, build, seconds, _recall(truth, found, args.k), size)
+            await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("local", "postgres"), default="local")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dims", type=lambda value: [int(dim) for dim in value.split(",")], default=[256, 512, 768])
+    parser.add_argument("--k", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists for the local backend (default sqrt(rows))")
+    parser.add_argument("--probes", type=int, default=16)
+    parser.add_argument("--embeddings", default=None, help=".npy matrix of real 768-d embeddings")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.embeddings:
+        matrix = np.load(args.embeddings).astype(np.float32)
+        order = rng.permutation(len(matrix))
+        queries, data = matrix[order[: args.queries]], matrix[order[args.queries :]][: args.rows]
+    else:
+        data = _corpus(rng, args.rows, args.clusters)
+        queries = _corpus(rng, args.queries, args.clusters)
+    full = _truncate(data, FULL_DIMENSION)
+    truth = [set(np.argsort(-(full @ query))[: args.k].tolist()) for query in _truncate(queries, FULL_DIMENSION)]
+    print(f"backend={args.backend} rows={len(data)} k={args.k} queries={len(queries)} truth=exact@{FULL_DIMENSION}")
+
+    if args.backend == "local":
+        _run_local(args, data, queries, truth)
+    else:
+        asyncio.run(_run_postgres(args, data, queries, truth))
+
+
+if __name__ == "__main__":
+    main()
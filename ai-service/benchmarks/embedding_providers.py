@@ -0,0 +1,91 @@
+"""Throughput of the local hashed n-gram embedder against the remote Gemini path.
+
+The remote side runs through the real ``GeminiClient`` stack (governor, batching,
+transport) against the in-process stand-in with a log-normal ``batchEmbedContents``
+latency, so it measures request fan-out rather than internet noise. Chunks are
+synthetic ~700-word Indonesian passages, matching the ingestion chunk size.
+
+    python -m benchmarks.embedding_providers --chunks 500 --rtt-ms 120
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.core.config import get_settings
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.embeddings import HashingEmbeddingProvider
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.standin import StandinConfig, create_app
+from app.services.llm.standin.config import LatencyProfile
+from app.services.llm.transport import LLMTransport
+
+_WORDS = (
+    "izin usaha persetujuan bangunan gedung nomor induk berusaha pelaku wajib memenuhi "
+    "persyaratan dokumen lingkungan pemerintah daerah peraturan menteri pasal ayat sanksi "
+    "administratif pangan olahan rumah tangga sertifikat laik fungsi retribusi"
+).split()
+
+
+def _chunks(count: int, words: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(_WORDS, k=words)) + f" #{idx}" for idx in range(count)]
+
+
+async def _remote(texts: list[str], args: argparse.Namespace) -> float:
+    config = StandinConfig(
+        vector_dim=args.dim,
+        latency={"batchEmbedContents": LatencyProfile(args.rtt_ms, args.sigma)},
+    )
+    settings = get_settings().model_copy(update={"vector_dim": args.dim, "embedding_provider": "gemini"})
+    transport = LLMTransport(settings, transport=httpx.ASGITransport(app=create_app(config)))
+    # A zero-capacity, non-persistent cache keeps the run honest.
+    client = GeminiClient(
+        transport=transport, embedding_cache=EmbeddingCache(max_entries=0, persist=False), settings=settings
+    )
+    start = time.perf_counter()
+    vectors = await client.embed_texts(texts)
+    elapsed = time.perf_counter() - start
+    await transport.aclose()
+    if len(vectors) != len(texts):
+        raise RuntimeError("remote embedding returned the wrong number of vectors")
+    return elapsed
+
+
+async def _local(texts: list[str], args: argparse.Namespace) -> float:
+    provider = HashingEmbeddingProvider(args.dim)
+    start = time.perf_counter()
+    vectors = await provider.embed(texts)
+    elapsed = time.perf_counter() - start
+    if len(vectors) != len(texts):
+        raise RuntimeError("local embedding returned the wrong number of vectors")
+    return elapsed
+
+
+async def _run(args: argparse.Namespace) -> None:
+    texts = _chunks(args.chunks, args.words)
+    local = await _local(texts, args)
+    remote = await _remote(texts, args)
+
+    print(f"chunks={args.chunks} words={args.words} dim={args.dim} rtt_ms={args.rtt_ms}")
+    print(f"local hashing    : {local:8.3f}s  {args.chunks / local:10.1f} chunks/s")
+    print(f"remote (stand-in): {remote:8.3f}s  {args.chunks / remote:10.1f} chunks/s")
+    print(f"speedup          : {remote / local:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--words", type=int, default=700)
+    parser.add_argument("--dim", type=int, default=get_settings().vector_dim)
+    parser.add_argument("--rtt-ms", type=float, default=120.0)
+    parser.add_argument("--sigma", type=float, default=0.3)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Latency and recall@k of the SQLite-fallback vector index: exact scan vs IVF.
+
+Clustered unit vectors are appended to a scratch ``LocalVectorIndex`` in a temporary
+directory, once without IVF and once with ``--lists`` lists, and queried through the
+same memory-mapped files the service uses.
+
+    python -m benchmarks.local_index --rows 100000 --dim 768 --lists 300 --probes 8,16,32
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.rag.retrieval.local_index import LocalVectorIndex
+
+
+def _vectors(rng: np.random.Generator, count: int, dim: int, clusters: int) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    data = centers[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def _load(index: LocalVectorIndex, data: np.ndarray, batch: int = 10_000) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(data), batch):
+        index.append(list(range(start, start + len(data[start : start + batch]))), data[start : start + batch])
+    return time.perf_counter() - started
+
+
+def _timed(index: LocalVectorIndex, queries: np.ndarray, k: int) -> tuple[list[set[int]], list[float]]:
+    found: list[set[int]] = []
+    seconds: list[float] = []
+    for query in queries:
+        started = time.perf_counter()
+        found.append({chunk_id for chunk_id, _ in index.search(query, k)})
+        seconds.append(time.perf_counter() - started)
+    return found, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=300)
+    parser.add_argument("--probes", default="8,16,32")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = _vectors(rng, args.rows, args.dim, args.clusters)
+    queries = _vectors(rng, args.queries, args.dim, args.clusters)
+    print(f"rows={args.rows} dim={args.dim} k={args.k} queries={args.queries}")
+    with tempfile.TemporaryDirectory() as scratch:
+        exact = LocalVectorIndex(Path(scratch) / "exact")
+        load_seconds = _load(exact, data)
+        truth, seconds = _timed(exact, queries, args.k)
+        print(
+            f"exact        load {load_seconds:6.2f}s  p50 {np.median(seconds) * 1000:8.2f} ms  "
+            f"p95 {np.percentile(seconds, 95) * 1000:8.2f} ms"
+        )
+
+        ivf = LocalVectorIndex(Path(scratch) / "ivf", ivf_lists=args.lists)
+        load_seconds = _load(ivf, data)
+        print(f"ivf lists={args.lists} load+train {load_seconds:6.2f}s")
+        for probes in (int(value) for value in args.probes.split(",")):
+            ivf.ivf_probes = probes
+            found, seconds = _timed(ivf, queries, args.k)
+            recall = np.mean([len(a & b) / args.k for a, b in zip(truth, found)])
+            print(
+                f"  probes={probes:<4} recall@{args.k} {recall:6.3f}  p50 {np.median(seconds) * 1000:8.2f} ms  "
+                f"p95 {np.percentile(seconds, 95) * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Token and latency savings from registering static prompt prefixes as cached contents.
+
+Runs the same resolver workload (system prompt + a large template ``form_schema``,
+varying ``missing_fields``) against the in-process stand-in twice: once with inline
+prompts and once through ``PrefixCache``. The stand-in charges prefill latency per
+uncached prompt token, so the timing difference reflects the prefix that no longer
+has to be re-processed.
+
+    python -m benchmarks.prefix_cache --calls 50 --schema-fields 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+import httpx
+
+from app.core.config import AppSettings
+from app.core.metrics import metrics
+from app.core.prompts import get_prompt
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.prefix_cache import PrefixCache
+from app.services.llm.standin import StandinConfig, create_app
+from app.services.llm.standin.config import LatencyProfile
+from app.services.llm.transport import LLMTransport
+
+
+def _schema(fields: int) -> dict[str, Any]:
+    return {
+        "fields": [
+            {
+                "name": f"field_{idx}",
+                "label": f"Isian formulir nomor {idx} sesuai ketentuan peraturan daerah",
+                "type": "string",
+                "required": idx % 3 == 0,
+            }
+            for idx in range(fields)
+        ],
+        "metadata": {"permit_type": "PBG", "region": "DIY", "version_date": "2024-09-01"},
+    }
+
+
+async def _run_once(args: argparse.Namespace, cached: bool) -> tuple[float, float, float]:
+    config = StandinConfig(
+        latency={"generateContent": LatencyProfile(args.base_ms, 0.0)},
+        prefill_ms_per_1k_tokens=args.prefill_ms,
+    )
+    transport = LLMTransport(AppSettings(), transport=httpx.ASGITransport(app=create_app(config)))
+    client = GeminiClient(
+        transport=transport,
+        embedding_cache=EmbeddingCache(max_entries=0, persist=False),
+        prefix_cache=PrefixCache(AppSettings()) if cached else None,
+    )
+    client._base_url = "http://standin/v1beta"
+    prompt = get_prompt("autopilot field-resolver prompt") or "Resolve missing permit form fields."
+    static = {"form_schema": _schema(args.schema_fields)}
+
+    metrics.reset()
+    start = time.perf_counter()
+    for idx in range(args.calls):
+        await client.call_resolver(prompt, {"missing_fields": [f"field_{idx % args.schema_fields}"]}, static)
+    elapsed = time.perf_counter() - start
+    await transport.aclose()
+
+    tokens = metrics.counter("llm_tokens_total", "")
+    model = client._qa_model_path.removeprefix("models/")
+    prompt_tokens = tokens.value(call_type="resolver", model=model, kind="prompt")
+    cached_tokens = tokens.value(call_type="resolver", model=model, kind="cached")
+    return elapsed, prompt_tokens - cached_tokens, cached_tokens
+
+
+async def _run(args: argparse.Namespace) -> None:
+    inline_time, inline_tokens, _ = await _run_once(args, cached=False)
+    cached_time, billed_tokens, cached_tokens = await _run_once(args, cached=True)
+
+    print(f"calls={args.calls} schema_fields={args.schema_fields} prefill_ms_per_1k={args.prefill_ms}")
+    print(
+        f"inline : {inline_time:8.3f}s  {inline_time / args.calls * 1000:8.1f} ms/call  "
+        f"{inline_tokens:10.0f} uncached tokens"
+    )
+    print(
+        f"cached : {cached_time:8.3f}s  {cached_time / args.calls * 1000:8.1f} ms/call  "
+        f"{billed_tokens:10.0f} uncached tokens  ({cached_tokens:.0f} served from cache)"
+    )
+    print(f"uncached prompt tokens saved: {1 - billed_tokens / inline_tokens:6.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--schema-fields", type=int, default=300)
+    parser.add_argument("--base-ms", type=float, default=40.0)
+    parser.add_argument("--prefill-ms", type=float, default=20.0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
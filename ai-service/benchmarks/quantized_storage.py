@@ -0,0 +1,171 @@
+"""Memory footprint, latency and recall of quantized embedding storage with float rescoring.
+
+For each ``VECTOR_STORAGE`` mode (``float``, ``halfvec``, ``binary``) and each
+``VECTOR_RESCORE_OVERSAMPLE`` value, the coarse stage ranks the corpus by the quantized
+representation and the best ``k * oversample`` candidates are rescored by exact float
+cosine distance. Recall@k is measured against exact float search.
+
+``--backend numpy`` (default, no database) brute-forces both stages in memory and
+reports the bytes each representation needs per chunk. ``--backend postgres`` fills a
+scratch pgvector table at ``DATABASE_URL`` (pgvector >= 0.7), builds the configured ANN
+index on the float or generated quantized column exactly as the migrations do, runs the
+same two-stage query as ``RetrievalService`` and reports table and index size.
+
+    python -m benchmarks.quantized_storage --rows 50000 --dim 768 --oversample 1,2,4,8,16
+    python -m benchmarks.quantized_storage --backend postgres --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import get_settings
+from app.db.vector_index import (
+    QUANTIZED_COLUMN,
+    coarse_distance_sql,
+    create_index_sql,
+    quantized_column_sql,
+    query_parameters,
+    rescore_candidates,
+)
+from benchmarks.ann_recall import INDEX, TABLE, _literal, _load, _search, _vectors
+
+MODES = ("float", "halfvec", "binary")
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+
+def _bytes_per_vector(mode: str, dim: int) -> int:
+    # pgvector stores a varlena header plus dimension/flags (8 bytes) before the payload.
+    payload = {"float": 4 * dim, "halfvec": 2 * dim, "binary": (dim + 7) // 8}[mode]
+    return 8 + payload
+
+
+def _report(mode: str, oversample: int, seconds: list[float], recall: float, size: str) -> None:
+    print(
+        f"{mode:<8} oversample={oversample:<3} recall {recall:6.3f}  p50 {np.median(seconds) * 1000:8.2f} ms  "
+        f"p95 {np.percentile(seconds, 95) * 1000:8.2f} ms  {size}"
+    )
+
+
+def _run_numpy(args: argparse.Namespace, data: np.ndarray, queries: np.ndarray, truth: list[set[int]]) -> None:
+    # Round-trip through float16 for halfvec precision; the arithmetic itself stays float32.
+    halves = data.astype(np.float16).astype(np.float32)
+    packed = np.packbits(data > 0, axis=1)
+    for mode in MODES:
+        size = f"{_bytes_per_vector(mode, args.dim):6d} B/chunk"
+        for oversample in args.oversample if mode != "float" else [1]:
+            candidates = args.k * oversample
+            seconds: list[float] = []
+            recalls: list[float] = []
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                if mode == "float":
+                    found = np.argsort(-(data @ query))[: args.k]
+                else:
+                    if mode == "halfvec":
+                        coarse = -(halves @ query.astype(np.float16).astype(np.float32))
+                    else:
+                        coarse = _POPCOUNT[packed ^ np.packbits(query > 0)].sum(axis=1)
+                    pool = np.argpartition(coarse, min(candidates, len(data) - 1))[:candidates]
+                    found = pool[np.argsort(-(data[pool] @ query))[: args.k]]
+                seconds.append(time.perf_counter() - started)
+                recalls.append(len(expected & set(found.tolist())) / args.k)
+            _report(mode, oversample, seconds, float(np.mean(recalls)), size)
+
+
+async def _timed_search(
+    conn: AsyncConnection, sql: str, params: dict[str, object], knobs: dict[str, str]
+) -> tuple[list[int], float]:
+    for name, value in knobs.items():
+        await conn.execute(text("SELECT set_config(:name, :value, false)"), {"name": name, "value": value})
+    try:
+        started = time.perf_counter()
+        ids = [row[0] for row in await conn.execute(text(sql), params)]
+        return ids, time.perf_counter() - started
+    finally:
+        for name in knobs:
+            await conn.execute(text(f"RESET {name}"))
+
+
+async def _run_postgres(args: argparse.Namespace, data: np.ndarray, queries: np.ndarray) -> None:
+    base = get_settings().model_copy(update={"vector_dim": args.dim, "retrieval_topk": args.k})
+    engine = create_async_engine(base.database_url.get_secret_value(), isolation_level="AUTOCOMMIT", future=True)
+    try:
+        async with engine.connect() as conn:
+            await _load(conn, data)
+            truth = [set(await _search(conn, query, args.k, {"enable_indexscan": "off"})) for query in queries]
+            for mode in MODES:
+                settings = base.model_copy(update={"vector_storage": mode})
+                await conn.execute(text(f"DROP INDEX IF EXISTS {INDEX}"))
+                await conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS {QUANTIZED_COLUMN}"))
+                column = quantized_column_sql(settings, table=TABLE)
+                if column is not None:
+                    await conn.execute(text(column))
+                ddl = create_index_sql(settings, table=TABLE, name=INDEX)
+                started = time.perf_counter()
+                if ddl is not None:
+                    await conn.execute(text(ddl))
+                build = time.perf_counter() - started
+                await conn.execute(text(f"ANALYZE {TABLE}"))
+                table_bytes = await conn.scalar(text(f"SELECT pg_table_size('{TABLE}')"))
+                index_bytes = await conn.scalar(text(f"SELECT pg_indexes_size('{TABLE}')"))
+                size = (
+                    f"build {build:6.2f}s  table {table_bytes / len(data):6.0f} B/chunk  "
+                    f"index {index_bytes / len(data):6.0f} B/chunk"
+                )
+
+                exact = f"ORDER BY embedding <=> CAST(:query AS vector({args.dim})) LIMIT :k"
+                for oversample in args.oversample if mode != "float" else [1]:
+                    tuned = settings.model_copy(update={"vector_rescore_oversample": oversample})
+                    if mode == "float":
+                        sql = f"SELECT id FROM {TABLE} {exact}"  # noqa: S608
+                    else:
+                        sql = (
+                            f"SELECT id FROM (SELECT id, embedding FROM {TABLE} "  # noqa: S608
+                            f"ORDER BY {coarse_distance_sql(tuned)} LIMIT :candidates) AS coarse {exact}"
+                        )
+                    seconds: list[float] = []
+                    recalls: list[float] = []
+                    for query, expected in zip(queries, truth):
+                        params = {"query": _literal(query), "k": args.k, "candidates": rescore_candidates(tuned)}
+                        found, elapsed = await _timed_search(conn, sql, params, query_parameters(tuned))
+                        seconds.append(elapsed)
+                        recalls.append(len(expected & set(found)) / args.k)
+                    _report(mode, oversample, seconds, float(np.mean(recalls)), size)
+            await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("numpy", "postgres"), default="numpy")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=24)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument(
+        "--oversample", type=lambda value: [int(item) for item in value.split(",")], default=[1, 2, 4, 8, 16]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    data = _vectors(rng, args.rows, args.dim, args.clusters)
+    queries = _vectors(rng, args.queries, args.dim, args.clusters)
+    print(f"backend={args.backend} rows={args.rows} dim={args.dim} k={args.k} queries={args.queries}")
+    if args.backend == "numpy":
+        truth = [set(np.argsort(-(data @ query))[: args.k].tolist()) for query in queries]
+        _run_numpy(args, data, queries, truth)
+    else:
+        asyncio.run(_run_postgres(args, data, queries))
+
+
+if __name__ == "__main__":
+    main()
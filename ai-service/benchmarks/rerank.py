@@ -0,0 +1,188 @@
+"""Latency, token cost and ranking agreement of the local, LLM and budgeted LLM rerankers.
+
+Each query gets 24 synthetic ~700-word candidates (matching ``RETRIEVAL_TOPK`` and the
+ingestion chunk size). The LLM modes go through ``GeminiClient`` against the in-process
+stand-in with a log-normal ``generateContent`` latency plus per-token prefill cost.
+Embeddings come from the local hashing provider so no network is needed. Candidates
+have a known topic density, so both rankers are also scored against ground truth.
+
+The synthetic stand-in ranks candidates by query-token overlap, much like the local
+reranker, so local-vs-LLM agreement is only reported for rankings recorded from Gemini:
+record them once with ``--record --cassette FILE`` (needs ``GEMINI_API_KEY``), then
+replay with ``--cassette FILE`` and the same ``--seed``/sizes. Replay misses fall back
+to the synthetic ranking and are left out of the agreement.
+
+Every Gemini call pays ``--llm-ms`` (log-normal, ``--sigma``) plus ``--prefill-ms`` per
+1k prompt tokens. ``llm_budgeted`` cuts the prompt about 4x, which shows up per call,
+but a query waits for the slowest of its parallel shards: when the fixed per-call
+latency dominates prefill, the maximum of several draws can outweigh the prefill saved.
+The per-call p50 and the slowest-shard ratio make that split visible.
+
+    python -m benchmarks.rerank --queries 20 --llm-ms 1500
+    python -m benchmarks.rerank --queries 20 --record --cassette rerank.jsonl
+    python -m benchmarks.rerank --queries 20 --cassette rerank.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+import httpx
+import numpy as np
+
+from app.core.config import AppSettings
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.embeddings import HashingEmbeddingProvider
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.standin import StandinConfig, create_app
+from app.services.llm.standin.config import LatencyProfile
+from app.services.llm.transport import LLMTransport
+from app.services.rag.rerank.llm import LLMReranker
+from app.services.rag.rerank.service import LocalReranker
+
+_FILLER = (
+    "pelaku usaha wajib memenuhi ketentuan sesuai peraturan yang berlaku dan dokumen pendukung "
+    "diajukan melalui sistem perizinan berusaha terintegrasi secara elektronik kepada instansi terkait"
+).split()
+_TOPICS = [
+    "persetujuan bangunan gedung pbg",
+    "sertifikat laik fungsi slf",
+    "nomor induk berusaha nib",
+    "izin edar pangan olahan pirt",
+    "analisis dampak lingkungan amdal",
+    "retribusi daerah tarif",
+    "sertifikat halal produk",
+    "izin usaha restoran",
+]
+
+
+def _candidates(rng: random.Random, topic: str, count: int, words: int) -> tuple[list[str], list[int]]:
+    """Texts whose topic density is random; also returns the ground-truth order."""
+    texts: list[str] = []
+    relevance: list[float] = []
+    for _ in range(count):
+        terms = list(_FILLER)
+        density = rng.random()
+        for _ in range(int(density * 30)):
+            terms.extend(topic.split())
+        for _ in range(10):
+            terms.extend(rng.choice(_TOPICS).split())
+        texts.append(" ".join(rng.choices(terms, k=words)))
+        relevance.append(density)
+    return texts, sorted(range(count), key=lambda idx: -relevance[idx])
+
+
+def _overlap(a: list[int], b: list[int], k: int) -> float:
+    return len(set(a[:k]) & set(b[:k])) / k
+
+
+def _spearman(a: list[int], b: list[int]) -> float:
+    rank_a = np.argsort(a)
+    rank_b = np.argsort(b)
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+async def _run(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    if args.record and not args.cassette:
+        raise SystemExit("--record needs --cassette")
+    config = StandinConfig(
+        mode="record" if args.record else "replay" if args.cassette else "synthetic",
+        cassette_path=args.cassette,
+        upstream_api_key=os.getenv("GEMINI_API_KEY"),
+        latency={"generateContent": LatencyProfile(args.llm_ms, args.sigma)},
+        prefill_ms_per_1k_tokens=args.prefill_ms,
+    )
+    standin_app = create_app(config)
+    standin = standin_app.state.standin
+    transport = LLMTransport(AppSettings(), transport=httpx.ASGITransport(app=standin_app))
+    client = GeminiClient(transport=transport, embedding_cache=EmbeddingCache(max_entries=0, persist=False))
+    client._base_url = "http://standin/v1beta"
+    embedder = HashingEmbeddingProvider(args.dim)
+    reranker = LocalReranker()
+    llm_rerankers = {
+        mode: LLMReranker(client, AppSettings().model_copy(update={"rerank_mode": mode}))
+        for mode in ("llm", "llm_budgeted")
+    }
+
+    seconds: dict[str, list[float]] = {mode: [] for mode in ("local", *llm_rerankers)}
+    tokens: dict[str, list[int]] = {mode: [] for mode in llm_rerankers}
+    call_seconds: dict[str, list[float]] = {mode: [] for mode in llm_rerankers}
+    slowest_ratio: dict[str, list[float]] = {mode: [] for mode in llm_rerankers}
+    truth_overlap: dict[str, list[float]] = {mode: [] for mode in seconds}
+    agreement: list[float] = []
+    correlations: list[float] = []
+    for _ in range(args.queries):
+        topic = rng.choice(_TOPICS)
+        query = f"apa syarat {topic}"
+        texts, truth = _candidates(rng, topic, args.candidates, args.words)
+        matrix = embedder.embed_matrix([query, *texts])
+
+        start = time.perf_counter()
+        local_order = reranker.rerank(query, texts, matrix[0], list(matrix[1:]))
+        seconds["local"].append(time.perf_counter() - start)
+        truth_overlap["local"].append(_overlap(local_order, truth, args.top_k))
+
+        for mode, llm_reranker in llm_rerankers.items():
+            misses = standin.replay_misses
+            result = await llm_reranker.rerank(query, texts, prior=local_order)
+            seconds[mode].append(result.elapsed)
+            tokens[mode].append(result.prompt_tokens)
+            call_seconds[mode].extend(result.call_seconds)
+            slowest_ratio[mode].append(max(result.call_seconds) / float(np.median(result.call_seconds)))
+            truth_overlap[mode].append(_overlap(result.order, truth, args.top_k))
+            recorded = config.mode == "record" or (config.mode == "replay" and standin.replay_misses == misses)
+            if mode == "llm" and recorded:
+                agreement.append(_overlap(local_order, result.order, args.top_k))
+                correlations.append(_spearman(local_order, result.order))
+    await transport.aclose()
+
+    print(
+        f"queries={args.queries} candidates={args.candidates} words={args.words} llm_ms={args.llm_ms} "
+        f"standin={config.mode}"
+    )
+    for mode in seconds:
+        spent = f"{np.mean(tokens[mode]):9.0f} prompt tokens/query" if mode in tokens else " " * 29
+        print(
+            f"{mode:<13}: p50 {np.median(seconds[mode]) * 1000:8.2f} ms  "
+            f"p95 {np.percentile(seconds[mode], 95) * 1000:8.2f} ms  {spent}  "
+            f"truth overlap@{args.top_k} {np.mean(truth_overlap[mode]):6.1%}"
+        )
+    for mode in call_seconds:
+        calls = len(call_seconds[mode]) / args.queries
+        prefill = args.prefill_ms * np.mean(tokens[mode]) / calls / 1000
+        print(
+            f"{mode:<13}: {calls:4.1f} calls/query  per call p50 {np.median(call_seconds[mode]) * 1000:8.2f} ms  "
+            f"(prefill ~{prefill:7.2f} ms)  slowest/median shard {np.mean(slowest_ratio[mode]):5.2f}x"
+        )
+    if agreement:
+        print(
+            f"local vs llm : overlap@{args.top_k} {np.mean(agreement):6.1%}  "
+            f"spearman rho {np.mean(correlations):6.3f}  ({len(agreement)} recorded Gemini rankings)"
+        )
+    else:
+        # The synthetic ranking is query-token overlap, i.e. close to the local reranker by construction.
+        print("local vs llm : n/a (no recorded Gemini rankings; see --record / --cassette)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--candidates", type=int, default=24)
+    parser.add_argument("--words", type=int, default=700)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--llm-ms", type=float, default=1500.0)
+    parser.add_argument("--sigma", type=float, default=0.3)
+    parser.add_argument("--prefill-ms", type=float, default=20.0)
+    parser.add_argument("--cassette", default=None, help="Replay (or with --record, record) Gemini responses.")
+    parser.add_argument("--record", action="store_true", help="Proxy to Gemini and append to --cassette.")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
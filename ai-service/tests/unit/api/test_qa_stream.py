@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_rag_pipeline
+from app.main import app
+
+
+class StreamingPipeline:
+    def __init__(self, citations):
+        self.citations = citations
+
+    async def answer_stream(self, payload):
+        yield "meta", {"citations": self.citations, "retrieval_meta": {"chunks_considered": 1}}
+        yield "token", {"text": "Langkah "}
+        yield "token", {"text": "pertama"}
+        yield "done", {
+            "answer_md": "Langkah pertama",
+            "citations": self.citations,
+            "retrieval_meta": {"chunks_considered": 1},
+            "model_meta": {},
+        }
+
+
+class FailingPipeline(StreamingPipeline):
+    async def answer_stream(self, payload):
+        yield "meta", {"citations": self.citations, "retrieval_meta": {"chunks_considered": 1}}
+        yield "token", {"text": "Langkah "}
+        raise ConnectionResetError("database connection lost")
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture(autouse=True)
+def clear_overrides():
+    yield
+    app.dependency_overrides.clear()
+
+
+def _stream(citations, pipeline=StreamingPipeline):
+    app.dependency_overrides[get_rag_pipeline] = lambda: pipeline(citations)
+    client = TestClient(app)
+    response = client.post(
+        "/v1/qa/query/stream",
+        json={"question": "Apa itu PIRT?", "user_id": "user-1", "region": "DIY"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return _events(response.text)
+
+
+def test_stream_sends_meta_then_tokens_then_done():
+    citation = {"url": "https://jdih.example.id/pirt", "title": "Perka", "section": None, "snippet": None}
+    events = _stream([citation])
+    assert [name for name, _ in events] == ["meta", "token", "token", "done"]
+    assert events[-1][1]["answer_md"] == "Langkah pertama"
+    assert events[-1][1]["citations"][0]["url"] == citation["url"]
+
+
+def test_stream_done_enforces_must_cite():
+    events = _stream([])
+    assert events[-1][0] == "done"
+    assert events[-1][1]["answer_md"] == "Saya tidak dapat memverifikasi ini."
+    assert events[-1][1]["citations"] == []
+
+
+def test_stream_failure_ends_with_error_then_guarded_done():
+    citation = {"url": "https://jdih.example.id/pirt", "title": "Perka", "section": None, "snippet": None}
+    events = _stream([citation], pipeline=FailingPipeline)
+    assert [name for name, _ in events] == ["meta", "token", "error", "done"]
+    assert events[-1][1]["answer_md"] == "Saya tidak dapat memverifikasi ini."
+    assert events[-1][1]["citations"] == []
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.llm.coalescing import SingleFlight, request_key
+
+
+def test_request_key_ignores_dict_order() -> None:
+    assert request_key("m:generateContent", {"a": 1, "b": 2}) == request_key("m:generateContent", {"b": 2, "a": 1})
+    assert request_key("m:generateContent", {"a": 1}) != request_key("m:embedContent", {"a": 1})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_upstream() -> None:
+    metrics.reset()
+    flight: SingleFlight[int] = SingleFlight()
+    upstream_calls = 0
+    release = asyncio.Event()
+
+    async def upstream() -> int:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(flight.do("k", upstream, label="generateContent")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [42] * 5
+    assert upstream_calls == 1
+    assert len(flight) == 0
+    assert metrics.counter("llm_coalesce_shared_total", "").value(method="generateContent") == 4
+    assert metrics.gauge("llm_coalesce_ratio", "").value() == pytest.approx(0.8)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def upstream() -> str:
+        await release.wait()
+        return "ok"
+
+    leaving = asyncio.create_task(flight.do("k", upstream))
+    staying = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await staying == "ok"
+    with pytest.raises(asyncio.CancelledError):
+        await leaving
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_upstream() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def upstream() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "late"
+
+    waiter = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_waiter() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def upstream() -> str:
+        await asyncio.sleep(0)
+        raise RuntimeError("quota")
+
+    results = await asyncio.gather(*(flight.do("k", upstream) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.metrics import metrics
+from app.models import Base
+from app.services.llm.embedding_cache import EmbeddingCache, EmbeddingKey
+
+
+def test_key_normalizes_whitespace_and_unicode() -> None:
+    first = EmbeddingKey.for_text("models/embed", 0, "Izin  PIRT\n")
+    second = EmbeddingKey.for_text("models/embed", 0, "Izin PIRT")
+    assert first == second
+    assert EmbeddingKey.for_text("models/other", 0, "Izin PIRT") != first
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest_and_counts() -> None:
+    metrics.reset()
+    cache = EmbeddingCache(max_entries=2, persist=False)
+    keys = [EmbeddingKey.for_text("m", 0, text) for text in ("a", "b", "c")]
+
+    await cache.put_many({keys[0]: [0.0], keys[1]: [1.0]})
+    await cache.get_many([keys[0]])
+    await cache.put_many({keys[2]: [2.0]})
+
+    found = await cache.get_many(keys)
+    assert set(found) == {keys[0], keys[2]}
+    assert metrics.counter("embedding_cache_evictions_total", "").value() == 1
+    assert metrics.counter("embedding_cache_misses_total", "").value() == 1
+    assert metrics.counter("embedding_cache_hits_total", "").value(tier="memory") == 3
+
+
+@pytest.fixture()
+async def sessionmaker(tmp_path: Path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cache.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_store_survives_process_cache_and_purges_other_scopes(
+    sessionmaker: async_sessionmaker[AsyncSession],
+) -> None:
+    old_key = EmbeddingKey.for_text("models/old", 0, "halal")
+    writer = EmbeddingCache(sessionmaker=lambda: sessionmaker)
+    await writer.put_many({old_key: [0.5, 0.25]})
+
+    reader = EmbeddingCache(sessionmaker=lambda: sessionmaker)
+    assert await reader.get_many([old_key]) == {old_key: [0.5, 0.25]}
+
+    resized = EmbeddingCache(sessionmaker=lambda: sessionmaker)
+    assert await resized.get_many([EmbeddingKey.for_text("models/old", 256, "halal")]) == {}
+    assert await EmbeddingCache(sessionmaker=lambda: sessionmaker).get_many([old_key]) == {}
+    await writer.put_many({old_key: [0.5, 0.25]})
+
+    switched = EmbeddingCache(sessionmaker=lambda: sessionmaker)
+    new_key = EmbeddingKey.for_text("models/new", 0, "halal")
+    assert await switched.get_many([new_key]) == {}
+
+    reader.clear()
+    assert await reader.get_many([old_key]) == {}
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import httpx
+import numpy as np
+import pytest
+
+from app.core.config import AppSettings
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.embeddings import HashingEmbeddingProvider
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.transport import LLMTransport
+
+
+def test_hashing_embeddings_are_deterministic_unit_vectors() -> None:
+    provider = HashingEmbeddingProvider(dimension=256)
+    texts = ["Izin PBG untuk bangunan gedung", "", "Persyaratan NIB di Jakarta"]
+
+    matrix = provider.embed_matrix(texts)
+
+    assert matrix.shape == (3, 256)
+    assert matrix.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(matrix[[0, 2]], axis=1), 1.0, rtol=1e-5)
+    assert not matrix[1].any()
+    # Batching must not leak n-grams across text boundaries.
+    np.testing.assert_array_equal(matrix[2], provider.embed_matrix([texts[2]])[0])
+    np.testing.assert_array_equal(matrix, HashingEmbeddingProvider(dimension=256).embed_matrix(texts))
+
+
+def test_hashing_embeddings_rank_lexical_overlap_higher() -> None:
+    provider = HashingEmbeddingProvider(dimension=512)
+    query, related, unrelated = provider.embed_matrix(
+        [
+            "syarat izin persetujuan bangunan gedung",
+            "Persetujuan Bangunan Gedung (PBG) wajib dimiliki sebelum membangun gedung.",
+            "Pajak restoran dipungut atas pelayanan makanan dan minuman.",
+        ]
+    )
+
+    assert float(query @ related) > float(query @ unrelated)
+
+
+@pytest.mark.asyncio
+async def test_client_uses_local_provider_without_network() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError(f"unexpected request to {request.url}")
+
+    provider = HashingEmbeddingProvider(dimension=64)
+    client = GeminiClient(
+        transport=LLMTransport(AppSettings(), transport=httpx.MockTransport(handler)),
+        embedding_cache=EmbeddingCache(persist=False),
+        embedder=provider,
+    )
+
+    vectors = await client.embed_texts(["NIB", "PBG", "NIB"])
+    single = await client.embed_text("PBG")
+
+    assert len(vectors[0]) == 64
+    assert vectors[0] == vectors[2]
+    assert single == vectors[1]
+    assert client._embedding_key("NIB").model == provider.model_id
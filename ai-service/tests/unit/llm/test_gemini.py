@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import json
 import os
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Iterator, cast
 
+import httpx
+import numpy as np
 import pytest
 
-from app.core.config import get_settings
+from app.core.config import AppSettings, get_settings
+from app.services.llm.embedding_cache import EmbeddingCache
 from app.services.llm.gemini import GeminiClient
+from app.services.llm.transport import LLMTransport
 
 def _settings_with_env(monkeypatch: pytest.MonkeyPatch, **env: str) -> Iterator[None]:
     @contextmanager
@@ -53,3 +58,29 @@ def test_model_normalization_adds_missing_prefix(monkeypatch: pytest.MonkeyPatch
         assert client._embed_model_path == "models/text-embedding-004"
         assert client._qa_model == "gemini-2.5-pro"
         assert client._qa_model_path == "models/gemini-2.5-pro"
+
+
+@pytest.mark.asyncio
+async def test_embed_texts_packs_batches_and_preserves_order() -> None:
+    seen_batches: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith(":batchEmbedContents")
+        texts = [item["content"]["parts"][0]["text"] for item in json.loads(request.content)["requests"]]
+        seen_batches.append(len(texts))
+        assert {item["outputDimensionality"] for item in json.loads(request.content)["requests"]} == {2}
+        return httpx.Response(200, json={"embeddings": [{"values": [3.0, 4.0 * float(text), 9.0]} for text in texts]})
+
+    client = GeminiClient(
+        transport=LLMTransport(AppSettings(), transport=httpx.MockTransport(handler)),
+        embedding_cache=EmbeddingCache(persist=False),
+    )
+    cast(Any, client._embedder).batch_size = 4
+    cast(Any, client._embedder).dimension = 2
+
+    vectors = await client.embed_texts([str(idx) for idx in range(10)])
+
+    # Truncated to the requested dimension and renormalised.
+    expected = [[3.0 / np.hypot(3.0, 4.0 * idx), 4.0 * idx / np.hypot(3.0, 4.0 * idx)] for idx in range(10)]
+    np.testing.assert_allclose(vectors, expected)
+    assert sorted(seen_batches) == [2, 4, 4]
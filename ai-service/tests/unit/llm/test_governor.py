@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.config import AppSettings
+from app.core.errors import ModelUnavailableError
+from app.services.llm.governor import CircuitState, LLMGovernor, PacingBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _governor(clock: FakeClock, **overrides: object) -> LLMGovernor:
+    settings = AppSettings()
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    return LLMGovernor(settings, clock=clock)
+
+
+def test_pacing_bucket_queues_reservations_beyond_budget() -> None:
+    clock = FakeClock()
+    bucket = PacingBucket(60, clock)  # one per second
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    clock.now = 10.0
+    assert bucket.reserve(1) == 0.0
+
+
+def test_pacing_bucket_disabled_when_budget_is_zero() -> None:
+    assert PacingBucket(0).reserve(10_000) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_aimd_halves_on_overload_and_grows_on_success() -> None:
+    clock = FakeClock()
+    governor = _governor(clock, llm_concurrency_initial=8)
+
+    await governor.acquire(10)
+    governor.release(429)
+    assert governor.limit == 4
+
+    await governor.acquire(10)
+    governor.release(429)
+    assert governor.limit == 4  # same congestion window
+
+    for _ in range(4):
+        await governor.acquire(10)
+        governor.release(200)
+    assert governor.limit == pytest.approx(5.0, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_blocks_until_release() -> None:
+    governor = _governor(FakeClock(), llm_concurrency_initial=1)
+    await governor.acquire(1)
+
+    waiter = asyncio.create_task(governor.acquire(1))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    governor.release(200)
+    await asyncio.wait_for(waiter, timeout=1)
+    assert governor.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_fails_fast_and_recovers_after_probe() -> None:
+    clock = FakeClock()
+    governor = _governor(clock, llm_breaker_failure_threshold=2, llm_breaker_cooldown_seconds=30.0)
+
+    for _ in range(2):
+        await governor.acquire(1)
+        governor.release(503)
+    assert governor.state is CircuitState.OPEN
+
+    with pytest.raises(ModelUnavailableError):
+        await governor.acquire(1)
+
+    clock.now = 31.0
+    await governor.acquire(1)
+    assert governor.state is CircuitState.HALF_OPEN
+    with pytest.raises(ModelUnavailableError):
+        await governor.acquire(1)
+
+    governor.release(200)
+    assert governor.state is CircuitState.CLOSED
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.config import AppSettings
+from app.services.llm.hedging import HedgeBudget, Hedger
+
+
+def _hedger(**overrides: object) -> Hedger:
+    settings = AppSettings()
+    settings.llm_hedge_call_types = "generate"
+    settings.llm_hedge_min_samples = 3
+    settings.llm_hedge_max_ratio = 1.0
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    hedger = Hedger(settings)
+    for _ in range(3):
+        hedger.tracker("generate").record(0.01)
+    return hedger
+
+
+def test_budget_caps_extra_traffic() -> None:
+    budget = HedgeBudget(ratio=0.25)
+    spent = 0
+    for _ in range(100):
+        budget.earn()
+        spent += budget.try_spend()
+    assert spent == 25
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled() -> None:
+    hedger = _hedger()
+    attempts: list[asyncio.Event] = []
+
+    async def call() -> str:
+        attempt = len(attempts)
+        cancelled = asyncio.Event()
+        attempts.append(cancelled)
+        try:
+            await asyncio.sleep(5 if attempt == 0 else 0.001)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return f"attempt-{attempt}"
+
+    assert await hedger.run("generate", call) == "attempt-1"
+    await asyncio.wait_for(attempts[0].wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget_or_for_other_call_types() -> None:
+    hedger = _hedger(llm_hedge_max_ratio=0.0)
+    calls = 0
+
+    async def call() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.03)
+        return calls
+
+    assert await hedger.run("generate", call) == 1
+    assert await hedger.run("embed", call) == 2
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_first_finisher_falls_back_to_other_attempt() -> None:
+    hedger = _hedger()
+    attempts = 0
+
+    async def call() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await asyncio.sleep(0.05)
+            return "primary"
+        raise RuntimeError("hedge failed")
+
+    assert await hedger.run("generate", call) == "primary"
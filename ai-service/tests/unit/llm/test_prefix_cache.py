@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from app.core.config import AppSettings
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.prefix_cache import PrefixCache
+from app.services.llm.standin import StandinConfig, create_app
+from app.services.llm.standin.server import GeminiStandin
+from app.services.llm.transport import LLMTransport
+
+SCHEMA = {"fields": [{"name": "nama_usaha", "required": True}], "metadata": {"version_date": "2024-09-01"}}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(config: StandinConfig) -> tuple[GeminiClient, GeminiStandin]:
+    app = create_app(config)
+    client = GeminiClient(
+        transport=LLMTransport(AppSettings(), transport=httpx.ASGITransport(app=app)),
+        embedding_cache=EmbeddingCache(max_entries=0, persist=False),
+        prefix_cache=PrefixCache(AppSettings()),
+    )
+    client._base_url = "http://standin/v1beta"
+    return client, app.state.standin
+
+
+@pytest.mark.asyncio
+async def test_prefix_cache_reuses_handle_until_ttl_and_backs_off_on_failure() -> None:
+    clock = FakeClock()
+    cache = PrefixCache(AppSettings(), clock=clock)
+    created: list[int] = []
+
+    async def create(ttl_seconds: int) -> str:
+        created.append(ttl_seconds)
+        return f"cachedContents/{len(created)}"
+
+    prefix = {"model": "models/m", "systemInstruction": {"parts": [{"text": "prompt"}]}}
+    assert await cache.get_or_create(prefix, create) == "cachedContents/1"
+    assert await cache.get_or_create(prefix, create) == "cachedContents/1"
+    clock.now = cache.ttl_seconds
+    assert await cache.get_or_create(prefix, create) == "cachedContents/2"
+    assert created == [cache.ttl_seconds, cache.ttl_seconds]
+
+    async def failing(ttl_seconds: int) -> str:
+        raise httpx.ConnectError("boom")
+
+    other = {**prefix, "contents": [{"role": "user", "parts": [{"text": "schema"}]}]}
+    assert await cache.get_or_create(other, failing) is None
+    assert await cache.get_or_create(other, create) is None  # still backing off
+    assert len(created) == 2
+
+
+@pytest.mark.asyncio
+async def test_resolver_reuses_cached_prefix_and_recovers_from_expiry() -> None:
+    client, standin = _client(StandinConfig())
+
+    first = await client.call_resolver("resolver prompt", {"missing_fields": ["nama_usaha"]}, {"form_schema": SCHEMA})
+    second = await client.call_resolver("resolver prompt", {"missing_fields": ["alamat"]}, {"form_schema": SCHEMA})
+
+    assert standin.calls == {"cachedContents": 1, "generateContent": 2}
+    assert second["usageMetadata"]["cachedContentTokenCount"] > 0
+    assert json.loads(first["candidates"][0]["content"]["parts"][0]["text"]) == []
+
+    standin.cached_contents.clear()  # provider-side expiry
+    third = await client.call_resolver("resolver prompt", {"missing_fields": ["alamat"]}, {"form_schema": SCHEMA})
+
+    assert "cachedContentTokenCount" not in third["usageMetadata"]
+    assert standin.calls["generateContent"] == 4  # rejected cached call + inline retry
+
+
+@pytest.mark.asyncio
+async def test_prefix_below_minimum_size_falls_back_inline() -> None:
+    client, standin = _client(StandinConfig(cache_min_tokens=100_000))
+
+    response = await client.generate_answer("qa prompt", [{"role": "user", "parts": [{"text": "Apa itu PBG?"}]}])
+
+    assert response["candidates"]
+    assert standin.calls == {"cachedContents": 1, "generateContent": 1}
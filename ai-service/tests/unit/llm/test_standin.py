@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, cast
+
+import httpx
+import numpy as np
+import pytest
+
+from app.core.config import AppSettings
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.standin import StandinConfig, create_app
+from app.services.llm.standin.cassette import Cassette, Recording
+from app.services.llm.transport import LLMTransport
+
+
+def _client(config: StandinConfig) -> GeminiClient:
+    transport = httpx.ASGITransport(app=create_app(config))
+    client = GeminiClient(
+        transport=LLMTransport(AppSettings(), transport=transport),
+        embedding_cache=EmbeddingCache(max_entries=0, persist=False),
+    )
+    client._base_url = "http://standin/v1beta"
+    return client
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_deterministic_and_sized() -> None:
+    client = _client(StandinConfig())
+    # The stand-in honours the outputDimensionality the client asks for.
+    cast(Any, client._embedder).dimension = 64
+
+    first = await client.embed_text("izin PIRT rumah tangga")
+    again = await client.embed_texts(["izin PIRT rumah tangga", "sertifikat halal"])
+
+    assert len(first) == 64
+    assert np.allclose(first, again[0], atol=1e-6)
+    assert np.linalg.norm(again[1]) == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_generate_stream_and_rerank_are_simulated() -> None:
+    client = _client(StandinConfig(vector_dim=8))
+
+    answer = await client.generate_answer("prompt", [{"role": "user", "parts": [{"text": "Apa itu PIRT?"}]}])
+    assert answer["candidates"][0]["content"]["parts"][0]["text"]
+    assert answer["usageMetadata"]["promptTokenCount"] > 0
+
+    events = [event async for event in client.stream_answer("prompt", [{"role": "user", "parts": [{"text": "x"}]}])]
+    assert events[-1]["usageMetadata"]["totalTokenCount"] > 0
+
+    order = await client.rerank("sertifikat halal", ["izin PIRT", "sertifikat halal MUI"])
+    assert order == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_use_configured_status() -> None:
+    app = create_app(StandinConfig(error_rate=1.0, error_status=503))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://standin") as http:
+        response = await http.post("/v1beta/models/text-embedding-004:embedContent", json={})
+    assert response.status_code == 503
+    assert response.json()["error"]["status"] == "UNAVAILABLE"
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_response(tmp_path: Path) -> None:
+    cassette_path = tmp_path / "gemini.jsonl"
+    payload = {"contents": [{"role": "user", "parts": [{"text": "rekaman"}]}]}
+    endpoint = "models/gemini-2.5-pro:generateContent"
+    Cassette(cassette_path).add(
+        Recording(Cassette.key_for(endpoint, payload), endpoint, 200, body={"candidates": [], "recorded": True})
+    )
+
+    app = create_app(StandinConfig(mode="replay", cassette_path=str(cassette_path)))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://standin") as http:
+        response = await http.post(f"/v1beta/{endpoint}", json=payload)
+    assert response.json()["recorded"] is True
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from app.core.config import AppSettings
+from app.core.metrics import Histogram, metrics
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.transport import LLMTransport
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, call_type="embed")
+
+    assert histogram.value(call_type="embed") == 4
+    assert histogram.sum(call_type="embed") == pytest.approx(4.25)
+    samples = {(name, dict(key).get("le")): value for name, key, value in histogram.samples()}
+    assert samples[("demo_seconds_bucket", "0.1")] == 1
+    assert samples[("demo_seconds_bucket", "1")] == 3
+    assert samples[("demo_seconds_bucket", "+Inf")] == 4
+    assert samples[("demo_seconds_count", None)] == 4
+
+
+@pytest.mark.asyncio
+async def test_send_records_call_telemetry() -> None:
+    metrics.reset()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={
+                "candidates": [{"content": {"parts": [{"text": "ok"}]}}],
+                "usageMetadata": {"promptTokenCount": 120, "candidatesTokenCount": 7, "totalTokenCount": 127},
+            },
+        )
+
+    client = GeminiClient(
+        transport=LLMTransport(AppSettings(), transport=httpx.MockTransport(handler)),
+        embedding_cache=EmbeddingCache(persist=False),
+    )
+    await client.call_resolver("prompt", {"missing_fields": []})
+
+    model = client._qa_model_path.removeprefix("models/")
+    labels = {"call_type": "resolver", "model": model}
+    assert metrics.counter("llm_calls_total", "").value(outcome="ok", **labels) == 1
+    assert metrics.counter("llm_tokens_total", "").value(kind="prompt", **labels) == 120
+    assert metrics.counter("llm_tokens_total", "").value(kind="candidates", **labels) == 7
+    assert metrics.histogram("llm_call_duration_seconds", "").value(**labels) == 1
+    assert metrics.histogram("llm_call_ttfb_seconds", "").value(**labels) == 1
+    assert metrics.histogram("llm_call_request_bytes", "").sum(**labels) > 0
+    assert metrics.histogram("llm_call_response_bytes", "").sum(**labels) > 0
+    assert "llm_call_duration_seconds_bucket" in metrics.render_prometheus()
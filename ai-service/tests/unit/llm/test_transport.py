@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, cast
+
+import httpx
+import pytest
+
+from app.core.config import AppSettings
+from app.core.metrics import metrics
+from app.services.llm.embedding_cache import EmbeddingCache
+from app.services.llm.gemini import GeminiClient
+from app.services.llm.transport import LLMTransport
+
+
+def _embedding_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"embedding": {"values": [0.6, 0.8]}})
+
+
+@pytest.mark.asyncio
+async def test_transport_reuses_single_client() -> None:
+    transport = LLMTransport(AppSettings(), transport=httpx.MockTransport(_embedding_handler))
+    client = GeminiClient(transport=transport, embedding_cache=EmbeddingCache(persist=False))
+    cast(Any, client._embedder).dimension = 2
+
+    assert await client.embed_text("a") == pytest.approx([0.6, 0.8])
+    first = transport._client
+    assert await client.embed_text("b") == pytest.approx([0.6, 0.8])
+    assert transport._client is first
+
+    await transport.aclose()
+    assert not transport.is_open
+
+
+@pytest.mark.asyncio
+async def test_transport_counts_pool_saturation() -> None:
+    metrics.reset()
+    release = asyncio.Event()
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200, json={})
+
+    settings = AppSettings()
+    settings.llm_pool_max_connections = 1
+    transport = LLMTransport(settings, transport=httpx.MockTransport(slow_handler))
+    await transport.open()
+
+    calls = [
+        asyncio.create_task(transport.post("https://llm.local/x", content=b"{}", headers={}))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*calls)
+    await transport.aclose()
+
+    assert metrics.counter("llm_http_requests_total", "").value() == 3
+    assert metrics.counter("llm_http_pool_saturated_total", "").value() == 2
+    assert metrics.gauge("llm_http_in_flight_peak", "").value() == 3
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+
+from app.core.config import AppSettings
+from app.services.rag.retrieval.cache import RetrievalCache
+from app.services.rag.retrieval.service import RetrievalService
+
+
+class StubSession:
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def __init__(self) -> None:
+        self.generation = 3
+        self.rollbacks = 0
+
+    async def scalar(self, stmt: Any) -> int:
+        return self.generation
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+class StubGemini:
+    def __init__(self, error: Exception | None = None, rerank_error: Exception | None = None) -> None:
+        self.error = error
+        self.rerank_error = rerank_error
+
+    async def embed_text(self, text: str) -> list[float]:
+        if self.error is not None:
+            raise self.error
+        return [1.0, 0.0]
+
+    async def rerank_with_usage(
+        self, query: str, candidates: list[str], model: str | None = None
+    ) -> tuple[list[int], dict[str, Any]]:
+        if self.rerank_error is not None:
+            raise self.rerank_error
+        return list(range(len(candidates))), {}
+
+
+RetrievalServiceFactory = Callable[..., tuple[RetrievalService, StubSession]]
+
+
+@pytest.fixture()
+def retrieval_service() -> RetrievalServiceFactory:
+    """Build a ``RetrievalService`` on stub session and Gemini with the given leg coroutines."""
+
+    def build(
+        vector: Any,
+        text: Any,
+        *,
+        cache: RetrievalCache | None = None,
+        embed_error: Exception | None = None,
+        rerank_error: Exception | None = None,
+        **overrides: Any,
+    ) -> tuple[RetrievalService, StubSession]:
+        session = StubSession()
+        service = RetrievalService(cast(Any, session))
+        service.settings = AppSettings().model_copy(update={"rerank_mode": "local", **overrides})
+        service.gemini = cast(Any, StubGemini(embed_error, rerank_error))
+        service.cache = cache
+        service._vector_results = vector  # type: ignore[method-assign]
+        service._text_results = text  # type: ignore[method-assign]
+        return service, session
+
+    return build
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, cast
+
+import httpx
+import pytest
+
+from app.services.rag.pipeline.answer_cache import AnswerCache, normalize_question
+from app.services.rag.pipeline.service import RagPipeline
+from app.services.rag.retrieval.service import RetrievedChunk
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StubRetrieval:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def search(self, query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        self.calls += 1
+        return [
+            RetrievedChunk(
+                text="Pelaku usaha wajib memiliki SPP-IRT.",
+                metadata={"source_url": "https://jdih.example.id/pirt", "section": "Pasal 3"},
+                score=1.0,
+            )
+        ]
+
+
+EMBEDDINGS = {
+    "apa syarat pirt?": [1.0, 0.0, 0.0],
+    "apa saja syarat pirt": [0.99, 0.1, 0.0],
+    "berapa biaya halal?": [0.0, 1.0, 0.0],
+}
+
+
+class StubGemini:
+    def __init__(self) -> None:
+        self.embed_error: Exception | None = None
+
+    async def embed_text(self, text: str) -> list[float]:
+        if self.embed_error is not None:
+            raise self.embed_error
+        return EMBEDDINGS[text.lower()]
+
+    async def generate_answer(self, prompt: str, contents: Any) -> dict[str, Any]:
+        return {"candidates": [{"content": {"parts": [{"text": "Wajib SPP-IRT."}]}}], "usageMetadata": {}}
+
+
+class StubResult:
+    def __init__(self, rows: list[tuple[Any, ...]]) -> None:
+        self.rows = rows
+
+    def all(self) -> list[tuple[Any, ...]]:
+        return self.rows
+
+
+class StubSession:
+    def __init__(self) -> None:
+        # url -> (sha256, title, version_date, permit_type, region)
+        self.documents = {"https://jdih.example.id/pirt": ("sha-1", "Perka BPOM", date(2023, 1, 5), "PIRT", "DIY")}
+
+    async def execute(self, stmt: Any) -> StubResult:
+        return StubResult([(url, *values) for url, values in self.documents.items()])
+
+
+def _pipeline(cache: AnswerCache, semantic: bool = False) -> tuple[RagPipeline, StubRetrieval, StubSession]:
+    session = StubSession()
+    pipeline = RagPipeline(cast(Any, session))
+    pipeline.settings = pipeline.settings.model_copy(update={"answer_cache_semantic": semantic})
+    retrieval = StubRetrieval()
+    pipeline.retrieval = cast(Any, retrieval)
+    pipeline.gemini = cast(Any, StubGemini())
+    pipeline.answer_cache = cache
+    return pipeline, retrieval, session
+
+
+def _payload(question: str, permit_type: str | None = "PIRT") -> dict[str, Any]:
+    return {"question": question, "permit_type": permit_type, "region": "DIY"}
+
+
+def test_normalize_question() -> None:
+    assert normalize_question("  Apa   Syarat PIRT ?? ") == "apa syarat pirt"
+
+
+@pytest.mark.asyncio
+async def test_paraphrases_miss_unless_semantic_hits_are_enabled() -> None:
+    pipeline, retrieval, _ = _pipeline(AnswerCache())
+
+    await pipeline.answer(_payload("Apa syarat PIRT?"))
+    paraphrase = await pipeline.answer(_payload("Apa saja syarat PIRT"))
+
+    assert retrieval.calls == 2
+    assert "answer_cache" not in paraphrase["retrieval_meta"]
+
+
+@pytest.mark.asyncio
+async def test_exact_and_semantic_hits_skip_retrieval() -> None:
+    pipeline, retrieval, _ = _pipeline(AnswerCache(), semantic=True)
+
+    first = await pipeline.answer(_payload("Apa syarat PIRT?"))
+    exact = await pipeline.answer(_payload("apa   syarat pirt?"))
+    semantic = await pipeline.answer(_payload("Apa saja syarat PIRT"))
+
+    assert retrieval.calls == 1
+    assert "answer_cache" not in first["retrieval_meta"]
+    assert exact["retrieval_meta"]["answer_cache"] == "exact"
+    assert semantic["retrieval_meta"]["answer_cache"] == "semantic"
+    assert semantic["answer_md"] == first["answer_md"]
+
+
+@pytest.mark.asyncio
+async def test_embedding_failures_only_skip_semantic_lookup() -> None:
+    pipeline, retrieval, _ = _pipeline(AnswerCache(), semantic=True)
+    cast(StubGemini, pipeline.gemini).embed_error = httpx.ConnectError("connection refused")
+
+    first = await pipeline.answer(_payload("Apa syarat PIRT?"))
+    exact = await pipeline.answer(_payload("Apa syarat PIRT?"))
+    paraphrase = await pipeline.answer(_payload("Apa saja syarat PIRT"))
+
+    assert first["answer_md"] == "Wajib SPP-IRT."
+    assert exact["retrieval_meta"]["answer_cache"] == "exact"
+    assert "answer_cache" not in paraphrase["retrieval_meta"]
+    assert retrieval.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_filters_and_dissimilar_questions_miss() -> None:
+    pipeline, retrieval, _ = _pipeline(AnswerCache(), semantic=True)
+
+    await pipeline.answer(_payload("Apa syarat PIRT?"))
+    await pipeline.answer(_payload("Apa syarat PIRT?", permit_type=None))
+    await pipeline.answer(_payload("Berapa biaya HALAL?"))
+
+    assert retrieval.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_changed_source_document_invalidates_entry() -> None:
+    cache = AnswerCache()
+    pipeline, retrieval, session = _pipeline(cache)
+
+    url = "https://jdih.example.id/pirt"
+    await pipeline.answer(_payload("Apa syarat PIRT?"))
+    session.documents[url] = ("sha-2", *session.documents[url][1:])
+    await pipeline.answer(_payload("Apa syarat PIRT?"))
+    await pipeline.answer(_payload("Apa syarat PIRT?"))
+    # Re-ingested with the same text but a newer version date.
+    session.documents[url] = ("sha-2", "Perka BPOM", date(2024, 6, 1), "PIRT", "DIY")
+    await pipeline.answer(_payload("Apa syarat PIRT?"))
+
+    assert retrieval.calls == 3
+    assert cache.invalidate_sources(["https://jdih.example.id/pirt"]) == 1
+    assert len(cache) == 0
+
+
+def test_ttl_and_size_bound() -> None:
+    clock = Clock()
+    cache = AnswerCache(max_entries=2, ttl_seconds=10, clock=clock)
+    for question in ("a", "b", "c"):
+        cache.put(AnswerCache.key(question, None, None), {"answer_md": question}, {})
+
+    assert cache.get(AnswerCache.key("a", None, None)) is None
+    assert cache.get(AnswerCache.key("c", None, None)) is not None
+    clock.now = 11
+    assert cache.get(AnswerCache.key("c", None, None)) is None
+    assert len(cache) == 1
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, cast
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import Base, Chunk, Document, DocumentType
+from app.services.rag.retrieval.local_index import LocalVectorIndex, _exclusive, build_from_database
+
+
+def _unit(rng: np.random.Generator, count: int, dim: int) -> np.ndarray:
+    data = rng.standard_normal((count, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def test_brute_force_matches_exact_cosine(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    data = _unit(rng, 200, 16)
+    index = LocalVectorIndex(tmp_path)
+    index.append(list(range(100, 300)), data.tolist())
+    query = rng.standard_normal(16)
+
+    hits = index.search(query.tolist(), 5)
+
+    expected = np.argsort(-(data @ (query / np.linalg.norm(query))))[:5] + 100
+    assert [chunk_id for chunk_id, _ in hits] == expected.tolist()
+    assert all(0.0 <= distance <= 2.0 for _, distance in hits)
+
+
+def test_tombstones_and_appends_are_visible_to_other_readers(tmp_path: Path) -> None:
+    writer = LocalVectorIndex(tmp_path)
+    reader = LocalVectorIndex(tmp_path)
+    writer.append([1, 2], [[1.0, 0.0], [0.0, 1.0]])
+    assert [chunk_id for chunk_id, _ in reader.search([1.0, 0.1], 2)] == [1, 2]
+
+    assert writer.remove([1]) == 1
+    writer.append([3], [[0.9, 0.1]])
+
+    assert [chunk_id for chunk_id, _ in reader.search([1.0, 0.1], 2)] == [3, 2]
+    assert reader.count == 2
+
+
+def test_ids_appended_twice_are_searched_once(tmp_path: Path) -> None:
+    index = LocalVectorIndex(tmp_path)
+    index.append([1, 2], [[1.0, 0.0], [0.0, 1.0]])
+    index.append([1], [[1.0, 0.0]])
+
+    assert [chunk_id for chunk_id, _ in index.search([1.0, 0.1], 2)] == [1, 2]
+    assert index.count == 2
+
+
+def test_ivf_trains_once_large_enough_and_keeps_recall(tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    centers = _unit(rng, 8, 32)
+    data = centers[rng.integers(0, 8, 2000)] + 0.1 * rng.standard_normal((2000, 32)).astype(np.float32)
+    index = LocalVectorIndex(tmp_path, ivf_lists=8, ivf_probes=3)
+    index.append(list(range(2000)), data.tolist())
+    assert (tmp_path / "centroids.f32").exists()
+
+    normalised = data / np.linalg.norm(data, axis=1, keepdims=True)
+    recalls = []
+    for query in data[:50]:
+        truth = set(np.argsort(-(normalised @ query))[:10].tolist())
+        found = {chunk_id for chunk_id, _ in index.search(query.tolist(), 10)}
+        recalls.append(len(truth & found) / 10)
+    assert np.mean(recalls) > 0.9
+
+
+def test_dimension_mismatch_is_rejected(tmp_path: Path) -> None:
+    index = LocalVectorIndex(tmp_path)
+    index.append([1], [[1.0, 0.0, 0.0]])
+
+    with pytest.raises(ValueError):
+        index.append([2], [[1.0, 0.0]])
+    assert index.search([1.0, 0.0], 1) == []
+
+
+@pytest.mark.asyncio
+async def test_build_from_database_loads_stored_embeddings(tmp_path: Path) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with sessionmaker() as session:
+        document = Document(url="https://example.test/pbg", type=DocumentType.HTML, sha256="x")
+        session.add(document)
+        await session.flush()
+        session.add_all(
+            Chunk(document_id=document.id, text=f"chunk {idx}", chunk_metadata={}, embedding=[float(idx), 1.0])
+            for idx in range(3)
+        )
+        await session.commit()
+
+        index = LocalVectorIndex(tmp_path / "index")
+        index.path.mkdir()
+        # Another worker's build holds the file lock; this one waits without blocking the loop.
+        with _exclusive(index.path / ".build.lock"):
+            build = asyncio.create_task(build_from_database(session, index, batch_size=2))
+            await asyncio.sleep(0.1)
+            assert not build.done()
+        assert await build == 3
+        assert await build_from_database(session, index) == 0
+
+    assert index.count == 3
+    await engine.dispose()
+
+
+class SlowSecondBatch:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.calls = 0
+
+    async def execute(self, stmt: Any) -> Any:
+        self.calls += 1
+        if self.calls == 2:
+            await asyncio.sleep(1)
+        return await self.session.execute(stmt)
+
+
+@pytest.mark.asyncio
+async def test_interrupted_build_leaves_no_index_and_is_retried(tmp_path: Path) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        document = Document(url="https://example.test/pbg", type=DocumentType.HTML, sha256="x")
+        session.add(document)
+        await session.flush()
+        session.add_all(
+            Chunk(document_id=document.id, text=f"chunk {idx}", chunk_metadata={}, embedding=[float(idx), 1.0])
+            for idx in range(3)
+        )
+        await session.commit()
+
+        index = LocalVectorIndex(tmp_path / "index")
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(build_from_database(cast(Any, SlowSecondBatch(session)), index, batch_size=2), 0.1)
+        assert not index.exists
+
+        assert await build_from_database(session, index, batch_size=2) == 3
+    assert index.count == 3
+    await engine.dispose()
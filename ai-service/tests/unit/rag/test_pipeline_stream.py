@@ -0,0 +1,71 @@
+from typing import Any, cast
+
+import httpx
+import pytest
+
+from app.services.rag.pipeline.service import RagPipeline
+from app.services.rag.retrieval.service import RetrievedChunk
+
+
+class StubRetrieval:
+    def __init__(self, chunks: list[RetrievedChunk]) -> None:
+        self.chunks = chunks
+
+    async def search(self, query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        return self.chunks
+
+
+class StubGemini:
+    def __init__(self, deltas: list[str], error: Exception | None = None) -> None:
+        self.deltas = deltas
+        self.error = error
+
+    async def stream_answer(self, prompt: str, contents: Any):
+        for delta in self.deltas:
+            yield {"candidates": [{"content": {"parts": [{"text": delta}]}}]}
+        if self.error is not None:
+            raise self.error
+        yield {"usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 2}}
+
+
+def _pipeline(chunks: list[RetrievedChunk], gemini: StubGemini) -> RagPipeline:
+    pipeline = RagPipeline(cast(Any, None))
+    pipeline.retrieval = cast(Any, StubRetrieval(chunks))
+    pipeline.gemini = cast(Any, gemini)
+    pipeline.answer_cache = None
+    return pipeline
+
+
+CHUNK = RetrievedChunk(
+    text="Pelaku usaha wajib memiliki SPP-IRT.",
+    metadata={"source_url": "https://jdih.example.id/pirt", "section": "Pasal 3"},
+    score=1.0,
+)
+
+
+@pytest.mark.asyncio
+async def test_answer_stream_emits_meta_tokens_and_final_answer() -> None:
+    pipeline = _pipeline([CHUNK], StubGemini(["Wajib ", "SPP-IRT."]))
+    events = [event async for event in pipeline.answer_stream({"question": "Apa syarat PIRT?"})]
+
+    assert [name for name, _ in events] == ["meta", "token", "token", "done"]
+    assert events[0][1]["citations"][0]["url"] == "https://jdih.example.id/pirt"
+    done = events[-1][1]
+    assert done["answer_md"] == "Wajib SPP-IRT."
+    assert done["model_meta"]["prompt_tokens"] == 10
+
+
+@pytest.mark.asyncio
+async def test_answer_stream_without_chunks_cannot_verify() -> None:
+    pipeline = _pipeline([], StubGemini([]))
+    events = [event async for event in pipeline.answer_stream({"question": "Apa syarat PIRT?"})]
+
+    assert events == [("done", RagPipeline._cannot_verify())]
+
+
+@pytest.mark.asyncio
+async def test_answer_stream_failure_ends_with_cannot_verify() -> None:
+    pipeline = _pipeline([CHUNK], StubGemini(["Wajib "], error=httpx.ReadTimeout("slow")))
+    events = [event async for event in pipeline.answer_stream({"question": "Apa syarat PIRT?"})]
+
+    assert events[-1] == ("done", RagPipeline._cannot_verify())
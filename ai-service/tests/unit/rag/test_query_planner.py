@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, cast
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import AppSettings
+from app.models import Base, Chunk, Document, DocumentType
+from app.services.rag.retrieval import service as service_module
+from app.services.rag.retrieval.local_index import LocalVectorIndex
+from app.services.rag.retrieval.planner import adjust_filter_counts, load_filter_counts, plan_query
+from app.services.rag.retrieval.service import RetrievalService
+
+COUNTS = {("PIRT", "DIY"): 300, ("PIRT", "JATENG"): 9_700, ("HALAL", "DIY"): 90_000}
+
+
+def _settings(**overrides: object) -> AppSettings:
+    return AppSettings().model_copy(update={"planner_exact_max_rows": 1000, **overrides})
+
+
+def test_no_filters_use_the_ann_index_as_configured() -> None:
+    plan = plan_query(_settings(), COUNTS, {"permit_type": None, "region": None})
+
+    assert plan.strategy == "ann"
+    assert plan.parameters == {"hnsw.ef_search": "40"}
+    assert plan.as_meta() == {"vector_strategy": "ann", "filter_selectivity": 1.0, "filter_rows": None}
+
+
+def test_selective_filters_scan_the_filtered_subset_exactly() -> None:
+    plan = plan_query(_settings(), COUNTS, {"permit_type": "PIRT", "region": "DIY"})
+
+    assert plan.strategy == "exact"
+    assert plan.matching_rows == 300
+    assert plan.parameters == {"enable_indexscan": "off"}
+
+
+def test_broader_filters_widen_the_ann_scan_by_selectivity() -> None:
+    hnsw = plan_query(_settings(vector_iterative_scan="relaxed_order"), COUNTS, {"permit_type": "PIRT"})
+    ivfflat = plan_query(
+        _settings(vector_index_type="ivfflat", vector_ivfflat_lists=50), COUNTS, {"permit_type": "PIRT"}
+    )
+
+    assert hnsw.strategy == "ann_filtered"
+    assert hnsw.selectivity == pytest.approx(0.1)
+    assert hnsw.parameters == {"hnsw.ef_search": "240", "hnsw.iterative_scan": "relaxed_order"}
+    assert ivfflat.parameters == {"ivfflat.probes": "50"}
+
+
+def test_partition_key_filters_scan_the_pruned_partitions_as_configured() -> None:
+    by_permit = _settings(chunk_partitioning="permit_type")
+
+    partition = plan_query(by_permit, COUNTS, {"permit_type": "HALAL"})
+    region = plan_query(by_permit, COUNTS, {"permit_type": "PIRT", "region": "JATENG"})
+
+    assert partition.strategy == "partition"
+    assert partition.parameters == {"hnsw.ef_search": "40"}
+    assert region.strategy == "ann_filtered"
+    # Only the PIRT partition is scanned, where JATENG is 97% of the chunks.
+    assert region.parameters == {"hnsw.ef_search": "40"}
+    assert plan_query(_settings(chunk_partitioning="permit_type_region"), COUNTS, {"region": "JATENG"}).strategy == (
+        "partition"
+    )
+
+
+class RecordingSession:
+    """Postgres-flavoured session stub that records statements and savepoint use."""
+
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def __init__(self) -> None:
+        self.log: list[str] = []
+
+    async def begin_nested(self) -> RecordingSession:
+        self.log.append("savepoint")
+        return self
+
+    async def rollback(self) -> None:
+        self.log.append("rollback to savepoint")
+
+    async def execute(self, stmt: Any, params: dict[str, str] | None = None) -> Any:
+        if params is not None and params.get("name") == "enable_indexscan":
+            self.log.append("set enable_indexscan")
+        elif "ORDER BY" in str(stmt):
+            self.log.append("vector query")
+        rows = [("PIRT", "", 1)] if "chunk_filter_counts" in str(stmt) else []
+        return SimpleNamespace(all=lambda: rows)
+
+
+@pytest.mark.asyncio
+async def test_exact_plan_knobs_are_undone_after_the_vector_query() -> None:
+    session = RecordingSession()
+    service = RetrievalService(cast(Any, session))
+    service.settings = _settings()
+
+    await service._vector_results([1.0, 0.0], {"permit_type": "PIRT", "region": None})
+
+    assert service.last_plan is not None and service.last_plan.strategy == "exact"
+    assert session.log == ["savepoint", "set enable_indexscan", "vector query", "rollback to savepoint"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_vector_leg_follows_the_plan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    index = LocalVectorIndex(tmp_path / "index")
+    monkeypatch.setattr(service_module, "get_local_vector_index", lambda: index)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        documents = {
+            region: Document(
+                url=f"https://example.test/{region}",
+                type=DocumentType.HTML,
+                sha256="x",
+                permit_type="PIRT",
+                region=region,
+            )
+            for region in ("DIY", "JATENG")
+        }
+        session.add_all(documents.values())
+        await session.flush()
+        regions = ["DIY", "JATENG", "JATENG", "JATENG"]
+        session.add_all(
+            Chunk(
+                document_id=documents[region].id,
+                permit_type="PIRT",
+                region=region,
+                text=f"izin {idx}",
+                chunk_metadata={"section": "Umum", "order": idx},
+                embedding=[1.0, float(idx)],
+            )
+            for idx, region in enumerate(regions)
+        )
+        await adjust_filter_counts(session, {("PIRT", "DIY"): 1, ("PIRT", "JATENG"): 3})
+        await session.commit()
+        await adjust_filter_counts(session, {("PIRT", "JATENG"): -1})
+        assert await load_filter_counts(session) == {("PIRT", "DIY"): 1, ("PIRT", "JATENG"): 2}
+
+        service = RetrievalService(cast(Any, session))
+        service.settings = _settings(planner_exact_max_rows=1, retrieval_topk=2)
+        exact = await service._vector_results([1.0, 3.0], {"permit_type": "PIRT", "region": "DIY"})
+        assert service.last_plan is not None and service.last_plan.strategy == "exact"
+        assert [chunk.text for chunk in exact] == ["izin 0"]
+        assert exact[0].metadata["region"] == "DIY"
+        assert exact[0].metadata["source_url"] == "https://example.test/DIY"
+
+        filtered = await service._vector_results([1.0, 3.0], {"permit_type": None, "region": "JATENG"})
+        assert service.last_plan.strategy == "ann_filtered"
+        assert [chunk.text for chunk in filtered] == ["izin 3", "izin 2"]
+    await engine.dispose()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import AppSettings
+from app.models import Base, Chunk, Document, DocumentType
+from app.services.rag.ingestion import reembed as reembed_module
+from app.services.rag.retrieval.cache import current_generation
+from app.services.rag.retrieval.local_index import LocalVectorIndex
+
+
+class StubGemini:
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[float(len(text))] + [0.0] * (self.dimension - 1) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_reembed_rewrites_vectors_and_resets_derived_state(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    index = LocalVectorIndex(tmp_path / "index")
+    index.append([1], [[1.0, 0.0, 0.0, 0.0]])
+    monkeypatch.setattr(reembed_module, "get_local_vector_index", lambda: index)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        document = Document(url="https://example.test/pirt", type=DocumentType.HTML, sha256="x")
+        session.add(document)
+        await session.flush()
+        session.add_all(
+            Chunk(document_id=document.id, text="izin " * idx, chunk_metadata={}, embedding=[1.0, 0.0, 0.0, 0.0])
+            for idx in range(1, 6)
+        )
+        await session.commit()
+        assert await reembed_module.stored_dimension(session) == 4
+
+        settings = AppSettings().model_copy(update={"vector_dim": 2})
+        count = await reembed_module.reembed(session, cast(Any, StubGemini(2)), settings, batch_size=2)
+
+        assert count == 5
+        assert await reembed_module.stored_dimension(session) == 2
+        assert [len(vector) for vector in (await session.scalars(select(Chunk.embedding))).all()] == [2] * 5
+        assert await current_generation(session) == 1
+    assert not index.exists
+    await engine.dispose()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.services.rag.rerank.service import LocalReranker, bm25_scores, cosine_scores
+
+TEXTS = [
+    "Pajak restoran dipungut atas pelayanan makanan dan minuman.",
+    "Persetujuan Bangunan Gedung (PBG) wajib dimiliki sebelum membangun gedung baru.",
+    "Sertifikat laik fungsi diterbitkan setelah bangunan gedung selesai dibangun.",
+]
+
+
+def test_bm25_prefers_documents_with_rare_query_terms() -> None:
+    scores = bm25_scores("Apa syarat persetujuan bangunan gedung?", TEXTS)
+
+    assert scores.shape == (3,)
+    assert scores[0] == 0
+    assert scores[1] > scores[2] > 0
+
+
+def test_cosine_marks_missing_embeddings_as_nan() -> None:
+    scores = cosine_scores([1.0, 0.0], [[2.0, 0.0], None, [0.0, 3.0]])
+
+    assert scores[0] == 1.0
+    assert np.isnan(scores[1])
+    assert scores[2] == 0.0
+
+
+def test_reranker_blends_lexical_and_vector_signals() -> None:
+    query = "izin bangunan gedung"
+    embeddings = [[0.0, 1.0], [0.2, 0.8], [1.0, 0.0]]
+
+    assert LocalReranker().rerank(query, TEXTS) == [1, 2, 0]
+    # A vector-heavy blend lets the embedding override the lexical order.
+    assert LocalReranker(lexical_weight=0.1).rerank(query, TEXTS, [1.0, 0.0], embeddings)[0] == 2
+    # Candidates without embeddings fall back to lexical scoring only.
+    assert LocalReranker().rerank(query, TEXTS, [1.0, 0.0], [None, None, None]) == [1, 2, 0]
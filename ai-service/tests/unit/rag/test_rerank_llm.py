@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any, cast
+
+import pytest
+
+from app.core.config import AppSettings
+from app.services.rag.rerank.llm import LLMReranker
+from app.services.rag.rerank.service import best_window
+
+
+class StubGemini:
+    def __init__(self) -> None:
+        self.calls: list[tuple[list[str], str | None]] = []
+
+    async def rerank_with_usage(
+        self, query: str, candidates: list[str], model: str | None = None
+    ) -> tuple[list[int], dict[str, Any]]:
+        self.calls.append((candidates, model))
+        # Reverse each shard and repeat an index to exercise order repair.
+        order = list(reversed(range(len(candidates))))
+        return [*order, order[0]], {"promptTokenCount": 100, "candidatesTokenCount": 5}
+
+
+def _settings(**overrides: Any) -> AppSettings:
+    return AppSettings().model_copy(update=overrides)
+
+
+def test_best_window_centres_on_query_terms() -> None:
+    text = " ".join(["umum"] * 50 + ["izin", "bangunan", "gedung"] + ["umum"] * 50)
+
+    window = best_window(text, "syarat izin bangunan gedung", 10)
+
+    assert len(window.split()) == 10
+    assert "izin bangunan gedung" in window
+
+
+@pytest.mark.asyncio
+async def test_budgeted_mode_truncates_shards_and_accounts_tokens() -> None:
+    gemini = StubGemini()
+    settings = _settings(rerank_mode="llm_budgeted", rerank_shard_size=4, rerank_window_words=20)
+    texts = [" ".join([f"kata{idx}"] * 200) for idx in range(10)]
+
+    result = await LLMReranker(cast(Any, gemini), settings).rerank("kata", texts)
+
+    assert result.calls == 3
+    assert {model for _, model in gemini.calls} == {settings.gemini_model_rerank}
+    assert all(len(passage.split()) == 20 for candidates, _ in gemini.calls for passage in candidates)
+    assert sorted(len(candidates) for candidates, _ in gemini.calls) == [3, 3, 4]
+    assert sorted(result.order) == list(range(10))
+    # Shards are dealt round-robin; each shard winner (its last member) leads, tied by prior order.
+    assert result.order[:3] == [7, 8, 9]
+    assert result.prompt_tokens == 300
+    assert result.candidate_tokens == 15
+
+
+@pytest.mark.asyncio
+async def test_full_mode_sends_everything_in_one_call() -> None:
+    gemini = StubGemini()
+    texts = ["satu dua tiga " * 100, "empat lima"]
+
+    result = await LLMReranker(cast(Any, gemini), _settings(rerank_mode="llm")).rerank("dua", texts)
+
+    assert gemini.calls == [(texts, None)]
+    assert result.order == [1, 0]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any, cast
+
+import pytest
+
+from app.core.config import AppSettings
+from app.services.rag.retrieval.cache import RetrievalCache, settings_fingerprint
+from app.services.rag.retrieval.service import RetrievalService, RetrievedChunk
+
+# The ``retrieval_service`` fixture from conftest.py.
+RetrievalServiceFactory = Callable[..., tuple[RetrievalService, Any]]
+
+
+class Legs:
+    def __init__(self, text_delay: float = 0.0) -> None:
+        self.calls = 0
+        self.text_delay = text_delay
+
+    async def vector(self, embedding: list[float], filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        self.calls += 1
+        return [RetrievedChunk(text="pirt", metadata={"source_url": "a"}, score=0.0, ranks={"vector": 1})]
+
+    async def text(self, query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        await asyncio.sleep(self.text_delay)
+        return [RetrievedChunk(text="halal", metadata={"source_url": "b"}, score=0.0, ranks={"text": 1})]
+
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache_until_generation_changes(
+    retrieval_service: RetrievalServiceFactory,
+) -> None:
+    legs = Legs()
+    service, session = retrieval_service(legs.vector, legs.text, cache=RetrievalCache())
+
+    first = await service.search("Syarat PIRT", {"permit_type": "PIRT"})
+    second = await service.search("syarat  pirt", {"permit_type": "PIRT"})
+    assert legs.calls == 1
+    assert [(c.text, c.ranks, c.embedding) for c in second] == [(c.text, c.ranks, None) for c in first]
+
+    await service.search("syarat pirt", {"permit_type": "HALAL"})
+    session.generation += 1
+    await service.search("syarat pirt", {"permit_type": "PIRT"})
+    assert legs.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_degraded_results_are_not_cached(retrieval_service: RetrievalServiceFactory) -> None:
+    legs = Legs(text_delay=1.0)
+    service, _ = retrieval_service(legs.vector, legs.text, cache=RetrievalCache(), retrieval_text_timeout_seconds=0.05)
+
+    await service.search("syarat pirt", {})
+    await service.search("syarat pirt", {})
+
+    assert legs.calls == 2
+    assert len(cast(RetrievalCache, service.cache)) == 0
+
+
+def test_fingerprint_tracks_ranking_settings() -> None:
+    base = AppSettings()
+
+    assert settings_fingerprint(base) == settings_fingerprint(base.model_copy())
+    assert settings_fingerprint(base) != settings_fingerprint(base.model_copy(update={"rrf_k": 10}))
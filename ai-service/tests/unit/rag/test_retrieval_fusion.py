@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from app.core.config import AppSettings
+from app.services.rag.retrieval.service import RetrievalService, RetrievedChunk
+
+
+def _service(**overrides: Any) -> RetrievalService:
+    service = RetrievalService(cast(Any, SimpleNamespace(bind=None)))
+    service.settings = AppSettings().model_copy(update=overrides)
+    return service
+
+
+def _hits(leg: str, names: list[str]) -> list[RetrievedChunk]:
+    return [
+        RetrievedChunk(
+            text=name,
+            metadata={"source_url": name},
+            score=0.0,
+            ranks={leg: rank},
+            distance=0.1 * rank if leg == "vector" else None,
+            text_rank=1.0 / rank if leg == "text" else None,
+        )
+        for rank, name in enumerate(names, start=1)
+    ]
+
+
+def test_rrf_rewards_agreement_between_legs() -> None:
+    merged = _service(rrf_k=60)._merge_results(_hits("vector", ["a", "b", "c"]), _hits("text", ["c", "d"]))
+
+    assert [chunk.text for chunk in merged] == ["c", "a", "b", "d"]
+    fused = merged[0]
+    assert fused.ranks == {"vector": 3, "text": 1}
+    assert fused.distance is not None and abs(fused.distance - 0.3) < 1e-9
+    assert fused.text_rank == 1.0
+    assert abs(fused.score - (1 / 63 + 1 / 61)) < 1e-12
+
+
+def test_rrf_leg_weights_shift_order() -> None:
+    service = _service(rrf_k=10, rrf_vector_weight=0.2, rrf_text_weight=1.0)
+
+    merged = service._merge_results(_hits("vector", ["a", "b"]), _hits("text", ["x", "y"]))
+
+    assert [chunk.text for chunk in merged] == ["x", "y", "a", "b"]
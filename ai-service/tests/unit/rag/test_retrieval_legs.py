@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services.rag.retrieval.cache import RetrievalCache
+from app.services.rag.retrieval.service import RetrievalService, RetrievedChunk
+
+# The ``retrieval_service`` fixture from conftest.py.
+RetrievalServiceFactory = Callable[..., tuple[RetrievalService, Any]]
+
+
+def _chunk(name: str, leg: str) -> RetrievedChunk:
+    return RetrievedChunk(text=name, metadata={"source_url": name}, score=0.0, ranks={leg: 1})
+
+
+@pytest.mark.asyncio
+async def test_legs_run_concurrently(retrieval_service: RetrievalServiceFactory) -> None:
+    # Each leg waits for the other to start; run one after the other, neither would finish.
+    both_started = asyncio.Barrier(2)
+
+    async def vector(embedding: list[float], filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        await asyncio.wait_for(both_started.wait(), 1.0)
+        return [_chunk("vector", "vector")]
+
+    async def text(query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        await asyncio.wait_for(both_started.wait(), 1.0)
+        return [_chunk("text", "text")]
+
+    service, _ = retrieval_service(
+        vector, text, retrieval_vector_timeout_seconds=5.0, retrieval_text_timeout_seconds=5.0
+    )
+
+    results = await service.search("izin", {})
+
+    assert {chunk.text for chunk in results} == {"vector", "text"}
+
+
+@pytest.mark.asyncio
+async def test_late_text_leg_is_dropped(retrieval_service: RetrievalServiceFactory) -> None:
+    async def vector(embedding: list[float], filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        return [_chunk("vector", "vector")]
+
+    async def text(query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        await asyncio.sleep(1)
+        return [_chunk("text", "text")]
+
+    service, session = retrieval_service(vector, text, retrieval_text_timeout_seconds=0.1)
+
+    results = await service.search("izin", {})
+
+    assert [chunk.text for chunk in results] == ["vector"]
+    assert session.rollbacks == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_vector_leg_resets_session_and_keeps_text(retrieval_service: RetrievalServiceFactory) -> None:
+    async def vector(embedding: list[float], filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        raise OperationalError("SELECT", {}, Exception("connection lost"))
+
+    async def text(query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        return [_chunk("text", "text")]
+
+    service, session = retrieval_service(vector, text)
+
+    results = await service.search("izin", {})
+
+    assert [chunk.text for chunk in results] == ["text"]
+    assert session.rollbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_unreachable_embedder_keeps_text_results(retrieval_service: RetrievalServiceFactory) -> None:
+    vector_calls: list[list[float]] = []
+
+    async def vector(embedding: list[float], filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        vector_calls.append(embedding)
+        return [_chunk("vector", "vector")]
+
+    async def text(query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        await asyncio.sleep(0.01)
+        return [_chunk("text", "text")]
+
+    service, session = retrieval_service(vector, text, embed_error=httpx.ConnectError("connection refused"))
+
+    results = await service.search("izin", {})
+
+    assert [chunk.text for chunk in results] == ["text"]
+    assert vector_calls == []
+    assert session.rollbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_llm_rerank_keeps_local_order_uncached(retrieval_service: RetrievalServiceFactory) -> None:
+    async def vector(embedding: list[float], filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        return [_chunk("vector", "vector")]
+
+    async def text(query: str, filters: dict[str, str | None]) -> list[RetrievedChunk]:
+        return [_chunk("text", "text")]
+
+    cache = RetrievalCache()
+    service, _ = retrieval_service(
+        vector, text, cache=cache, rerank_error=httpx.ConnectError("connection refused"), rerank_mode="llm_budgeted"
+    )
+
+    results = await service.search("izin", {})
+
+    assert {chunk.text for chunk in results} == {"vector", "text"}
+    assert len(cache) == 0
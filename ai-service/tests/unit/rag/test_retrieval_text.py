@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.rag.retrieval.service import RetrievalService
+
+
+def _service(dialect: str | None) -> RetrievalService:
+    bind = None if dialect is None else SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+    return RetrievalService(cast(Any, SimpleNamespace(bind=bind)))
+
+
+def test_postgres_text_leg_uses_full_text_search() -> None:
+    stmt = _service("postgresql")._build_text_stmt("syarat izin PBG", {"permit_type": "PBG", "region": None})
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "chunks.text_search @@ websearch_to_tsquery(CAST(" in sql
+    assert "AS REGCONFIG)" in sql
+    assert "ts_rank_cd(chunks.text_search, websearch_to_tsquery(" in sql
+    assert "ORDER BY text_rank DESC" in sql
+    assert "chunks.permit_type = " in sql
+    assert "chunks.metadata" not in sql.split("FROM", 1)[1]
+    assert "LIKE" not in sql
+
+
+def test_sqlite_text_leg_keeps_like_fallback() -> None:
+    stmt = _service("sqlite")._build_text_stmt("izin", {})
+
+    assert "LIKE" in str(stmt)
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, cast
+
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import AppSettings
+from app.db.partitions import partition_ddl, partition_name
+from app.db.vector_index import create_index_sql, quantized_column_sql, query_parameters
+from app.services.rag.retrieval.service import RetrievalService
+
+
+def _settings(**overrides: object) -> AppSettings:
+    return AppSettings().model_copy(update=overrides)
+
+
+def test_hnsw_index_ddl_and_query_parameters() -> None:
+    settings = _settings(vector_index_type="hnsw", vector_dim=768, vector_hnsw_m=24, vector_hnsw_ef_search=100)
+
+    ddl = create_index_sql(settings)
+
+    assert ddl is not None
+    assert ddl.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_embedding_ann ON chunks")
+    assert "USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 64)" in ddl
+    assert query_parameters(settings) == {"hnsw.ef_search": "100"}
+
+
+def test_ivfflat_and_unindexable_configurations() -> None:
+    ivfflat = _settings(vector_index_type="ivfflat", vector_dim=768, vector_ivfflat_lists=200)
+
+    assert "USING ivfflat (embedding vector_cosine_ops) WITH (lists = 200)" in (create_index_sql(ivfflat) or "")
+    assert query_parameters(ivfflat) == {"ivfflat.probes": "10"}
+    assert create_index_sql(_settings(vector_dim=3072)) is None
+    assert create_index_sql(_settings(vector_index_type="none")) is None
+    assert query_parameters(_settings(vector_index_type="none")) == {}
+
+
+def test_partitioned_chunks_get_partition_ddl_and_a_parent_index() -> None:
+    by_permit = _settings(chunk_partitioning="permit_type")
+    by_region = _settings(chunk_partitioning="permit_type_region")
+    pirt, pirt_diy = partition_name("PIRT"), partition_name("PIRT", "D'IY")
+
+    assert pirt.startswith("chunks_pirt_") and pirt != partition_name("pirt")
+    assert partition_ddl(_settings(), "PIRT", "DIY") == []
+    assert partition_ddl(by_permit, "", "DIY") == []
+    assert partition_ddl(by_permit, "PIRT", "DIY") == [
+        f"CREATE TABLE IF NOT EXISTS {pirt} PARTITION OF chunks FOR VALUES IN ('PIRT')"
+    ]
+    assert partition_ddl(by_region, "PIRT", "D'IY") == [
+        f"CREATE TABLE IF NOT EXISTS {pirt} PARTITION OF chunks FOR VALUES IN ('PIRT') PARTITION BY LIST (region)",
+        f"CREATE TABLE IF NOT EXISTS {pirt}_default PARTITION OF {pirt} DEFAULT",
+        f"CREATE TABLE IF NOT EXISTS {pirt_diy} PARTITION OF {pirt} FOR VALUES IN ('D''IY')",
+    ]
+    assert (create_index_sql(by_region) or "").startswith("CREATE INDEX IF NOT EXISTS ix_chunks_embedding_ann")
+
+
+def test_quantized_storage_moves_the_index_to_the_generated_column() -> None:
+    halfvec = _settings(vector_storage="halfvec", vector_dim=3072, retrieval_topk=24, vector_rescore_oversample=4)
+    binary = _settings(vector_storage="binary", vector_dim=768, vector_index_type="ivfflat")
+
+    assert quantized_column_sql(_settings()) is None
+    assert quantized_column_sql(halfvec) == (
+        "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS embedding_quantized halfvec(3072) "
+        "GENERATED ALWAYS AS (CAST(embedding AS halfvec(3072))) STORED"
+    )
+    assert "USING hnsw (embedding_quantized halfvec_cosine_ops)" in (create_index_sql(halfvec) or "")
+    assert query_parameters(halfvec) == {"hnsw.ef_search": "96"}
+    assert "GENERATED ALWAYS AS (binary_quantize(embedding)) STORED" in (quantized_column_sql(binary) or "")
+    assert "USING ivfflat (embedding_quantized bit_hamming_ops)" in (create_index_sql(binary) or "")
+
+
+def test_quantized_search_rescores_coarse_candidates_with_float_distance() -> None:
+    bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    service = RetrievalService(cast(Any, SimpleNamespace(bind=bind)))
+    service.settings = _settings(vector_storage="binary", vector_dim=3, retrieval_topk=5, vector_rescore_oversample=3)
+
+    stmt = service._build_vector_stmt([0.1, 0.2, 0.3], {"permit_type": "PIRT", "region": None})
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "WHERE chunks.id IN (SELECT chunks.id" in sql
+    assert "ORDER BY embedding_quantized <~> binary_quantize(CAST(%(query)s AS vector(3)))" in sql
+    assert sql.rstrip().endswith("ORDER BY distance")
+    assert 15 in compiled.params.values()